@@ -0,0 +1,94 @@
+"""
+Benchmark de lecture des CSV larges (2014, 2022) : lecture complète contre
+lecture limitée aux colonnes du schéma source, avec leurs types.
+
+Chaque source est d'abord répliquée --scale fois dans un fichier temporaire,
+puis chaque lecture tourne dans un interpréteur neuf pour mesurer son pic
+de mémoire (RSS). Usage :
+
+    python benchmarks/bench_csv_sources.py [--scale 1000] [--repeat 3]
+"""
+import argparse
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+ETL_DIR = ROOT / "etl"
+
+SOURCES = {
+    "2014": (ROOT / "data" / "WorldCupMatches2014.csv", "SCHEMA_2014", {"sep": ";", "encoding": "iso-8859-1"}),
+    "2022 matches": (ROOT / "data" / "WorldCupMatches2022.csv", "SCHEMA_2022_MATCHES", {}),
+    "2022 venues": (ROOT / "data" / "WorldCupMatches2022-venue.csv", "SCHEMA_2022_VENUES", {}),
+}
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {etl_dir!r})
+import pandas as pd
+import source_schema
+
+path, schema_name, kwargs, mode = {path!r}, {schema_name!r}, {kwargs!r}, {mode!r}
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if mode == "full":
+    df = pd.read_csv(path, **kwargs)
+else:
+    df = source_schema.read_csv_schema(path, getattr(source_schema, schema_name), engine=mode, **kwargs)
+elapsed = time.perf_counter() - start
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "time": elapsed,
+    "rss_kb": rss_after - rss_before,
+    "frame_kb": df.memory_usage(deep=True).sum() / 1024,
+    "columns": df.shape[1],
+}}))
+"""
+
+
+def replicate_csv(src, dst, scale, encoding):
+    with open(src, encoding=encoding) as f:
+        header, *rows = f.read().splitlines()
+    with open(dst, "w", encoding=encoding) as f:
+        f.write(header + "\n")
+        for _ in range(scale):
+            f.write("\n".join(rows) + "\n")
+
+
+def run_child(path, schema_name, kwargs, mode):
+    code = CHILD.format(etl_dir=str(ETL_DIR), path=str(path), schema_name=schema_name, kwargs=kwargs, mode=mode)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    modes = ["full", "c"]
+    if importlib.util.find_spec("pyarrow"):
+        modes.append("pyarrow")
+
+    print(f"{'source':<14} {'mode':<8} {'cols':>5} {'parse (ms)':>11} {'pic RSS (Mo)':>13} {'frame (Mo)':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (src, schema_name, kwargs) in SOURCES.items():
+            path = Path(workdir) / src.name
+            replicate_csv(src, path, args.scale, kwargs.get("encoding", "utf-8"))
+            for mode in modes:
+                runs = [run_child(path, schema_name, kwargs, mode) for _ in range(args.repeat)]
+                print(
+                    f"{name:<14} {mode:<8} {runs[0]['columns']:>5}"
+                    f" {statistics.median(r['time'] for r in runs) * 1000:>11.1f}"
+                    f" {statistics.median(r['rss_kb'] for r in runs) / 1024:>13.1f}"
+                    f" {runs[0]['frame_kb'] / 1024:>11.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
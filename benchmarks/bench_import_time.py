@@ -0,0 +1,55 @@
+"""
+Benchmark du temps d'import de chaque module etl.
+
+Chaque import est mesuré dans un interpréteur neuf (python -c) lancé depuis
+le dossier etl/, comme le fait main.py, pour ne pas profiter des modules
+déjà chargés. Usage :
+
+    python benchmarks/bench_import_time.py [--repeat 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ETL_DIR = Path(__file__).resolve().parents[1] / "etl"
+
+# main.py ne lance le pipeline que depuis main() : son import est mesuré comme les autres
+EXCLUDED = {"__init__"}
+
+SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def etl_modules():
+    return sorted(p.stem for p in ETL_DIR.glob("*.py") if p.stem not in EXCLUDED)
+
+
+def time_import(module, repeat):
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(module=module)],
+            cwd=ETL_DIR, capture_output=True, text=True, check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'module':<24} {'median (ms)':>12}")
+    # Référence : coût incompressible de pandas, importé par la plupart des modules
+    for module in ["pandas"] + etl_modules():
+        elapsed = time_import(module, args.repeat)
+        print(f"{module:<24} {elapsed * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmark de montée en charge du pipeline complet sur données synthétiques.
+
+Pour chaque facteur d'échelle, les sources sont générées par
+synthetic_data.py, puis chaque get_cleaned_*, la fusion, load_matches et
+create_view sont mesurés (durée, CPU, lignes, pic mémoire) sur CPU seul.
+Avec --engine duckdb, l'extraction et la fusion sont remplacées par
+duckdb_extract.stage_sources, directement dans la base chargée ; avec
+--engine polars, par le plan paresseux de polars_extract.extract_frame.
+Le tableau affiche aussi le temps par millier de lignes : une valeur stable
+d'une échelle à l'autre signifie un coût linéaire. Le rapport JSON, daté et
+accompagné de la machine et des versions, peut être comparé entre deux
+versions du code. Usage :
+
+    python benchmarks/bench_scaling.py [--scales 10 100 1000] [--in-memory] [--engine duckdb|polars] [--report chemin.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+import synthetic_data
+
+ETL_DIR = Path(__file__).resolve().parents[1] / "etl"
+sys.path.insert(0, str(ETL_DIR))
+
+import config  # noqa: E402
+import db_creation  # noqa: E402
+import duckdb_extract  # noqa: E402
+import etl_1930_2010  # noqa: E402
+import etl_2014  # noqa: E402
+import etl_2018  # noqa: E402
+import etl_2022  # noqa: E402
+import etl_clean_1930_2010  # noqa: E402
+import etl_create_view  # noqa: E402
+import etl_inserter_2014  # noqa: E402
+import instrumentation  # noqa: E402
+import normalize_cache  # noqa: E402
+import polars_extract  # noqa: E402
+import source_schema  # noqa: E402
+
+EXTRACTORS = {
+    "get_cleaned_1930_data": etl_clean_1930_2010.get_cleaned_1930_data,
+    "get_cleaned_2014_data": etl_2014.get_cleaned_2014_data,
+    "get_cleaned_2018_data": lambda: etl_2018.get_cleaned_2018_data(etl_2018.INPUT_FILE),
+    "get_cleaned_2022_data": etl_2022.get_cleaned_2022_data,
+}
+
+
+def point_sources_to(paths):
+    """Fait lire aux extracteurs les fichiers synthétiques au lieu de data/."""
+    etl_1930_2010.INPUT_FILE = paths["1930"]
+    etl_1930_2010.DATETIME_FILE = paths["1930_datetime"]
+    etl_2014.INPUT_FILE = paths["2014"]
+    etl_2018.INPUT_FILE = Path(paths["2018"])
+    etl_2022.INPUT_FILES = [paths["2022"], paths["2022_venue"], paths["2022_mapping"]]
+
+
+def run_scale(scale, workdir, in_memory=False, engine="pandas"):
+    paths = synthetic_data.generate(Path(workdir) / f"x{scale}", scale)
+    point_sources_to(paths)
+    normalize_cache.clear_caches()
+    instrumentation.start_run(scale=scale)
+    stage = instrumentation.stage
+    db_path = config.IN_MEMORY if in_memory else str(Path(workdir) / f"x{scale}.duckdb")
+
+    if engine == "duckdb":
+        db_creation.create_db_schema(db_path)
+        con = config.get_connection(db_path)
+        with stage("bench.duckdb_extract") as record:
+            duckdb_extract.stage_sources(con)
+            record["rows_out"] = con.execute("SELECT COUNT(*) FROM staging_matches").fetchone()[0]
+        return load_and_view(db_path, None, record["rows_out"], "duckdb")
+
+    if engine == "polars":
+        with stage("bench.polars_extract") as record, contextlib.redirect_stdout(io.StringIO()):
+            merged = polars_extract.extract_frame()
+            record["rows_out"] = len(merged)
+        db_creation.create_db_schema(db_path)
+        return load_and_view(db_path, merged, len(merged))
+
+    frames = []
+    for name, extractor in EXTRACTORS.items():
+        # Les extracteurs sont bavards : leur sortie n'est pas affichée
+        with stage(f"bench.{name}") as record, contextlib.redirect_stdout(io.StringIO()):
+            df = extractor()
+            record["rows_out"] = len(df)
+        frames.append(df)
+
+    with stage("bench.merge", rows_in=sum(len(df) for df in frames)) as record:
+        merged = source_schema.concat_canonical(frames)
+        record["rows_out"] = len(merged)
+
+    db_creation.create_db_schema(db_path)
+    return load_and_view(db_path, merged, len(merged))
+
+
+def load_and_view(db_path, merged, rows, staging=None):
+    stage = instrumentation.stage
+    with stage("bench.load_matches", rows_in=rows) as record, contextlib.redirect_stdout(io.StringIO()):
+        etl_inserter_2014.load_matches(merged, db_path, staging=staging)
+        record["rows_out"] = config.get_connection(db_path).execute("SELECT COUNT(*) FROM Matches").fetchone()[0]
+    with stage("bench.create_view") as record:
+        etl_create_view.create_view(db_path)
+    config.close_connection(db_path)
+
+    return instrumentation.run_report()["stages"]
+
+
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "duckdb": duckdb.__version__,
+    }
+
+
+def print_table(results):
+    scales = list(results)
+    steps = [r["stage"] for r in results[scales[0]] if r["stage"].startswith("bench.")]
+    header = "".join(f"{f'x{s} (s)':>11}{'ms/1k':>8}" for s in scales)
+    print(f"\n{'étape':<24}{header}")
+    for step in steps:
+        line = f"{step.removeprefix('bench.'):<24}"
+        for scale in scales:
+            record = next(r for r in results[scale] if r["stage"] == step)
+            rows = record["rows_in"] or record["rows_out"] or 0
+            per_k = f"{record['wall_s'] / rows * 1e6:>8.2f}" if rows else f"{'':>8}"
+            line += f"{record['wall_s']:>11.2f}{per_k}"
+        print(line)
+    peaks = "".join(f"{max(r['peak_rss_mb'] or 0 for r in results[s]):>11.0f}{'':>8}" for s in scales)
+    print(f"{'pic mémoire (Mo)':<24}{peaks}")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--in-memory", action="store_true", help="base DuckDB en mémoire au lieu d'un fichier")
+    parser.add_argument("--engine", choices=["pandas", "duckdb", "polars"], default="pandas",
+                        help="moteur d'extraction mesuré")
+    parser.add_argument("--report", help="chemin du rapport JSON (défaut : db/reports/bench_scaling_<date>.json)")
+    args = parser.parse_args()
+
+    # Les équipes synthétiques sont hors référentiel : un avertissement par équipe sinon
+    logging.getLogger("ETL").setLevel(logging.ERROR)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            start = time.perf_counter()
+            results[scale] = run_scale(scale, workdir, args.in_memory, args.engine)
+            print(f"x{scale} : {time.perf_counter() - start:.1f}s")
+
+    print_table(results)
+
+    report = {
+        "benchmark": "bench_scaling",
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "in_memory": args.in_memory,
+        "engine": args.engine,
+        "results": {str(scale): stages for scale, stages in results.items()},
+    }
+    path = Path(args.report) if args.report else (
+        instrumentation.REPORT_DIR / f"bench_scaling_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n📝 Rapport : {path}")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,54 @@
+"""
+Benchmark des étapes SQL de load_matches : durée de chaque instruction du
+pipeline complet (et incrémental avec --incremental), pour voir où part le
+temps de chargement quand l'historique grossit.
+
+Les matchs fusionnés sont répliqués --scale fois. Usage :
+
+    python benchmarks/bench_sql_pipeline.py [--scale 100] [--repeat 3] [--incremental]
+"""
+import argparse
+import statistics
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from replication import replicate
+
+import config
+import db_creation
+import etl_inserter_2014
+import main
+
+
+def bench_steps(df, repeat, incremental, workdir):
+    durations = defaultdict(list)
+    for i in range(repeat):
+        db_path = str(Path(workdir) / f"steps-{i}.duckdb")
+        db_creation.create_db_schema(db_path)
+        timings = []
+        etl_inserter_2014.load_matches(df, db_path, incremental=incremental, timings=timings)
+        config.close_connection(db_path)
+        for name, seconds in timings:
+            durations[name].append(seconds)
+    return {name: statistics.median(values) for name, values in durations.items()}
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--incremental", action="store_true")
+    args = parser.parse_args()
+
+    df = replicate(main.merge_data(), args.scale)
+    print(f"\n{len(df)} matchs\n")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        steps = bench_steps(df, args.repeat, args.incremental, workdir)
+    etl_inserter_2014.print_timings(list(steps.items()))
+    print(f"   {'total':<18} {sum(steps.values()) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main_bench()
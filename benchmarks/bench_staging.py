@@ -0,0 +1,54 @@
+"""
+Benchmark du staging de load_matches : DataFrame pandas enregistré tel quel,
+table Arrow typée, ou table temporaire DuckDB remplie une seule fois.
+
+Les matchs fusionnés sont répliqués --scale fois, puis chargés dans une
+base temporaire pour chaque mode. Usage :
+
+    python benchmarks/bench_staging.py [--scale 100] [--repeat 3]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from replication import replicate
+
+import config
+import db_creation
+import etl_inserter_2014
+import main
+
+MODES = ["pandas", "arrow", "table"]
+
+
+def bench_mode(df, mode, repeat, workdir):
+    timings = []
+    for i in range(repeat):
+        db_path = str(Path(workdir) / f"{mode}-{i}.duckdb")
+        db_creation.create_db_schema(db_path)
+        start = time.perf_counter()
+        etl_inserter_2014.load_matches(df, db_path, staging=mode)
+        timings.append(time.perf_counter() - start)
+        config.close_connection(db_path)
+    return statistics.median(timings)
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = replicate(main.merge_data(), args.scale)
+    print(f"\n{len(df)} matchs, {df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} Mo en pandas\n")
+
+    print(f"{'staging':<8} {'load (s)':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in MODES:
+            print(f"{mode:<8} {bench_mode(df, mode, args.repeat, workdir):>9.2f}")
+
+
+if __name__ == "__main__":
+    main_bench()
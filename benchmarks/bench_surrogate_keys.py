@@ -0,0 +1,81 @@
+"""
+Benchmark des stratégies de clés de substitution (uuid, integer, hash).
+
+Pour chaque type de clé, une base DuckDB temporaire est créée et chargée avec
+les matchs fusionnés (répliqués --scale fois), puis on mesure la latence des
+requêtes sur v_matches_flat et la taille du fichier. Usage :
+
+    python benchmarks/bench_surrogate_keys.py [--scale 100] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from replication import replicate
+
+import config
+import db_creation
+import etl_create_view
+import etl_inserter_2014
+import main
+
+QUERIES = {
+    "scan": "SELECT * FROM v_matches_flat",
+    "goals_by_team": (
+        "SELECT home_team, COUNT(*), SUM(home_goals), SUM(away_goals) "
+        "FROM v_matches_flat GROUP BY home_team"
+    ),
+    "matches_by_year": "SELECT year_, stage, COUNT(*) FROM v_matches_flat GROUP BY year_, stage",
+}
+
+
+def bench_key_type(df, key_type, repeat, workdir):
+    db_path = str(Path(workdir) / f"{key_type}.duckdb")
+    db_creation.create_db_schema(db_path, key_type)
+    start = time.perf_counter()
+    etl_inserter_2014.load_matches(df, db_path)
+    load_time = time.perf_counter() - start
+    etl_create_view.create_view(db_path)
+
+    con = config.get_connection(db_path)
+    con.execute("CHECKPOINT")
+    latencies = {}
+    for name, query in QUERIES.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            con.execute(query).fetchall()
+            timings.append(time.perf_counter() - start)
+        latencies[name] = statistics.median(timings)
+    config.close_connection(db_path)
+
+    return load_time, latencies, os.path.getsize(db_path)
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = replicate(main.merge_data(), args.scale)
+    print(f"\n{len(df)} matchs chargés par type de clé\n")
+
+    header = f"{'clé':<8} {'load (s)':>9}" + "".join(f" {name + ' (ms)':>22}" for name in QUERIES) + f" {'taille (Ko)':>12}"
+    lines = [header]
+    with tempfile.TemporaryDirectory() as workdir:
+        for key_type in db_creation.KEY_TYPES:
+            load_time, latencies, size = bench_key_type(df, key_type, args.repeat, workdir)
+            lines.append(
+                f"{key_type:<8} {load_time:>9.2f}"
+                + "".join(f" {latencies[name] * 1000:>22.1f}" for name in QUERIES)
+                + f" {size / 1024:>12.0f}"
+            )
+    print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main_bench()
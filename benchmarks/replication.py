@@ -0,0 +1,27 @@
+"""
+Utilitaires partagés par les benchmarks de chargement : accès aux modules
+etl (sans changer de dossier courant, les chemins viennent de config.py) et
+réplication des matchs fusionnés.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ETL_DIR = Path(__file__).resolve().parents[1] / "etl"
+sys.path.insert(0, str(ETL_DIR))
+
+import source_schema  # noqa: E402
+
+
+def replicate(df, scale):
+    """Copie les matchs scale fois avec des équipes/villes/dates distinctes par copie."""
+    copies = []
+    for k in range(scale):
+        copy = df.copy()
+        if k:
+            for col in ["Home Team Name", "Away Team Name", "City"]:
+                copy[col] = copy[col].astype(str) + f" #{k}"
+            copy["Datetime"] = copy["Datetime"] + pd.Timedelta(minutes=k)
+        copies.append(copy)
+    return source_schema.concat_canonical(copies)
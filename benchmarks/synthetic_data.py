@@ -0,0 +1,184 @@
+"""
+Générateur de données synthétiques aux schémas des sources réelles.
+
+Chaque source est répliquée scale fois : la copie k (k > 0) rejoue toutes
+les éditions avec ses propres équipes (suffixe " k", de façon cohérente
+entre les fichiers qui doivent se joindre), et une partie des matchs à
+élimination directe de 1930-2010 est rejouée (match d'appui) deux jours
+plus tard. Les matchs de qualification 1930-2010, écartés dès la lecture,
+ne sont pas répliqués, et les corrections manuelles (data/corrections_*)
+ne visent que la copie d'origine. Usage :
+
+    python benchmarks/synthetic_data.py OUT_DIR [--scale 10]
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "data"
+ETL_DIR = ROOT / "etl"
+sys.path.insert(0, str(ETL_DIR))
+
+from etl_1930_2010 import normalize_team  # noqa: E402
+
+FILES = {
+    "1930": "WorldCupMatches1930-2010.csv",
+    "1930_datetime": "WorldCupMatches1930-2022-datetime.csv",
+    "2014": "WorldCupMatches2014.csv",
+    "2018": "data_2018.json",
+    "2022": "WorldCupMatches2022.csv",
+    "2022_venue": "WorldCupMatches2022-venue.csv",
+    "2022_mapping": "stadium_city_mapping2022.csv",
+}
+
+# Un match à élimination directe sur REPLAY_EVERY est rejoué dans chaque copie
+REPLAY_EVERY = 10
+
+
+def tag(series, k):
+    return series if k == 0 else series + f" {k}"
+
+
+def read_source(name, **kwargs):
+    return pd.read_csv(DATA_DIR / FILES[name], dtype=str, keep_default_na=False, **kwargs)
+
+
+def replicate(df, scale, transform):
+    return pd.concat([transform(df.copy(), k) for k in range(scale)], ignore_index=True)
+
+
+def shift_date(dates, days, fmt="%m/%d/%Y"):
+    parsed = pd.to_datetime(dates, format=fmt, errors="coerce") + pd.Timedelta(days=days)
+    return parsed.dt.strftime(fmt).str.replace(r"(^|/)0", r"\1", regex=True)
+
+
+def generate_1930(out_dir, scale):
+    matches = read_source("1930")
+    datetimes = read_source("1930_datetime", encoding="latin1")
+    tournament = matches[~matches["round"].str.contains("PRELIMINARY", case=False)]
+    knockout = tournament[~tournament["round"].str.contains("GROUP", case=False)]
+    replays = knockout.iloc[::REPLAY_EVERY]
+
+    def copy_matches(df, k):
+        if k == 0:
+            return matches
+        df = pd.concat([tournament, replays], ignore_index=True)
+        # Équipes déjà normalisées puis suffixées, pour rester jointes au fichier datetime
+        for col in ["team1", "team2"]:
+            df[col] = tag(df[col].map(normalize_team), k)
+        df["edition"] = df["edition"] + f"-S{k}"
+        return df
+
+    dt_keys = datetimes.assign(
+        _year=datetimes["Tournament Id"].str[-4:],
+        _t1=datetimes["Home Team Name"].map(normalize_team),
+        _t2=datetimes["Away Team Name"].map(normalize_team),
+    )
+    replay_keys = replays.assign(
+        _year=replays["edition"].str[:4],
+        _t1=replays["team1"].map(normalize_team),
+        _t2=replays["team2"].map(normalize_team),
+    )[["_year", "_t1", "_t2"]].drop_duplicates()
+    replay_rows = dt_keys.merge(replay_keys, on=["_year", "_t1", "_t2"]).drop_duplicates(["_year", "_t1", "_t2"])
+    replay_rows = replay_rows.drop(columns=["_year", "_t1", "_t2"]).assign(
+        Replay="1", **{"Match Date": shift_date(replay_rows["Match Date"], 2)}
+    )
+
+    def copy_datetimes(df, k):
+        if k == 0:
+            return datetimes
+        df = pd.concat([datetimes, replay_rows], ignore_index=True)
+        for col in ["Home Team Name", "Away Team Name"]:
+            df[col] = tag(df[col].map(normalize_team), k)
+        return df
+
+    replicate(matches, scale, copy_matches).to_csv(out_dir / FILES["1930"], index=False)
+    replicate(datetimes, scale, copy_datetimes).to_csv(
+        out_dir / FILES["1930_datetime"], index=False, encoding="latin1", errors="replace"
+    )
+
+
+def generate_2014(out_dir, scale):
+    kwargs = {"sep": ";", "encoding": "iso-8859-1"}
+    df = read_source("2014", **kwargs)
+
+    def copy_2014(df, k):
+        for col in ["Home Team Name", "Away Team Name"]:
+            df[col] = tag(df[col], k)
+        return df
+
+    replicate(df, scale, copy_2014).to_csv(out_dir / FILES["2014"], index=False, **kwargs)
+
+
+def generate_2018(out_dir, scale):
+    with open(DATA_DIR / FILES["2018"], encoding="utf-8") as f:
+        data = json.load(f)
+    teams = list(data["teams"])
+    offset = max(team["id"] for team in teams)
+
+    sections = [
+        section
+        for root in ("groups", "knockout")
+        for section in data[root].values()
+    ]
+    originals = [list(section["matches"]) for section in sections]
+    for k in range(1, scale):
+        data["teams"].extend(
+            {**team, "id": team["id"] + k * offset, "name": f"{team['name']} {k}"} for team in teams
+        )
+        for section, matches in zip(sections, originals):
+            for match in matches:
+                match = copy.deepcopy(match)
+                for side in ("home_team", "away_team"):
+                    if isinstance(match.get(side), int):
+                        match[side] += k * offset
+                section["matches"].append(match)
+
+    with open(out_dir / FILES["2018"], "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def generate_2022(out_dir, scale):
+    matches = read_source("2022")
+    venues = read_source("2022_venue")
+
+    def tag_columns(columns):
+        def transform(df, k):
+            for col in columns:
+                df[col] = tag(df[col], k)
+            return df
+        return transform
+
+    replicate(matches, scale, tag_columns(["team1", "team2"])).to_csv(out_dir / FILES["2022"], index=False)
+    replicate(venues, scale, tag_columns(["home_team", "away_team"])).to_csv(out_dir / FILES["2022_venue"], index=False)
+    read_source("2022_mapping").to_csv(out_dir / FILES["2022_mapping"], index=False)
+
+
+def generate(out_dir, scale):
+    """Écrit les sources répliquées scale fois dans out_dir ; retourne les chemins par source."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    generate_1930(out_dir, scale)
+    generate_2014(out_dir, scale)
+    generate_2018(out_dir, scale)
+    generate_2022(out_dir, scale)
+    return {name: str(out_dir / file) for name, file in FILES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("out_dir")
+    parser.add_argument("--scale", type=int, default=10)
+    args = parser.parse_args()
+    for name, path in generate(args.out_dir, args.scale).items():
+        print(f"{name:<14} {os.path.getsize(path) / 1024 ** 2:>8.1f} Mo  {path}")
+
+
+if __name__ == "__main__":
+    main()
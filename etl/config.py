@@ -0,0 +1,70 @@
+import os
+import threading
+from pathlib import Path
+
+import duckdb
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Dossier des fichiers sources (CSV, JSON, corrections)
+DATA_DIR = os.environ.get("ETL_DATA_DIR", str(PROJECT_ROOT / "data"))
+# Base DuckDB ; ":memory:" garde toute l'exécution en mémoire (tests, benchmarks)
+DB_PATH = os.environ.get("ETL_DB_PATH", str(PROJECT_ROOT / "db" / "db.duckdb"))
+IN_MEMORY = ":memory:"
+# Réglages DuckDB appliqués à la connexion partagée (vide : valeur par défaut de DuckDB)
+DUCKDB_THREADS = os.environ.get("ETL_DUCKDB_THREADS") or None
+DUCKDB_MEMORY_LIMIT = os.environ.get("ETL_DUCKDB_MEMORY_LIMIT") or None
+
+_lock = threading.Lock()
+_connections = {}
+
+
+def data_path(*parts):
+    """Chemin d'un fichier du dossier de données."""
+    return os.path.join(DATA_DIR, *parts)
+
+
+def connection_key(db_path):
+    return db_path if db_path == IN_MEMORY else os.path.abspath(db_path)
+
+
+def apply_settings(con, threads=None, memory_limit=None):
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    if memory_limit:
+        con.execute("SET memory_limit = ?", [str(memory_limit)])
+
+
+def get_connection(db_path=None, threads=None, memory_limit=None):
+    """
+    Connexion DuckDB partagée par toutes les étapes d'une exécution : une
+    seule ouverture par base, réglages threads et memory_limit appliqués à
+    l'ouverture (et à chaque appel qui les précise). Avec ":memory:", les
+    étapes successives voient donc la même base en mémoire.
+    """
+    db_path = str(db_path or DB_PATH)
+    key = connection_key(db_path)
+    with _lock:
+        con = _connections.get(key)
+        if con is None:
+            con = duckdb.connect(db_path)
+            _connections[key] = con
+            threads = threads or DUCKDB_THREADS
+            memory_limit = memory_limit or DUCKDB_MEMORY_LIMIT
+        apply_settings(con, threads, memory_limit)
+    return con
+
+
+def close_connection(db_path=None):
+    """Ferme la connexion partagée d'une base (checkpoint de son WAL)."""
+    with _lock:
+        con = _connections.pop(connection_key(str(db_path or DB_PATH)), None)
+    if con is not None:
+        con.close()
+
+
+def close_connections():
+    with _lock:
+        connections = list(_connections.values())
+        _connections.clear()
+    for con in connections:
+        con.close()
@@ -0,0 +1,93 @@
+import pandas as pd
+from unidecode import unidecode
+
+from config import data_path
+from normalize_cache import apply_memoized
+from team_pairs import TEAM_PAIR_COLUMNS, team_pair_columns
+
+# Table des corrections manuelles 1930-2010, une ligne par match corrigé.
+# Clé : édition (année), paire d'équipes (non ordonnée), ville du match
+# (vide : toute ville). Date et heure sont soit données directement, soit
+# lues dans le fichier datetime via le nom du stade ; replay=1 marque un
+# match d'appui.
+CORRECTIONS_FILE = data_path("corrections_1930_2010.csv")
+
+OVERRIDE_KEYS = ["_year", *TEAM_PAIR_COLUMNS]
+
+
+def normalize_key(value):
+    """Clé de correspondance : translittérée, minuscule, sans espaces ni point final."""
+    return unidecode(str(value)).lower().strip(" .")
+
+
+def normalized(series):
+    return apply_memoized(series.fillna("").astype(str), normalize_key)
+
+
+def add_override_keys(df, year, team1, team2):
+    """Ajoute les colonnes de jointure (_year, _team_lo, _team_hi) normalisées."""
+    return df.assign(
+        _year=df[year].astype("string").str.extract(r"(\d{4})", expand=False),
+        **team_pair_columns(normalized(df[team1]), normalized(df[team2])),
+    )
+
+
+def load_overrides(path=CORRECTIONS_FILE):
+    overrides = pd.read_csv(path, dtype=str, keep_default_na=False)
+    overrides = add_override_keys(overrides, "edition", "team1", "team2")
+    overrides["_venue"] = normalized(overrides["venue"])
+    overrides["_stadium"] = normalized(overrides["stadium"])
+    overrides["replay"] = pd.to_numeric(overrides["replay"], errors="coerce").astype("Int64")
+    overrides[["match_date", "match_time"]] = overrides[["match_date", "match_time"]].replace("", None)
+    return overrides.reset_index(names="override_id")
+
+
+def resolve_stadium_dates(overrides, df_datetime):
+    """
+    Complète date et heure des corrections qui ne donnent qu'un stade, par
+    une seule jointure sur le fichier datetime (première ligne par clé).
+    """
+    keyed = add_override_keys(df_datetime, "_year", "team1", "team2")
+    keyed["_stadium"] = normalized(keyed["Stadium Name"])
+    lookup = keyed.drop_duplicates(subset=OVERRIDE_KEYS + ["_stadium"], keep="first")[
+        OVERRIDE_KEYS + ["_stadium", "Match Date", "Match Time"]
+    ]
+    resolved = overrides.merge(lookup, on=OVERRIDE_KEYS + ["_stadium"], how="left")
+    needs_lookup = resolved["match_date"].isna() & resolved["_stadium"].ne("")
+    resolved.loc[needs_lookup, "match_date"] = resolved.loc[needs_lookup, "Match Date"]
+    resolved.loc[needs_lookup, "match_time"] = resolved.loc[needs_lookup, "Match Time"]
+    return resolved.drop(columns=["Match Date", "Match Time"])
+
+
+def apply_overrides(df, overrides, df_datetime=None):
+    """
+    Applique toutes les corrections en une jointure sur (édition, paire
+    d'équipes), filtrée par ville. Si plusieurs corrections visent un même
+    match, la dernière du fichier l'emporte.
+    Retourne (df corrigé, nombre de matchs touchés par chaque correction).
+    """
+    if df_datetime is not None:
+        overrides = resolve_stadium_dates(overrides, df_datetime)
+
+    keyed = add_override_keys(df, "edition", "team1", "team2")
+    keyed["_venue"] = normalized(df["venue"])
+    hits = keyed[OVERRIDE_KEYS + ["_venue"]].reset_index(names="_row").merge(
+        overrides, on=OVERRIDE_KEYS, how="inner", suffixes=("", "_override")
+    )
+    hits = hits[hits["_venue_override"].eq("") | hits["_venue_override"].eq(hits["_venue"])]
+    matched = hits["override_id"].value_counts().reindex(overrides["override_id"], fill_value=0).set_axis(overrides.index)
+
+    hits = hits.sort_values("override_id").drop_duplicates(subset="_row", keep="last").set_index("_row")
+    df = df.copy()
+    for column, override_column in [("Match Date", "match_date"), ("Match Time", "match_time"), ("Replay", "replay")]:
+        values = hits[override_column].dropna()
+        df.loc[values.index, column] = values.values
+    return df, matched
+
+
+def report_overrides(overrides, matched):
+    """Journalise les corrections appliquées et celles qui ne visent aucun match."""
+    print(f"🩹 Corrections manuelles : {(matched > 0).sum()}/{len(overrides)} appliquées")
+    for i in overrides.index[matched == 0]:
+        row = overrides.loc[i]
+        print(f"  ⚠️  Sans correspondance : {row['edition']} {row['team1']} - {row['team2']} ({row['venue'] or 'toute ville'})")
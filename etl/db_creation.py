@@ -1,44 +1,53 @@
-import duckdb
-def create_db_schema():
-    con = duckdb.connect("./../db/db.duckdb")
+from config import get_connection
+from etl_inserter_2014 import get_key_type
 
-    schema_sql = """
-    CREATE TABLE Teams (
-        team_id UUID PRIMARY KEY,
+# Type des clés de substitution des dimensions (Teams, Rounds, City, MatchTime) :
+# - uuid    : uuid() aléatoire (16 octets, change à chaque rechargement)
+# - integer : entiers denses attribués dans l'ordre de la clé naturelle
+# - hash    : 64 bits de poids fort du md5 de la clé naturelle (stable entre rechargements)
+KEY_TYPES = {
+    "uuid": "UUID",
+    "integer": "INTEGER",
+    "hash": "UBIGINT",
+}
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS Teams (
+        team_id {key} PRIMARY KEY,
         team_name TEXT NOT NULL
     );
 
-    CREATE TABLE MatchTime (
-        time_id UUID PRIMARY KEY,
+    CREATE TABLE IF NOT EXISTS MatchTime (
+        time_id {key} PRIMARY KEY,
         date_ TIMESTAMP,
         day_ INTEGER,
         month_ INTEGER,
         year_ INTEGER
     );
 
-    CREATE TABLE Rounds (
-        round_id UUID PRIMARY KEY,
+    CREATE TABLE IF NOT EXISTS Rounds (
+        round_id {key} PRIMARY KEY,
         round_name TEXT NOT NULL
     );
 
-    CREATE TABLE City (
-        city_id UUID PRIMARY KEY,
+    CREATE TABLE IF NOT EXISTS City (
+        city_id {key} PRIMARY KEY,
         city_name TEXT NOT NULL
     );
 
-    CREATE TABLE Matches (
+    CREATE TABLE IF NOT EXISTS Matches (
         match_id INTEGER PRIMARY KEY,
-        round_id UUID NOT NULL,
-        city_id UUID NOT NULL,
-        time_id UUID NOT NULL,
+        round_id {key} NOT NULL,
+        city_id {key} NOT NULL,
+        time_id {key} NOT NULL,
         FOREIGN KEY (round_id) REFERENCES Rounds(round_id),
         FOREIGN KEY (city_id) REFERENCES City(city_id),
         FOREIGN KEY (time_id) REFERENCES MatchTime(time_id)
     );
 
-    CREATE TABLE Plays (
+    CREATE TABLE IF NOT EXISTS Plays (
         match_id INTEGER,
-        team_id UUID,
+        team_id {key},
         position_ TEXT,
         goal_nb INTEGER,
         result_ TEXT,
@@ -48,5 +57,26 @@ def create_db_schema():
     );
     """
 
-    con.execute(schema_sql)
-    con.close()
+
+def resolve_key_type(db_path=None, key_type=None):
+    """
+    Type de clé du schéma. Sans key_type, une base existante garde son type
+    de clé et une nouvelle base utilise uuid ; un type différent de celui
+    d'une base existante est refusé (les clés étrangères seraient incompatibles).
+    """
+    if key_type is not None and key_type not in KEY_TYPES:
+        raise ValueError(f"Type de clé inconnu : {key_type} (attendu : {', '.join(KEY_TYPES)})")
+
+    existing = get_key_type(get_connection(db_path))
+    if key_type is not None and existing is not None and key_type != existing:
+        raise ValueError(
+            f"La base {db_path} utilise des clés {existing}, pas {key_type} : "
+            f"supprimez-la pour la recréer avec ce type de clé"
+        )
+    return key_type or existing or "uuid"
+
+
+def create_db_schema(db_path=None, key_type=None):
+    """Crée les tables absentes, avec le type de clé donné par resolve_key_type."""
+    key_type = resolve_key_type(db_path, key_type)
+    get_connection(db_path).execute(SCHEMA_SQL.format(key=KEY_TYPES[key_type]))
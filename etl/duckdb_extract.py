@@ -0,0 +1,616 @@
+import os
+import shutil
+import tempfile
+
+import duckdb
+
+import corrections
+import etl_1930_2010
+import etl_2014
+import etl_2018
+import etl_2022
+import etl_clean_1930_2010
+from etl_inserter_2014 import STAGING_COLUMNS
+from instrumentation import stage
+from source_schema import concat_canonical, keeps_undated
+
+# Extraction entièrement dans DuckDB : read_csv / read_json_objects lisent les
+# sources, les règles de normalisation des extracteurs pandas sont des macros
+# SQL (tables de correspondance générées depuis les mêmes dictionnaires), et
+# le résultat est directement la table staging_matches de load_matches.
+# Aucune ligne ne passe par des objets Python.
+
+# Valeurs lues comme manquantes par pandas.read_csv (na_values par défaut)
+PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+# strip_accents ne traite que les accents combinables : les autres caractères
+# des sources sont translittérés comme le fait unidecode
+TRANSLITERATIONS = {
+    "ø": "o", "Ø": "O", "ł": "l", "Ł": "L", "đ": "d", "Đ": "D", "ı": "i",
+    "ß": "ss", "æ": "ae", "Æ": "AE", "œ": "oe", "Œ": "OE", "þ": "th", "ð": "d",
+    "ə": "@", "¿": "?", "½": " 1/2", "’": "'",
+}
+
+# Colonnes lues dans les fichiers 1930-2010 (les autres ne sont pas matérialisées)
+MATCHES_1930_COLUMNS = ["edition", "round", "team1", "team2", "venue", "score"]
+DATETIME_1930_COLUMNS = [
+    "Tournament Id", "Stage Name", "Home Team Name", "Away Team Name",
+    "Replay", "Match Date", "Match Time", "Stadium Name",
+]
+
+# Fichier datetime 1930-2022 : octets cp1252 (0x96) que le lecteur latin-1 de
+# DuckDB refuse ; il est transcodé une fois en UTF-8 comme le lit pandas
+DATETIME_ENCODING = "latin1"
+# 5 lignes de 1994 sont entièrement entre guillemets : comme pandas, elles
+# donnent un seul champ et des colonnes vides
+DATETIME_CSV_OPTIONS = {"delim": "','", "quote": "'\"'", "strict_mode": "false", "null_padding": "true"}
+
+# Le JSON 2018 est un seul objet : sa taille maximale est celle du fichier
+JSON_MAX_BYTES = 1 << 31
+
+SOURCE_TABLES = {
+    "1930-2010": "src_1930",
+    "2014": "src_2014",
+    "2018": "src_2018",
+    "2022": "src_2022",
+}
+
+
+def sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def case_map(expr, mapping, default):
+    """CASE expr WHEN clé THEN valeur ... ELSE default END, depuis un dictionnaire Python."""
+    whens = " ".join(f"WHEN {sql_literal(k)} THEN {sql_literal(v)}" for k, v in mapping.items())
+    return f"CASE {expr} {whens} ELSE {default} END"
+
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def distinct_map(name, source, columns, expr):
+    """
+    CTE name(value, result) : expr (fonction de value) n'est évaluée qu'une fois
+    par valeur distincte des colonnes, comme apply_memoized côté pandas.
+    """
+    values = " UNION ".join(f"SELECT DISTINCT {column} AS value FROM {source}" for column in columns)
+    return f"{name} AS (SELECT value, {expr} AS result FROM ({values}))"
+
+
+def read_csv_sql(path, **options):
+    options = {"header": "true", "all_varchar": "true", "nullstr": PANDAS_NA_VALUES, **options}
+    rendered = ", ".join(
+        f"{name} = [{', '.join(map(sql_literal, value))}]" if isinstance(value, list)
+        else f"{name} = {value}"
+        for name, value in options.items()
+    )
+    return f"read_csv({sql_literal(path)}, {rendered})"
+
+
+# Clé de ROUND_MAPPING : round nettoyé sans espaces
+REPLACE_SPACES = "replace(clean_text_1930(v), ' ', '')"
+
+
+def build_macros():
+    # Un seul translate() pour les remplacements d'un caractère, replace() pour les autres
+    single = {char: repl for char, repl in TRANSLITERATIONS.items() if len(repl) == 1}
+    fold = f"translate(strip_accents(s), {sql_literal(''.join(single))}, {sql_literal(''.join(single.values()))})"
+    for char, replacement in TRANSLITERATIONS.items():
+        if char not in single:
+            fold = f"replace({fold}, {sql_literal(char)}, {sql_literal(replacement)})"
+    team_1930 = case_map(
+        "upper(t)", {k.upper(): v for k, v in etl_1930_2010.TEAM_REPLACEMENTS.items()}, "t"
+    )
+    return [
+        # str.strip() et unidecode de Python
+        "CREATE OR REPLACE TEMP MACRO py_strip(s) AS trim(s, ' \t\n\r\f\v')",
+        # strlen compte les octets et length les caractères : égaux pour une chaîne ASCII
+        f"CREATE OR REPLACE TEMP MACRO ascii_fold(s) AS CASE WHEN strlen(s) = length(s) THEN s ELSE {fold} END",
+        "CREATE OR REPLACE TEMP MACRO year_of(s) AS nullif(regexp_extract(s, '(\\d{4})', 1), '')",
+        "CREATE OR REPLACE TEMP MACRO is_blank(s) AS s IS NULL OR py_strip(s) = ''",
+        "CREATE OR REPLACE TEMP MACRO fold_lower(s) AS py_strip(lower(ascii_fold(s)))",
+        # 1930-2010, etl_1930_2010.py
+        """
+        CREATE OR REPLACE TEMP MACRO round_1930_upper(r) AS CASE
+            WHEN contains(r, 'GROUP') AND contains(r, 'STAGE') THEN 'group stage'
+            WHEN contains(r, '1/8') OR contains(r, 'FIRST') OR contains(r, 'ROUND OF 16') THEN 'round of 16'
+            WHEN contains(r, '1/4') OR contains(r, 'QUARTER') THEN 'quarter-finals'
+            WHEN contains(r, '1/2') OR contains(r, 'SEMI') THEN 'semi-finals'
+            WHEN contains(r, 'PLACES_3') OR contains(r, '3RD') OR contains(r, 'THIRD') THEN 'third-place match'
+            WHEN contains(r, 'QUARTERFINAL_STAGE') OR contains(r, 'SEMIFINAL_STAGE') THEN 'second group stage'
+            WHEN contains(r, 'FINAL_ROUND') THEN 'final round'
+            WHEN r = 'FINAL' THEN 'final'
+            ELSE lower(r)
+        END
+        """,
+        "CREATE OR REPLACE TEMP MACRO round_1930(r) AS coalesce(round_1930_upper(upper(py_strip(r))), '')",
+        f"CREATE OR REPLACE TEMP MACRO team_1930_mapped(t) AS {team_1930}",
+        "CREATE OR REPLACE TEMP MACRO team_1930(t) AS "
+        "coalesce(team_1930_mapped(py_strip(split_part(py_strip(t), '(', 1))), '')",
+        "CREATE OR REPLACE TEMP MACRO override_key(s) AS trim(lower(ascii_fold(coalesce(s, ''))), ' .')",
+        # 1930-2010, etl_clean_1930_2010.py
+        "CREATE OR REPLACE TEMP MACRO clean_text_1930(v) AS CASE WHEN is_blank(v) THEN 'unknown' "
+        "ELSE regexp_replace(regexp_replace(fold_lower(v), '[^a-z0-9\\s]', '', 'g'), '\\s+', ' ', 'g') END",
+        f"CREATE OR REPLACE TEMP MACRO clean_round_1930(v) AS "
+        f"{case_map(REPLACE_SPACES, etl_clean_1930_2010.ROUND_MAPPING, 'clean_text_1930(v)')}",
+        # clean_venue : city_to_english puis normalize_city en une seule expression
+        "CREATE OR REPLACE TEMP MACRO venue_1930(v) AS "
+        "CASE WHEN is_blank(replace(replace(fold_lower(v), '.', ''), '_', ' ')) THEN 'unknown' "
+        "ELSE regexp_replace(regexp_replace(py_strip(replace(replace(fold_lower(v), '.', ''), '_', ' ')), "
+        "'[^a-z\\s-]', '', 'g'), '\\s+', ' ', 'g') END",
+        # 2014, etl_2014.py (l'index geonames sans noms alternatifs renvoie le nom nettoyé)
+        f"CREATE OR REPLACE TEMP MACRO stage_2014_key(k) AS {case_map('k', etl_2014.STAGE_MAP, 'k')}",
+        "CREATE OR REPLACE TEMP MACRO stage_2014(s) AS CASE WHEN s IS NULL THEN 'unknown' "
+        "ELSE stage_2014_key(replace(replace(fold_lower(s), '_', ' '), '-', ' ')) END",
+        "CREATE OR REPLACE TEMP MACRO city_2014(v) AS CASE WHEN is_blank(v) THEN 'unknown' ELSE fold_lower(v) END",
+        f"CREATE OR REPLACE TEMP MACRO country_2014_key(k) AS {case_map('k', etl_2014.COUNTRY_FIX_MAP, 'k')}",
+        "CREATE OR REPLACE TEMP MACRO country_2014(v) AS CASE WHEN is_blank(v) THEN 'unknown' "
+        "ELSE country_2014_key(fold_lower(v)) END",
+        # 2018, etl_2018.py
+        "CREATE OR REPLACE TEMP MACRO text_2018(v) AS CASE WHEN v IS NULL OR v = '' THEN 'unknown' "
+        "ELSE fold_lower(v) END",
+        """
+        CREATE OR REPLACE TEMP MACRO stage_2018_clean(v) AS CASE
+            WHEN contains(v, 'group') THEN 'group'
+            WHEN contains(v, 'round of 16') THEN 'round of 16'
+            WHEN contains(v, 'quarter') THEN 'quarter-final'
+            WHEN contains(v, 'semi') THEN 'semi-final'
+            WHEN contains(v, 'third') THEN 'play-off for third place'
+            WHEN contains(v, 'final') THEN 'final'
+            ELSE v
+        END
+        """,
+        "CREATE OR REPLACE TEMP MACRO stage_2018(v) AS stage_2018_clean(text_2018(v))",
+        # 2022, etl_2022.py
+        f"CREATE OR REPLACE TEMP MACRO team_2022_key(k) AS {case_map('k', etl_2022.TEAM_NAME_MAPPING, 'k')}",
+        "CREATE OR REPLACE TEMP MACRO team_2022(t) AS team_2022_key(coalesce(py_strip(lower(t)), 'nan'))",
+        f"CREATE OR REPLACE TEMP MACRO stage_2022(c) AS "
+        f"{case_map('py_strip(lower(c))', etl_2022.STAGE_MAP, sql_literal('unknown'))}",
+        # Résultats 1930-2010 et 2018 (winner / loser / draw, vides si un score manque)
+        """
+        CREATE OR REPLACE TEMP MACRO match_result(goals, other) AS CASE
+            WHEN goals IS NULL OR other IS NULL THEN NULL
+            WHEN goals > other THEN 'winner'
+            WHEN goals < other THEN 'loser'
+            ELSE 'draw'
+        END
+        """,
+    ]
+
+
+def steps_1930(workdir):
+    datetime_file = transcode_to_utf8(etl_1930_2010.DATETIME_FILE, DATETIME_ENCODING, workdir)
+    # try_strptime avec une liste : premier format qui convient, dans l'ordre de DATETIME_FORMATS
+    datetime_formats = f"[{', '.join(sql_literal(fmt) for fmt in etl_1930_2010.DATETIME_FORMATS)}]"
+    return [
+        ("1930.read", f"""
+        CREATE OR REPLACE TEMP TABLE raw_1930 AS
+        SELECT {", ".join(MATCHES_1930_COLUMNS)} FROM {read_csv_sql(etl_1930_2010.INPUT_FILE)};
+        CREATE OR REPLACE TEMP TABLE raw_1930_datetime AS
+        SELECT {", ".join(map(quote_ident, DATETIME_1930_COLUMNS))} FROM {read_csv_sql(datetime_file, **DATETIME_CSV_OPTIONS)};
+        CREATE OR REPLACE TEMP TABLE raw_1930_corrections AS
+        SELECT * FROM {read_csv_sql(corrections.CORRECTIONS_FILE, nullstr=[''])};
+        """),
+        # Filtre, normalisation des rounds et équipes, correction 2002, matchs d'appui
+        ("1930.normalize", f"""
+        CREATE OR REPLACE TEMP TABLE m1930 AS
+        WITH {distinct_map("rounds", "raw_1930", ["round"], "round_1930(value)")},
+        {distinct_map("teams", "raw_1930", ["team1", "team2"], "team_1930(value)")},
+        filtered AS (
+            SELECT
+                m.rowid AS _row,
+                edition,
+                r.result AS round,
+                h.result AS team1,
+                a.result AS team2,
+                venue,
+                score,
+                year_of(edition) AS _year
+            FROM raw_1930 m
+            LEFT JOIN rounds r ON r.value IS NOT DISTINCT FROM m.round
+            LEFT JOIN teams h ON h.value IS NOT DISTINCT FROM m.team1
+            LEFT JOIN teams a ON a.value IS NOT DISTINCT FROM m.team2
+            WHERE NOT coalesce(contains(upper(m.round), 'PRELIMINARY'), false)
+              AND NOT coalesce(contains(edition, '2014'), false)
+        ), fixed AS (
+            SELECT * REPLACE (
+                CASE WHEN lower(team2) = 'slovakia' AND TRY_CAST(_year AS INTEGER) = 2002
+                     THEN 'Slovenia' ELSE team2 END AS team2
+            )
+            FROM filtered
+        )
+        SELECT
+            *,
+            least(team1, team2) AS _team_lo,
+            greatest(team1, team2) AS _team_hi,
+            CASE WHEN ROW_NUMBER() OVER (PARTITION BY edition, round, team1, team2 ORDER BY _row) > 1
+                 THEN 1 ELSE 0 END AS replay
+        FROM fixed;
+
+        CREATE OR REPLACE TEMP TABLE dt1930 AS
+        WITH {distinct_map("rounds", "raw_1930_datetime", ['"Stage Name"'], "round_1930(value)")},
+        {distinct_map("teams", "raw_1930_datetime", ['"Home Team Name"', '"Away Team Name"'], "team_1930(value)")}
+        SELECT
+            d.rowid AS _row,
+            year_of("Tournament Id") AS _year,
+            r.result AS round,
+            least(h.result, a.result) AS _team_lo,
+            greatest(h.result, a.result) AS _team_hi,
+            coalesce(TRY_CAST("Replay" AS DOUBLE), 0)::INTEGER AS replay,
+            "Match Date" AS match_date,
+            "Match Time" AS match_time,
+            "Stadium Name" AS stadium
+        FROM raw_1930_datetime d
+        LEFT JOIN rounds r ON r.value IS NOT DISTINCT FROM d."Stage Name"
+        LEFT JOIN teams h ON h.value IS NOT DISTINCT FROM d."Home Team Name"
+        LEFT JOIN teams a ON a.value IS NOT DISTINCT FROM d."Away Team Name"
+        ORDER BY _row;
+        """),
+        # Date et heure : premier match du fichier datetime au niveau de clé le plus précis
+        ("1930.dates", """
+        CREATE OR REPLACE TEMP TABLE dated1930 AS
+        WITH tier1 AS (
+            SELECT _year, round, _team_lo, _team_hi, replay, match_date, match_time
+            FROM dt1930 WHERE _year IS NOT NULL
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY _year, round, _team_lo, _team_hi, replay ORDER BY _row) = 1
+        ), tier2 AS (
+            SELECT _year, round, _team_lo, _team_hi, match_date, match_time
+            FROM dt1930 WHERE _year IS NOT NULL
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY _year, round, _team_lo, _team_hi ORDER BY _row) = 1
+        ), tier3 AS (
+            SELECT _year, _team_lo, _team_hi, match_date, match_time
+            FROM dt1930 WHERE _year IS NOT NULL
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY _year, _team_lo, _team_hi ORDER BY _row) = 1
+        )
+        SELECT
+            m.*,
+            CASE WHEN t1._year IS NOT NULL THEN t1.match_date
+                 WHEN t2._year IS NOT NULL THEN t2.match_date
+                 ELSE t3.match_date END AS match_date,
+            CASE WHEN t1._year IS NOT NULL THEN t1.match_time
+                 WHEN t2._year IS NOT NULL THEN t2.match_time
+                 ELSE t3.match_time END AS match_time
+        FROM m1930 m
+        LEFT JOIN tier1 t1 USING (_year, round, _team_lo, _team_hi, replay)
+        LEFT JOIN tier2 t2 USING (_year, round, _team_lo, _team_hi)
+        LEFT JOIN tier3 t3 USING (_year, _team_lo, _team_hi);
+        """),
+        # Corrections manuelles (corrections.py) : une jointure, la dernière correction l'emporte
+        ("1930.corrections", f"""
+        CREATE OR REPLACE TEMP TABLE corrected1930 AS
+        WITH {distinct_map("stadium_names", "dt1930", ["_team_lo", "_team_hi", "stadium"], "override_key(value)")},
+        {distinct_map("match_names", "dated1930", ["team1", "team2", "venue"], "override_key(value)")},
+        overrides AS (
+            SELECT
+                rowid AS override_id,
+                year_of(edition) AS _year,
+                least(override_key(team1), override_key(team2)) AS _team_lo,
+                greatest(override_key(team1), override_key(team2)) AS _team_hi,
+                override_key(venue) AS _venue,
+                override_key(stadium) AS _stadium,
+                nullif(match_date, '') AS match_date,
+                nullif(match_time, '') AS match_time
+            FROM raw_1930_corrections
+        ), stadium_keys AS (
+            SELECT d._row, d._year, t1.result AS k1, t2.result AS k2, s.result AS _stadium, d.match_date, d.match_time
+            FROM dt1930 d
+            LEFT JOIN stadium_names t1 ON t1.value IS NOT DISTINCT FROM d._team_lo
+            LEFT JOIN stadium_names t2 ON t2.value IS NOT DISTINCT FROM d._team_hi
+            LEFT JOIN stadium_names s ON s.value IS NOT DISTINCT FROM d.stadium
+        ), stadium_dates AS (
+            SELECT _year, least(k1, k2) AS _team_lo, greatest(k1, k2) AS _team_hi, _stadium, match_date, match_time
+            FROM stadium_keys
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY _year, least(k1, k2), greatest(k1, k2), _stadium ORDER BY _row) = 1
+        ), resolved AS (
+            SELECT
+                o.override_id, o._year, o._team_lo, o._team_hi, o._venue,
+                CASE WHEN o.match_date IS NULL AND o._stadium <> '' THEN s.match_date ELSE o.match_date END AS match_date,
+                CASE WHEN o.match_date IS NULL AND o._stadium <> '' THEN s.match_time ELSE o.match_time END AS match_time
+            FROM overrides o
+            LEFT JOIN stadium_dates s USING (_year, _team_lo, _team_hi, _stadium)
+        ), match_keys AS (
+            SELECT m._row, m._year, t1.result AS k1, t2.result AS k2, v.result AS _venue
+            FROM dated1930 m
+            LEFT JOIN match_names t1 ON t1.value IS NOT DISTINCT FROM m.team1
+            LEFT JOIN match_names t2 ON t2.value IS NOT DISTINCT FROM m.team2
+            LEFT JOIN match_names v ON v.value IS NOT DISTINCT FROM m.venue
+        ), hits AS (
+            SELECT m._row, r.match_date, r.match_time
+            FROM match_keys m
+            JOIN resolved r
+              ON r._year = m._year
+             AND r._team_lo = least(m.k1, m.k2)
+             AND r._team_hi = greatest(m.k1, m.k2)
+             AND (r._venue = '' OR r._venue = m._venue)
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY m._row ORDER BY r.override_id DESC) = 1
+        )
+        SELECT m.* REPLACE (
+            coalesce(h.match_date, m.match_date) AS match_date,
+            coalesce(h.match_time, m.match_time) AS match_time
+        )
+        FROM dated1930 m
+        LEFT JOIN hits h USING (_row);
+        """),
+        # Datetime, puis nettoyage final de etl_clean_1930_2010.py
+        ("1930.clean", f"""
+        CREATE OR REPLACE TEMP TABLE src_1930 AS
+        WITH strings AS (
+            SELECT
+                *,
+                CASE WHEN NOT is_blank(match_date) AND NOT is_blank(match_time)
+                      AND lower(py_strip(match_date)) <> 'none' AND lower(py_strip(match_time)) <> 'none'
+                     THEN py_strip(match_date) || ' ' || py_strip(match_time) END AS dt_str,
+                TRY_CAST(nullif(regexp_extract(score, '(\\d+)\\s*[-–]\\s*(\\d+)', 1), '') AS INTEGER) AS home_goals,
+                TRY_CAST(nullif(regexp_extract(score, '(\\d+)\\s*[-–]\\s*(\\d+)', 2), '') AS INTEGER) AS away_goals
+            FROM corrected1930
+        ),
+        {distinct_map("datetimes", "strings", ["dt_str"],
+                      f"coalesce(try_strptime(value, {datetime_formats}), TRY_CAST(value AS TIMESTAMP))")},
+        {distinct_map("rounds", "strings", ["round"], "clean_round_1930(value)")},
+        {distinct_map("cities", "strings", ["venue"], "venue_1930(value)")},
+        {distinct_map("teams", "strings", ["team1", "team2"], "clean_text_1930(value)")}
+        SELECT
+            d.result AS "Datetime",
+            r.result AS "Stage",
+            c.result AS "City",
+            h.result AS "Home Team Name",
+            home_goals AS "Home Team Goals",
+            away_goals AS "Away Team Goals",
+            a.result AS "Away Team Name",
+            match_result(home_goals, away_goals) AS "Home Result",
+            match_result(away_goals, home_goals) AS "Away Result"
+        FROM strings s
+        LEFT JOIN datetimes d ON d.value IS NOT DISTINCT FROM s.dt_str
+        LEFT JOIN rounds r ON r.value IS NOT DISTINCT FROM s.round
+        LEFT JOIN cities c ON c.value IS NOT DISTINCT FROM s.venue
+        LEFT JOIN teams h ON h.value IS NOT DISTINCT FROM s.team1
+        LEFT JOIN teams a ON a.value IS NOT DISTINCT FROM s.team2
+        ORDER BY s._row;
+        """),
+    ]
+
+
+def steps_2014(workdir):
+    return [
+        ("2014.read", f"""
+        CREATE OR REPLACE TEMP TABLE src_2014 AS
+        WITH raw AS (
+            SELECT DISTINCT
+                try_strptime(py_strip("Datetime"), '%d %b %Y - %H:%M') AS dt,
+                "Stage" AS stage,
+                "City" AS city,
+                "Home Team Name" AS home_team,
+                TRY_CAST("Home Team Goals" AS DOUBLE)::INTEGER AS home_goals,
+                TRY_CAST("Away Team Goals" AS DOUBLE)::INTEGER AS away_goals,
+                "Away Team Name" AS away_team,
+                "Win conditions" AS win_conditions
+            FROM {read_csv_sql(etl_2014.INPUT_FILE, delim=sql_literal(';'), encoding=sql_literal('latin-1'))}
+        ), scored AS (
+            SELECT
+                *,
+                nullif(regexp_extract(replace(py_strip(win_conditions), ' ', ''), '(\\d+)-(\\d+)', 1), '')::INTEGER AS score_home,
+                nullif(regexp_extract(replace(py_strip(win_conditions), ' ', ''), '(\\d+)-(\\d+)', 2), '')::INTEGER AS score_away
+            FROM raw
+        )
+        SELECT
+            dt AS "Datetime",
+            stage_2014(stage) AS "Stage",
+            city_2014(city) AS "City",
+            country_2014(home_team) AS "Home Team Name",
+            home_goals AS "Home Team Goals",
+            away_goals AS "Away Team Goals",
+            country_2014(away_team) AS "Away Team Name",
+            CASE WHEN home_goals > away_goals THEN 'winner'
+                 WHEN away_goals > home_goals THEN 'loser'
+                 WHEN home_goals = away_goals AND score_home > score_away THEN 'winner'
+                 WHEN home_goals = away_goals AND score_away > score_home THEN 'loser'
+                 ELSE 'draw' END AS "Home Result",
+            CASE WHEN home_goals > away_goals THEN 'loser'
+                 WHEN away_goals > home_goals THEN 'winner'
+                 WHEN home_goals = away_goals AND score_home > score_away THEN 'loser'
+                 WHEN home_goals = away_goals AND score_away > score_home THEN 'winner'
+                 ELSE 'draw' END AS "Away Result"
+        FROM scored;
+        """),
+    ]
+
+
+def steps_2018(workdir):
+    section = (
+        "MAP(VARCHAR, STRUCT(name VARCHAR, matches STRUCT(date VARCHAR, stadium VARCHAR, home_team VARCHAR, "
+        "away_team VARCHAR, home_result DOUBLE, away_result DOUBLE)[]))"
+    )
+    # Schéma imposé : DuckDB lit directement les champs utiles, sans garder le JSON en texte
+    columns = {
+        "teams": "STRUCT(id VARCHAR, name VARCHAR)[]",
+        "stadiums": "STRUCT(id VARCHAR, city VARCHAR)[]",
+        "groups": section,
+        "knockout": section,
+    }
+    return [
+        ("2018.read", f"""
+        CREATE OR REPLACE TEMP TABLE src_2018 AS
+        WITH doc AS (
+            SELECT * FROM read_json(
+                {sql_literal(etl_2018.INPUT_FILE)},
+                columns = {{{", ".join(f"{sql_literal(k)}: {sql_literal(v)}" for k, v in columns.items())}}},
+                maximum_object_size = {JSON_MAX_BYTES}
+            )
+        ), teams AS (
+            SELECT t.id, t.name FROM (SELECT unnest(teams) AS t FROM doc)
+        ), stadiums AS (
+            SELECT s.id, s.city FROM (SELECT unnest(stadiums) AS s FROM doc)
+        ), sections AS (
+            SELECT unnest(map_values(groups)) AS section FROM doc
+            UNION ALL
+            SELECT unnest(map_values(knockout)) FROM doc
+        ), matches AS (
+            SELECT
+                round_name,
+                m.date AS date_,
+                m.stadium,
+                m.home_team,
+                m.away_team,
+                coalesce(m.home_result, 0)::INTEGER AS home_goals,
+                coalesce(m.away_result, 0)::INTEGER AS away_goals
+            FROM (SELECT section.name AS round_name, unnest(section.matches) AS m FROM sections)
+        )
+        SELECT
+            timezone('UTC', CAST(date_ AS TIMESTAMPTZ)) AS "Datetime",
+            stage_2018(round_name) AS "Stage",
+            text_2018(s.city) AS "City",
+            text_2018(h.name) AS "Home Team Name",
+            home_goals AS "Home Team Goals",
+            away_goals AS "Away Team Goals",
+            text_2018(a.name) AS "Away Team Name",
+            match_result(home_goals, away_goals) AS "Home Result",
+            match_result(away_goals, home_goals) AS "Away Result"
+        FROM matches
+        LEFT JOIN stadiums s ON s.id = matches.stadium
+        LEFT JOIN teams h ON h.id = matches.home_team
+        LEFT JOIN teams a ON a.id = matches.away_team;
+        """),
+    ]
+
+
+def steps_2022(workdir):
+    matches_file, venues_file, mapping_file = etl_2022.INPUT_FILES
+    return [
+        ("2022.read", f"""
+        CREATE OR REPLACE TEMP TABLE src_2022 AS
+        WITH stats AS (
+            SELECT
+                team_2022(team1) AS team1,
+                team_2022(team2) AS team2,
+                "number of goals team1" AS goals1,
+                "number of goals team2" AS goals2,
+                try_strptime("date", '%d %b %Y') AS date_clean,
+                stage_2022(category) AS round_clean
+            FROM {read_csv_sql(matches_file)}
+        ), venues AS (
+            SELECT
+                team_2022(home_team) AS home_team,
+                team_2022(away_team) AS away_team,
+                TRY_CAST(match_time AS TIMESTAMP) AS date_clean,
+                venue
+            FROM {read_csv_sql(venues_file)}
+        ), stadium_cities AS (
+            -- dernière ligne par stade, comme le dictionnaire de etl_2022.py
+            SELECT stadium, arg_max(city, _row) AS city
+            FROM (
+                SELECT *, ROW_NUMBER() OVER () AS _row
+                FROM {read_csv_sql(mapping_file, names=['stadium', 'city'])}
+            )
+            GROUP BY stadium
+        ), merged AS (
+            SELECT
+                v.date_clean AS dt,
+                s.round_clean,
+                v.venue,
+                s.team1,
+                s.team2,
+                coalesce(TRY_CAST(s.goals1 AS DOUBLE), 0)::INTEGER AS home_goals,
+                coalesce(TRY_CAST(s.goals2 AS DOUBLE), 0)::INTEGER AS away_goals
+            FROM stats s
+            JOIN venues v
+              ON least(s.team1, s.team2) = least(v.home_team, v.away_team)
+             AND greatest(s.team1, s.team2) = greatest(v.home_team, v.away_team)
+             AND date_trunc('day', s.date_clean) = date_trunc('day', v.date_clean)
+        )
+        SELECT DISTINCT
+            dt AS "Datetime",
+            round_clean AS "Stage",
+            coalesce(c.city, 'Unknown') AS "City",
+            team1 AS "Home Team Name",
+            home_goals AS "Home Team Goals",
+            away_goals AS "Away Team Goals",
+            team2 AS "Away Team Name",
+            CASE WHEN home_goals > away_goals THEN 'win' WHEN home_goals < away_goals THEN 'loss' ELSE 'draw' END AS "Home Result",
+            CASE WHEN home_goals > away_goals THEN 'loss' WHEN home_goals < away_goals THEN 'win' ELSE 'draw' END AS "Away Result"
+        FROM merged
+        LEFT JOIN stadium_cities c ON c.stadium = merged.venue;
+        """),
+    ]
+
+
+SOURCE_STEPS = {
+    "1930-2010": steps_1930,
+    "2014": steps_2014,
+    "2018": steps_2018,
+    "2022": steps_2022,
+}
+
+TEMP_TABLES = [
+    "raw_1930", "raw_1930_datetime", "raw_1930_corrections", "m1930", "dt1930",
+    "dated1930", "corrected1930", *SOURCE_TABLES.values(),
+]
+
+
+def transcode_to_utf8(path, encoding, workdir, chunk_size=1 << 20):
+    """Copie path en UTF-8 dans workdir, par blocs, pour le lecteur CSV de DuckDB."""
+    target = os.path.join(workdir, os.path.basename(path))
+    with open(path, encoding=encoding, newline="") as src, open(target, "w", encoding="utf-8", newline="") as dst:
+        shutil.copyfileobj(src, dst, chunk_size)
+    return target
+
+
+def edition_where(source, editions):
+    """Filtre --edition d'une source, mêmes règles que main.edition_mask."""
+    if not editions:
+        return ""
+    where = f'year("Datetime") IN ({", ".join(str(int(year)) for year in editions)})'
+    if keeps_undated(source, editions):
+        where += ' OR "Datetime" IS NULL'
+    return f" WHERE {where}"
+
+
+def stage_sources(con, sources=None, editions=None):
+    """
+    Extrait les sources demandées (toutes par défaut) dans DuckDB et crée la
+    table temporaire staging_matches, aux colonnes et types de STAGING_COLUMNS,
+    filtrée sur editions. Retourne le nombre de lignes par source.
+    """
+    sources = list(SOURCE_STEPS) if sources is None else list(sources)
+    unknown = set(sources) - set(SOURCE_STEPS)
+    if unknown:
+        raise ValueError(f"Source inconnue : {', '.join(sorted(unknown))} (attendu : {', '.join(SOURCE_STEPS)})")
+
+    for macro in build_macros():
+        con.execute(macro)
+
+    counts = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in sources:
+            with stage(f"duckdb.{name}") as record:
+                for _, sql in SOURCE_STEPS[name](workdir):
+                    con.execute(sql)
+                counts[name] = con.execute(f"SELECT COUNT(*) FROM {SOURCE_TABLES[name]}").fetchone()[0]
+                record["rows_out"] = counts[name]
+
+    types = {"timestamp": "TIMESTAMP", "text": "VARCHAR", "int": "INTEGER"}
+    columns = ", ".join(f'CAST("{col}" AS {types[kind]}) AS "{col}"' for col, kind in STAGING_COLUMNS.items())
+    union = " UNION ALL ".join(
+        f"SELECT {columns} FROM {SOURCE_TABLES[name]}{edition_where(name, editions)}" for name in sources
+    )
+    with stage("duckdb.merge", rows_in=sum(counts.values())) as record:
+        con.execute(f"CREATE OR REPLACE TEMP TABLE staging_matches AS {union}")
+        record["rows_out"] = con.execute("SELECT COUNT(*) FROM staging_matches").fetchone()[0]
+
+    for table in TEMP_TABLES:
+        con.execute(f"DROP TABLE IF EXISTS {table}")
+    return counts
+
+
+def extract_frame(sources=None, editions=None):
+    """DataFrame fusionné produit par DuckDB (même contenu que main.merge_data)."""
+    con = duckdb.connect()
+    try:
+        stage_sources(con, sources, editions)
+        return concat_canonical([con.table("staging_matches").df()])
+    finally:
+        con.close()
@@ -1,11 +1,17 @@
 import pandas as pd
 from unidecode import unidecode
+from normalize_cache import apply_memoized
+import corrections
+from config import data_path
+from instrumentation import instrumented, stage
+from team_pairs import TEAM_PAIR_COLUMNS, team_pair_columns
 
 # =========================
 # CONFIGURATION
 # =========================
-INPUT_FILE = "./../data/WorldCupMatches1930-2010.csv"
-DATETIME_FILE = "./../data/WorldCupMatches1930-2022-datetime.csv"
+INPUT_FILE = data_path("WorldCupMatches1930-2010.csv")
+DATETIME_FILE = data_path("WorldCupMatches1930-2022-datetime.csv")
+CORRECTIONS_FILE = corrections.CORRECTIONS_FILE
 
 # =========================
 # FONCTIONS UTILITAIRES
@@ -36,6 +42,15 @@ def normalize_round(round_str):
     
     return r.lower()
 
+# Remplacements spécifiques des noms d'équipes (comparaison sans casse)
+TEAM_REPLACEMENTS = {
+    "USA": "United States",
+    "FRG": "West Germany",
+    "GDR": "East Germany",
+    "Serbia-Montenegro": "Serbia and Montenegro",
+    "Ireland": "Republic of Ireland",
+}
+
 def normalize_team(team_str):
     """Normalise les noms d'équipes"""
     if pd.isna(team_str):
@@ -45,16 +60,7 @@ def normalize_team(team_str):
     team = str(team_str).strip()
     team = team.split("(")[0].strip()
     
-    # Remplacements spécifiques
-    replacements = {
-        "USA": "United States",
-        "FRG": "West Germany",
-        "GDR": "East Germany",
-        "Serbia-Montenegro": "Serbia and Montenegro",
-        "Ireland": "Republic of Ireland",
-    }
-    
-    for old, new in replacements.items():
+    for old, new in TEAM_REPLACEMENTS.items():
         if team.upper() == old.upper():
             return new
     
@@ -66,96 +72,109 @@ def city_to_english(city):
         return "unknown"
     return unidecode(str(city)).lower().strip().replace(".", "").replace("_", " ")
 
-def get_match_date(row, df_dt):
-    """Trouve la date/heure d'un match avec plusieurs niveaux de fallback"""
-    
-    # Niveau 1 : Match exact (année + round + équipes + replay)
-    filt = (
-        (df_dt["_year"] == row["_year"]) &
-        (df_dt["round"] == row["round"]) &
-        (df_dt["Replay"] == row["Replay"]) &
-        (
-            ((df_dt["team1"] == row["team1"]) & (df_dt["team2"] == row["team2"])) |
-            ((df_dt["team1"] == row["team2"]) & (df_dt["team2"] == row["team1"]))
-        )
-    )
-    match = df_dt[filt]
-    if not match.empty:
-        return match.iloc[0]["Match Date"], match.iloc[0]["Match Time"]
-    
-    # Niveau 2 : Sans vérifier Replay
-    filt = (
-        (df_dt["_year"] == row["_year"]) &
-        (df_dt["round"] == row["round"]) &
-        (
-            ((df_dt["team1"] == row["team1"]) & (df_dt["team2"] == row["team2"])) |
-            ((df_dt["team1"] == row["team2"]) & (df_dt["team2"] == row["team1"]))
-        )
-    )
-    match = df_dt[filt]
-    if not match.empty:
-        if len(match) > 1:
-            replay_match = match[match["Replay"] == row["Replay"]]
-            if not replay_match.empty:
-                match = replay_match
-        return match.iloc[0]["Match Date"], match.iloc[0]["Match Time"]
-    
-    # Niveau 3 : Juste année + équipes
-    filt = (
-        (df_dt["_year"] == row["_year"]) &
-        (
-            ((df_dt["team1"] == row["team1"]) & (df_dt["team2"] == row["team2"])) |
-            ((df_dt["team1"] == row["team2"]) & (df_dt["team2"] == row["team1"]))
+# Clés de recherche, du plus précis au plus permissif : année + round + paire
+# d'équipes + replay, puis sans replay, puis année + paire d'équipes seulement
+DATE_LOOKUP_TIERS = [
+    ["_year", "round", *TEAM_PAIR_COLUMNS, "Replay"],
+    ["_year", "round", *TEAM_PAIR_COLUMNS],
+    ["_year", *TEAM_PAIR_COLUMNS],
+]
+
+def add_team_pair_keys(df, col1="team1", col2="team2"):
+    """Ajoute une paire d'équipes non ordonnée (_team_lo, _team_hi) pour les jointures"""
+    return df.assign(**team_pair_columns(df[col1].astype(str), df[col2].astype(str)))
+
+def build_date_index(df_dt):
+    """
+    Pré-calcule une table de correspondance par niveau de fallback.
+    Chaque table ne garde que la première ligne de df_dt pour une clé donnée.
+    """
+    keyed = add_team_pair_keys(df_dt).dropna(subset=["_year"])
+    return [
+        keyed.drop_duplicates(subset=keys, keep="first")[keys + ["Match Date", "Match Time"]]
+        for keys in DATE_LOOKUP_TIERS
+    ]
+
+@instrumented("1930-2010.dates")
+def resolve_match_dates(df, df_dt):
+    """
+    Date et heure de chaque match : une jointure par niveau de fallback
+    (DATE_LOOKUP_TIERS), les matchs trouvés n'étant plus cherchés ensuite.
+    Retourne un DataFrame (Match Date, Match Time) aligné sur l'index de df.
+    """
+    result = pd.DataFrame(index=df.index, columns=["Match Date", "Match Time"], dtype=object)
+    pending = add_team_pair_keys(df).dropna(subset=["_year"])
+
+    for keys, lookup in zip(DATE_LOOKUP_TIERS, build_date_index(df_dt)):
+        if pending.empty:
+            break
+        hits = (
+            pending[keys]
+            .reset_index(names="_row")
+            .merge(lookup, on=keys, how="inner")
+            .set_index("_row")
         )
-    )
-    match = df_dt[filt]
-    if not match.empty:
-        return match.iloc[0]["Match Date"], match.iloc[0]["Match Time"]
-    
-    return None, None
+        result.loc[hits.index, ["Match Date", "Match Time"]] = hits[["Match Date", "Match Time"]].values
+        pending = pending.drop(index=hits.index)
 
-def create_datetime(row):
-    """Combine Match Date et Match Time en datetime"""
-    try:
-        if pd.isna(row['Match Date']) or pd.isna(row['Match Time']):
-            return pd.NaT
-        
-        date_str = str(row['Match Date']).strip()
-        time_str = str(row['Match Time']).strip()
-        
-        # Si les valeurs sont 'None' ou vides en string
-        if date_str.lower() == 'none' or time_str.lower() == 'none':
-            return pd.NaT
-        if date_str == '' or time_str == '':
-            return pd.NaT
-        
-        datetime_str = f"{date_str} {time_str}"
-        
-        # Essayer plusieurs formats de date
-        for fmt in ['%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S']:
-            try:
-                return pd.to_datetime(datetime_str, format=fmt)
-            except:
-                continue
-        
-        # Fallback sur parsing automatique
-        return pd.to_datetime(datetime_str, errors='coerce')
-    except Exception as e:
-        return pd.NaT
+    return result
+
+# Formats essayés dans l'ordre, dont le format sans secondes de la source
+# historique ("6/16/1990 17:00"), lu en mois/jour
+DATETIME_FORMATS = ['%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M']
+
+@instrumented("1930-2010.datetime")
+def build_datetime_column(df):
+    """
+    Combine Match Date et Match Time en datetime : concatène les deux colonnes
+    (vides ou 'None' -> NaT), parse chaque format candidat en une passe puis
+    fusionne les résultats dans l'ordre de priorité.
+    Retourne (Series Datetime, nombre de lignes parsées par format).
+    """
+    date_str = df['Match Date'].astype("string").str.strip()
+    time_str = df['Match Time'].astype("string").str.strip()
+
+    valid = (
+        date_str.notna() & time_str.notna() &
+        (date_str != '') & (time_str != '') &
+        (date_str.str.lower() != 'none') & (time_str.str.lower() != 'none')
+    ).fillna(False).astype(bool)
+
+    datetime_str = (date_str + " " + time_str)[valid]
+    result = pd.Series(pd.NaT, index=df.index, dtype="datetime64[us]")
+    format_counts = {}
+
+    remaining = datetime_str
+    for fmt in DATETIME_FORMATS:
+        parsed = pd.to_datetime(remaining, format=fmt, errors='coerce').dropna()
+        format_counts[fmt] = len(parsed)
+        result.loc[parsed.index] = parsed
+        remaining = remaining.drop(index=parsed.index)
+
+    # Fallback sur parsing automatique, uniquement pour les lignes restantes
+    fallback = remaining.map(lambda s: pd.to_datetime(s, errors='coerce')).dropna()
+    format_counts['fallback'] = len(fallback)
+    result.loc[fallback.index] = pd.to_datetime(fallback)
+
+    return result, format_counts
 
 # =========================
 # PIPELINE PRINCIPAL
 # =========================
-def load_and_clean_data():
+def load_and_clean_data(normalize_venue=True):
     """
     Charge et nettoie les données de 1930 à 2010.
     Retourne un DataFrame avec la colonne Datetime.
+    Avec normalize_venue=False, venue est laissée brute pour l'appelant
+    (etl_clean_1930_2010 la normalise en une seule passe).
     """
     print("📥 Chargement des données 1930-2010...")
     
     # 1️⃣ Charger les CSV
-    df = pd.read_csv(INPUT_FILE)
-    df_datetime = pd.read_csv(DATETIME_FILE, encoding="latin1")
+    with stage("1930-2010.read") as record:
+        df = pd.read_csv(INPUT_FILE)
+        df_datetime = pd.read_csv(DATETIME_FILE, encoding="latin1")
+        record["rows_out"] = len(df)
     
     # 2️⃣ Nettoyage préalable
     df = df[
@@ -163,12 +182,14 @@ def load_and_clean_data():
         (~df["edition"].astype(str).str.contains("2014", na=False))
     ].copy()
     
-    # 3️⃣ Normaliser round
-    df["round"] = df["round"].apply(normalize_round)
-    
-    # 4️⃣ Normaliser équipes
-    df["team1"] = df["team1"].apply(normalize_team)
-    df["team2"] = df["team2"].apply(normalize_team)
+    with stage("1930-2010.normalize", rows_in=len(df)) as record:
+        # 3️⃣ Normaliser round
+        df["round"] = apply_memoized(df["round"], normalize_round)
+
+        # 4️⃣ Normaliser équipes
+        df["team1"] = apply_memoized(df["team1"], normalize_team)
+        df["team2"] = apply_memoized(df["team2"], normalize_team)
+        record["rows_out"] = len(df)
     
     # 5️⃣ Extraire année
     df["year"] = (
@@ -197,9 +218,9 @@ def load_and_clean_data():
         "Away Team Name": "team2"
     })
     
-    df_datetime["round"] = df_datetime["round"].apply(normalize_round)
-    df_datetime["team1"] = df_datetime["team1"].apply(normalize_team)
-    df_datetime["team2"] = df_datetime["team2"].apply(normalize_team)
+    df_datetime["round"] = apply_memoized(df_datetime["round"], normalize_round)
+    df_datetime["team1"] = apply_memoized(df_datetime["team1"], normalize_team)
+    df_datetime["team2"] = apply_memoized(df_datetime["team2"], normalize_team)
     
     df["_year"] = df["edition"].astype(str).str.extract(r"(\d{4})", expand=False)
     df_datetime["_year"] = df_datetime["Tournament Id"].astype(str).str.extract(r"(\d{4})", expand=False)
@@ -212,9 +233,7 @@ def load_and_clean_data():
     
     # 8️⃣ Récupérer dates et heures
     print("🔄 Récupération des dates et heures...")
-    df[["Match Date", "Match Time"]] = df.apply(
-        lambda r: pd.Series(get_match_date(r, df_datetime)), axis=1
-    )
+    df[["Match Date", "Match Time"]] = resolve_match_dates(df, df_datetime)
     
     # 🐛 DEBUG : Vérifier ce qu'on a récupéré
     print(f"\n🔍 DEBUG - Échantillon de dates récupérées:")
@@ -225,56 +244,24 @@ def load_and_clean_data():
     missing_dates = df['Match Date'].isna().sum()
     print(f"\n⚠️  {missing_dates} matches sans date après récupération")
     
-    # 9️⃣ Corrections manuelles matches spécifiques
-    specific_matches = [
-        ("Hardturm Stadium", "West Germany", "Turkey"),
-        ("St. Jakob Stadium", "Switzerland", "Italy"),
-        ("Malmö Stadion", "Northern Ireland", "Czechoslovakia"),
-    ]
-    
-    for stadium, team1_name, team2_name in specific_matches:
-        match_row = df_datetime[
-            (df_datetime["Stadium Name"] == stadium) &
-            (((df_datetime["team1"] == team1_name) & (df_datetime["team2"] == team2_name)) |
-             ((df_datetime["team1"] == team2_name) & (df_datetime["team2"] == team1_name)))
-        ]
-        if not match_row.empty:
-            match_date = match_row.iloc[0]['Match Date']
-            match_time = match_row.iloc[0]['Match Time']
-            
-            mask = (
-                (df['venue'].str.contains(stadium.split()[0], case=False, na=False)) &
-                (((df['team1'] == team1_name) & (df['team2'] == team2_name)) |
-                 ((df['team1'] == team2_name) & (df['team2'] == team1_name)))
-            )
-            df.loc[mask, 'Replay'] = 1
-            df.loc[mask, 'Match Date'] = match_date
-            df.loc[mask, 'Match Time'] = match_time
-    
-    # 🔟 Corrections manuelles 1994
-    matches_1994 = [
-        ("Norway", "Mexico", "06/19/1994", "13:00:00"),
-        ("Netherlands", "Saudi Arabia", "06/20/1994", "16:30:00"),
-        ("Italy", "Mexico", "06/28/1994", "17:30:00"),
-        ("Belgium", "Saudi Arabia", "06/29/1994", "17:30:00"),
-        ("Spain", "Switzerland", "06/18/1994", "13:00:00"),
-    ]
-    
-    for team1, team2, d, t in matches_1994:
-        mask = (
-            (df["edition"] == "1994-USA") &
-            (df["team1"] == team1) &
-            (df["team2"] == team2)
-        )
-        df.loc[mask, ["Match Date", "Match Time"]] = [d, t]
+    # 9️⃣ Corrections manuelles (matchs d'appui, dates 1994...) : une seule
+    # jointure sur la table de corrections, voir corrections.py
+    overrides = corrections.load_overrides(CORRECTIONS_FILE)
+    with stage("1930-2010.corrections", rows_in=len(df)) as record:
+        df, matched = corrections.apply_overrides(df, overrides, df_datetime)
+        record["rows_out"] = int(matched.sum())
+    corrections.report_overrides(overrides, matched)
     
     # 1️⃣1️⃣ Normaliser venue
-    df["venue"] = df["venue"].apply(city_to_english)
+    if normalize_venue:
+        df["venue"] = apply_memoized(df["venue"], city_to_english)
     
     # 1️⃣2️⃣ Créer colonne Datetime
     print("🔄 Création de la colonne Datetime...")
-    df['Datetime'] = df.apply(create_datetime, axis=1)
-    
+    df['Datetime'], format_counts = build_datetime_column(df)
+    for fmt, count in format_counts.items():
+        print(f"  Format {fmt}: {count} lignes")
+
     # 🐛 DEBUG : Vérifier le parsing
     print(f"\n🔍 DEBUG - Échantillon de Datetime créées:")
     sample_dt = df[df['Datetime'].notna()].head(3)
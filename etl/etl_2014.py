@@ -1,8 +1,11 @@
-import duckdb
 import pandas as pd
 from unidecode import unidecode
-import geonamescache
 import logging
+from geo_index import get_city_index
+from normalize_cache import apply_memoized
+from instrumentation import stage
+from source_schema import SCHEMA_2014, read_csv_schema
+from config import data_path
 
 logger = logging.getLogger("ETL")
 
@@ -10,9 +13,7 @@ logger = logging.getLogger("ETL")
 pd.set_option("display.max_columns", None)
 pd.set_option("display.width", None)
 
-gc = geonamescache.GeonamesCache()
-cities =  gc.get_cities()
-countries = gc.get_countries()
+INPUT_FILE = data_path('WorldCupMatches2014.csv')
 
 STAGE_MAP = {
         "group a": "group",
@@ -51,19 +52,14 @@ def clean_text(value, default="Unknown"):
     value = unidecode(value)
     return value
 
-def city_to_english(city):
+def city_to_english(city, use_alternate_names=False):
     if pd.isna(city) or str(city).strip() == "":
         logger.warning("Ville manquante")
         return "unknown"
 
     city_clean = unidecode(str(city)).lower().strip()
 
-    for c in cities.values():
-        c_name = unidecode(c["name"]).lower().strip()
-        if c_name == city_clean:
-            return c_name
-
-    return city_clean 
+    return get_city_index(use_alternate_names).get(city_clean, city_clean)
 
 def normalize_stage(stage):
     if pd.isna(stage):
@@ -88,8 +84,9 @@ def normalize_country(name):
     return key
 def get_cleaned_2014_data():
     
-    df = pd.read_csv('./../data/WorldCupMatches2014.csv', sep=";", encoding='iso-8859-1') 
-    df = df.drop(columns=["Year", "Stadium", "Attendance", "Half-time Home Goals", "Half-time Away Goals", "Referee", "Assistant 1", "Assistant 2","RoundID"  ,  "MatchID","Home Team Initials", "Away Team Initials"])
+    with stage("2014.read") as record:
+        df = read_csv_schema(INPUT_FILE, SCHEMA_2014, sep=";", encoding='iso-8859-1')
+        record["rows_out"] = len(df)
 
     df["Datetime"] = pd.to_datetime(
         df["Datetime"],
@@ -133,11 +130,13 @@ def get_cleaned_2014_data():
         ["Home Result", "Away Result"]] = ["loser", "winner"]
     df = df.drop(columns=["Win conditions", "Score home", "Score away"])
 
-    df["Stage"] = df["Stage"].apply(normalize_stage)
+    with stage("2014.normalize", rows_in=len(df)) as record:
+        df["Stage"] = apply_memoized(df["Stage"], normalize_stage)
 
-    df["City"] = df["City"].apply(city_to_english)
+        df["City"] = apply_memoized(df["City"], city_to_english)
 
-    df["Home Team Name"] = df["Home Team Name"].apply(normalize_country)
-    df["Away Team Name"] = df["Away Team Name"].apply(normalize_country)
+        df["Home Team Name"] = apply_memoized(df["Home Team Name"], normalize_country)
+        df["Away Team Name"] = apply_memoized(df["Away Team Name"], normalize_country)
+        record["rows_out"] = len(df)
 
     return df
\ No newline at end of file
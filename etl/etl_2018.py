@@ -4,6 +4,16 @@ import numpy as np
 from pathlib import Path
 from unidecode import unidecode
 import os
+from normalize_cache import apply_memoized
+from instrumentation import stage
+from config import data_path
+
+try:
+    import ijson
+except ImportError:  # dépendance optionnelle : repli sur json.load
+    ijson = None
+
+INPUT_FILE = Path(data_path("data_2018.json"))
 
 # --- FONCTIONS UTILITAIRES (HELPERS) ---
 
@@ -24,6 +34,74 @@ def standardize_stage_name(val):
     if 'final' in val: return 'final'
     return val
 
+# --- EXTRACTION EN STREAMING ---
+
+# Champs d'un match conservés dans les buffers colonnes
+MATCH_FIELDS = ['date', 'stadium', 'home_team', 'away_team', 'home_result', 'away_result']
+MATCH_SECTIONS = ('groups', 'knockout')
+
+def extract_match_columns(json_file_path):
+    """
+    Parcourt le JSON 2018 événement par événement (ijson) et remplit
+    directement des buffers colonnes, sans charger le document entier ni
+    créer un dict par match. Les matchs gardent l'ordre du fichier
+    (groupes puis phases finales).
+    Retourne (colonnes, équipes id -> nom, stades id -> ville, section -> nom du round).
+    """
+    if ijson is None:
+        return _extract_match_columns_json(json_file_path)
+
+    columns = {field: [] for field in MATCH_FIELDS + ['section']}
+    teams_map, stadiums_map, section_names = {}, {}, {}
+    current, ref_id, ref_value = None, None, None
+
+    with open(json_file_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            path = prefix.split('.')
+            root = path[0]
+
+            if root in MATCH_SECTIONS and len(path) >= 4 and path[2] == 'matches' and path[3] == 'item':
+                section = f"{root}.{path[1]}"
+                if len(path) == 4 and event == 'start_map':
+                    current = dict.fromkeys(MATCH_FIELDS)
+                elif len(path) == 4 and event == 'end_map':
+                    for field in MATCH_FIELDS:
+                        columns[field].append(current[field])
+                    columns['section'].append(section)
+                elif len(path) == 5 and path[4] in current and event not in ('start_map', 'start_array'):
+                    current[path[4]] = value
+            elif root in MATCH_SECTIONS and len(path) == 3 and path[2] == 'name':
+                section_names[f"{root}.{path[1]}"] = value
+            elif root in ('teams', 'stadiums') and len(path) == 3:
+                if path[2] == 'id':
+                    ref_id = value
+                elif path[2] == ('name' if root == 'teams' else 'city'):
+                    ref_value = value
+            elif root in ('teams', 'stadiums') and prefix.endswith('item') and event == 'end_map':
+                (teams_map if root == 'teams' else stadiums_map)[ref_id] = ref_value
+                ref_id, ref_value = None, None
+
+    return columns, teams_map, stadiums_map, section_names
+
+def _extract_match_columns_json(json_file_path):
+    """Même résultat que extract_match_columns, avec json.load (si ijson n'est pas installé)."""
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    columns = {field: [] for field in MATCH_FIELDS + ['section']}
+    section_names = {}
+    for root in MATCH_SECTIONS:
+        for k, v in data[root].items():
+            section_names[f"{root}.{k}"] = v['name']
+            for m in v['matches']:
+                for field in MATCH_FIELDS:
+                    columns[field].append(m[field])
+                columns['section'].append(f"{root}.{k}")
+
+    teams_map = {t['id']: t['name'] for t in data['teams']}
+    stadiums_map = {s['id']: s['city'] for s in data['stadiums']}
+    return columns, teams_map, stadiums_map, section_names
+
 # --- FONCTION PRINCIPALE ETL ---
 
 def get_cleaned_2018_data(json_file_path):
@@ -31,9 +109,7 @@ def get_cleaned_2018_data(json_file_path):
     Extrait, Transforme et Nettoie les données du JSON 2018.
     Retourne un DataFrame Pandas prêt pour l'analyse.
     """
-    PROJECT_ROOT = Path(__file__).resolve().parents[1]
-    DATA_DIR = PROJECT_ROOT / "data"
-    json_file_path = DATA_DIR / "data_2018.json"
+    json_file_path = INPUT_FILE
 
     print(f"Traitement du fichier : {json_file_path}")
     
@@ -41,51 +117,35 @@ def get_cleaned_2018_data(json_file_path):
     if not os.path.exists(json_file_path):
         raise FileNotFoundError(f"Le fichier {json_file_path} est introuvable.")
 
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # Création des Lookups (Dictionnaires)
-    teams_map = {t['id']: t['name'] for t in data['teams']}
-    stadiums_map = {s['id']: s['city'] for s in data['stadiums']}
-
-    all_matches = []
-
-    # Fonction interne pour éviter de répéter le code (Groupes & Knockout)
-    def _extract_matches(match_list, round_label):
-        for m in match_list:
-            all_matches.append({
-                'raw_date': m['date'],
-                'raw_round': round_label,
-                'raw_city': stadiums_map.get(m['stadium']),
-                'raw_home_team': teams_map.get(m['home_team']),
-                'raw_away_team': teams_map.get(m['away_team']),
-                'home_goals': m['home_result'],
-                'away_goals': m['away_result']
-            })
-
-    # Boucle sur les Groupes
-    for k, v in data['groups'].items():
-        _extract_matches(v['matches'], v['name'])
-
-    # Boucle sur les Phases Finales
-    for k, v in data['knockout'].items():
-        _extract_matches(v['matches'], v['name'])
-
-    # Création du DataFrame initial
-    df = pd.DataFrame(all_matches)
+    with stage("2018.read") as record:
+        columns, teams_map, stadiums_map, section_names = extract_match_columns(json_file_path)
+        record["rows_out"] = len(columns['date'])
+
+    # Création du DataFrame initial : les ids sont résolus une seule fois, sur les colonnes
+    df = pd.DataFrame({
+        'raw_date': columns['date'],
+        'raw_round': pd.Series(columns['section'], dtype=object).map(section_names),
+        'raw_city': pd.Series(columns['stadium'], dtype=object).map(stadiums_map),
+        'raw_home_team': pd.Series(columns['home_team'], dtype=object).map(teams_map),
+        'raw_away_team': pd.Series(columns['away_team'], dtype=object).map(teams_map),
+        'home_goals': pd.Series(columns['home_result'], dtype=object).astype(float),
+        'away_goals': pd.Series(columns['away_result'], dtype=object).astype(float),
+    })
 
     # 2. TRANSFORMATION & NETTOYAGE
     
-    # Date : ISO 8601
-    df['Datetime'] = pd.to_datetime(df['raw_date'], utc=True).dt.strftime('%Y-%m-%d %H:%M:%S')
-
-    # Texte : Villes et Équipes (Clean text)
-    df['City'] = df['raw_city'].apply(clean_text_field)
-    df['Home Team Name'] = df['raw_home_team'].apply(clean_text_field)
-    df['Away Team Name'] = df['raw_away_team'].apply(clean_text_field)
-
-    # Stage : Standardisation
-    df['Stage'] = df['raw_round'].apply(standardize_stage_name)
+    # Date : heure UTC, en datetime64 sans fuseau comme les autres sources
+    df['Datetime'] = pd.to_datetime(df['raw_date'], utc=True).dt.tz_localize(None).astype('datetime64[us]')
+
+    with stage("2018.normalize", rows_in=len(df)) as record:
+        # Texte : Villes et Équipes (Clean text)
+        df['City'] = apply_memoized(df['raw_city'], clean_text_field)
+        df['Home Team Name'] = apply_memoized(df['raw_home_team'], clean_text_field)
+        df['Away Team Name'] = apply_memoized(df['raw_away_team'], clean_text_field)
+
+        # Stage : Standardisation
+        df['Stage'] = apply_memoized(df['raw_round'], standardize_stage_name)
+        record["rows_out"] = len(df)
 
     # Buts : Conversion en Entiers
     df['Home Team Goals'] = df['home_goals'].fillna(0).astype(int)
@@ -9,6 +9,60 @@
 import pandas as pd
 import numpy as np
 import os
+from source_schema import SCHEMA_2022_MATCHES, SCHEMA_2022_VENUES, read_csv_schema
+from team_pairs import team_pair_columns
+from instrumentation import stage
+from config import DATA_DIR
+
+# --- CONFIGURATION (Relative Paths) ---
+# Data folder from config.py (ETL_DATA_DIR, <project>/data by default)
+DATA_BASE_DIR = DATA_DIR
+INPUT_FILES = [
+    os.path.join(DATA_BASE_DIR, "WorldCupMatches2022.csv"),
+    os.path.join(DATA_BASE_DIR, "WorldCupMatches2022-venue.csv"),
+    os.path.join(DATA_BASE_DIR, "stadium_city_mapping2022.csv"),
+]
+
+# Columns used to join file 1 (match stats) with file 2 (venues):
+# the two teams in alphabetical order (home/away can be swapped) and the match day
+MERGE_KEYS = ['team_lo', 'team_hi', 'match_day']
+
+# Team names that differ between the two files
+TEAM_NAME_MAPPING = {
+    "ir iran": "iran",
+    "korea republic": "south korea",
+    # Add more mappings here based on data inconsistencies
+}
+
+STAGE_MAP = {
+    **{f'group {x}': 'group' for x in 'abcdefgh'},
+    'round of 16': 'round of 16',
+    'quarter-final': 'quarter-final',
+    'semi-final': 'semi-final',
+    'play-off for third place': 'play-off for third place',
+    'final': 'final'
+}
+
+
+def add_merge_keys(df: pd.DataFrame, t1_col: str, t2_col: str, date_col: str) -> pd.DataFrame:
+    """
+    Adds the MERGE_KEYS columns, computed on whole columns: the team pair is
+    ordered with a vectorized comparison and the date is truncated to the day.
+    """
+    return df.assign(
+        **team_pair_columns(df[t1_col].astype(str), df[t2_col].astype(str), MERGE_KEYS[:2]),
+        match_day=df[date_col].dt.normalize(),
+    )
+
+
+def unmatched_report(df1: pd.DataFrame, df2: pd.DataFrame) -> dict:
+    """Counts the rows of each file whose merge key has no match in the other file."""
+    keys1 = df1[MERGE_KEYS].drop_duplicates()
+    keys2 = df2[MERGE_KEYS].drop_duplicates()
+    left_only = df1[MERGE_KEYS].merge(keys2, on=MERGE_KEYS, how='left', indicator=True)['_merge'] == 'left_only'
+    right_only = df2[MERGE_KEYS].merge(keys1, on=MERGE_KEYS, how='left', indicator=True)['_merge'] == 'left_only'
+    return {'left_only': int(left_only.sum()), 'right_only': int(right_only.sum())}
+
 
 def get_cleaned_2022_data() -> pd.DataFrame:
     """
@@ -19,12 +73,7 @@ def get_cleaned_2022_data() -> pd.DataFrame:
     print("--- STARTING 2022 ETL PROCESS ---")
 
     # --- 1. CONFIGURATION (Relative Paths) ---
-    # We assume the script is run from a root directory that contains a 'data' folder
-    data_base_dir = "./../data"
-    
-    file1_path = os.path.join(data_base_dir, "WorldCupMatches2022.csv")
-    file2_path = os.path.join(data_base_dir, "WorldCupMatches2022-venue.csv")
-    mapping_path = os.path.join(data_base_dir, "stadium_city_mapping2022.csv")
+    file1_path, file2_path, mapping_path = INPUT_FILES
 
     # Verify files exist
     for p in [file1_path, file2_path, mapping_path]:
@@ -36,40 +85,30 @@ def get_cleaned_2022_data() -> pd.DataFrame:
     # Assumes col 0 = Stadium, col 1 = City
     stadium_mapping = stadium_df.set_index(stadium_df.columns[0])[stadium_df.columns[1]].to_dict()
 
-    df1 = pd.read_csv(file1_path)
-    df2 = pd.read_csv(file2_path)
+    # Only the columns listed in the source schemas are parsed (~10 of ~140)
+    with stage("2022.read") as record:
+        df1 = read_csv_schema(file1_path, SCHEMA_2022_MATCHES)
+        df2 = read_csv_schema(file2_path, SCHEMA_2022_VENUES)
+        record["rows_out"] = len(df1) + len(df2)
 
     # --- 3. CLEAN TEAM NAMES ---
-    team_name_mapping = {
-        "ir iran": "iran",
-        "korea republic": "south korea",
-        # Add more mappings here based on data inconsistencies
-    }
-    
     def clean_names(series):
-        return series.str.lower().str.strip().replace(team_name_mapping)
+        return series.astype(str).str.lower().str.strip().replace(TEAM_NAME_MAPPING)
 
-    df1['team1'] = clean_names(df1['team1'])
-    df1['team2'] = clean_names(df1['team2'])
-    df2['home_team'] = clean_names(df2['home_team'])
-    df2['away_team'] = clean_names(df2['away_team'])
+    with stage("2022.normalize", rows_in=len(df1) + len(df2)) as record:
+        df1['team1'] = clean_names(df1['team1'])
+        df1['team2'] = clean_names(df1['team2'])
+        df2['home_team'] = clean_names(df2['home_team'])
+        df2['away_team'] = clean_names(df2['away_team'])
+        record["rows_out"] = len(df1) + len(df2)
 
     # --- 4. CLEAN DATES & ROUNDS (FILE 1) ---
     # A. Dates
     df1['date_clean'] = pd.to_datetime(df1['date'], dayfirst=True, errors='coerce')
     
     # B. Rounds / Stages
-    stage_map = {
-        **{f'group {x}': 'group' for x in 'abcdefgh'},
-        'round of 16': 'round of 16',
-        'quarter-final': 'quarter-final',
-        'semi-final': 'semi-final',
-        'play-off for third place': 'play-off for third place',
-        'final': 'final'
-    }
-    
     if 'category' in df1.columns:
-        df1['round_clean'] = df1['category'].str.lower().str.strip().map(stage_map).fillna('unknown')
+        df1['round_clean'] = df1['category'].str.lower().str.strip().map(STAGE_MAP).fillna('unknown')
     else:
         print("Warning: Column 'category' missing in File 1. Setting round to unknown.")
         df1['round_clean'] = 'unknown'
@@ -78,24 +117,16 @@ def get_cleaned_2022_data() -> pd.DataFrame:
     df2['date_clean'] = pd.to_datetime(df2['match_time'], dayfirst=True, errors='coerce')
 
     # --- 6. CREATE JOIN KEYS ---
-    def create_merge_key(row, t1_col, t2_col, date_col):
-        # 1. Date: YYYY-MM-DD only
-        if pd.isna(row[date_col]):
-            d_str = "NAT"
-        else:
-            d_str = row[date_col].strftime('%Y-%m-%d')
-        
-        # 2. Teams: Sorted alphabetically to handle Home/Away swaps
-        teams = [str(row[t1_col]), str(row[t2_col])]
-        teams.sort()
-        
-        return f"{teams[0]}_{teams[1]}_{d_str}"
-
-    df1['join_key'] = df1.apply(lambda x: create_merge_key(x, 'team1', 'team2', 'date_clean'), axis=1)
-    df2['join_key'] = df2.apply(lambda x: create_merge_key(x, 'home_team', 'away_team', 'date_clean'), axis=1)
+    df1 = add_merge_keys(df1, 'team1', 'team2', 'date_clean')
+    df2 = add_merge_keys(df2, 'home_team', 'away_team', 'date_clean')
 
     # --- 7. MERGE ---
-    merged = pd.merge(df1, df2, on='join_key', how='inner', suffixes=('_f1', '_f2'))
+    report = unmatched_report(df1, df2)
+    print(f"Unmatched rows: {report['left_only']} in file 1, {report['right_only']} in file 2.")
+
+    with stage("2022.merge", rows_in=len(df1) + len(df2)) as record:
+        merged = pd.merge(df1, df2, on=MERGE_KEYS, how='inner', suffixes=('_f1', '_f2'))
+        record["rows_out"] = len(merged)
 
     if merged.empty:
         print("Error: Merge resulted in 0 rows. Check team names or date formats.")
@@ -1,8 +1,11 @@
+import numpy as np
 import pandas as pd
 from unidecode import unidecode
 import logging
 import re
-from etl_1930_2010 import load_and_clean_data
+from etl_1930_2010 import city_to_english, load_and_clean_data
+from normalize_cache import apply_memoized
+from instrumentation import stage
 
 # =========================
 # CONFIG
@@ -31,25 +34,26 @@ def normalize_text(val, field_name="value"):
     val = re.sub(r"\s+", " ", val)
     return val
 
+ROUND_MAPPING = {
+    "groupstage": "group",
+    "group": "group",
+    "roundof16": "round of 16",
+    "round16": "round of 16",
+    "quarterfinal": "quarter-final",
+    "quarterfinals": "quarter-final",
+    "semifinal": "semi-final",
+    "semifinals": "semi-final",
+    "thirdplacematch": "play-off for third place",
+    "playofforthirdplace": "play-off for third place",
+    "finalround": "final-round",
+    "final": "final"
+}
+
 def normalize_round(val):
     if pd.isna(val):
         return None
     val = normalize_text(val, "round")
     key = val.replace(" ", "")
-    ROUND_MAPPING = {
-        "groupstage": "group",
-        "group": "group",
-        "roundof16": "round of 16",
-        "round16": "round of 16",
-        "quarterfinal": "quarter-final",
-        "quarterfinals": "quarter-final",
-        "semifinal": "semi-final",
-        "semifinals": "semi-final",
-        "thirdplacematch": "play-off for third place",
-        "playofforthirdplace": "play-off for third place",
-        "finalround": "final-round",
-        "final": "final"
-    }
     return ROUND_MAPPING.get(key, val)
 
 def normalize_city(val):
@@ -62,23 +66,48 @@ def normalize_city(val):
     val = re.sub(r"\s+", " ", val)
     return val
 
-def compute_home_result(row):
-    if pd.isna(row["Home Team Goals"]) or pd.isna(row["Away Team Goals"]):
-        return None
-    if row["Home Team Goals"] > row["Away Team Goals"]:
-        return "winner"
-    if row["Home Team Goals"] < row["Away Team Goals"]:
-        return "loser"
-    return "draw"
+def clean_venue(val):
+    """Ville brute -> ville finale : city_to_english puis normalize_city, en une seule fonction."""
+    return normalize_city(city_to_english(val))
 
-def compute_away_result(row):
-    if pd.isna(row["Home Team Goals"]) or pd.isna(row["Away Team Goals"]):
-        return None
-    if row["Away Team Goals"] > row["Home Team Goals"]:
-        return "winner"
-    if row["Away Team Goals"] < row["Home Team Goals"]:
-        return "loser"
-    return "draw"
+def compute_results(home_goals, away_goals):
+    """
+    Résultats winner / loser / draw calculés sur les colonnes entières :
+    retourne (Home Result, Away Result), vides si un des scores manque.
+    """
+    known = (home_goals.notna() & away_goals.notna()).to_numpy()
+    home_ahead = (home_goals > away_goals).to_numpy(dtype=bool, na_value=False)
+    away_ahead = (home_goals < away_goals).to_numpy(dtype=bool, na_value=False)
+    conditions = [~known, home_ahead, away_ahead]
+    home = np.select(conditions, [None, "winner", "loser"], default="draw")
+    away = np.select(conditions, [None, "loser", "winner"], default="draw")
+    return (
+        pd.Series(home, index=home_goals.index, dtype="str"),
+        pd.Series(away, index=home_goals.index, dtype="str"),
+    )
+
+# Chaîne de nettoyage : colonne source -> (colonne finale, normalisation, arguments).
+# Chaque colonne n'est transformée qu'une fois, sur ses valeurs distinctes.
+CLEAN_CHAIN = {
+    "round": ("Stage", normalize_round, ()),
+    "venue": ("City", clean_venue, ()),
+    "team1": ("Home Team Name", normalize_text, ("home team",)),
+    "team2": ("Away Team Name", normalize_text, ("away team",)),
+}
+
+FINAL_COLUMNS = [
+    "Datetime", "Stage", "City", "Home Team Name", "Home Team Goals",
+    "Away Team Goals", "Away Team Name", "Home Result", "Away Result",
+]
+
+def extract_goals(df):
+    """Buts domicile / extérieur, lus dans 'score' s'ils ne sont pas déjà présents."""
+    if "Home Team Goals" in df.columns and "Away Team Goals" in df.columns:
+        return df["Home Team Goals"], df["Away Team Goals"]
+    if "score" not in df.columns:
+        raise ValueError("❌ Impossible de calculer les buts : colonne 'score' absente")
+    goals = df["score"].astype(str).str.extract(r"(\d+)\s*[-–]\s*(\d+)")
+    return goals[0].astype("Int64"), goals[1].astype("Int64")
 
 def get_cleaned_1930_data():
     """
@@ -87,59 +116,32 @@ def get_cleaned_1930_data():
     # =========================
     # 0️⃣ CHARGER LE DATAFRAME DEPUIS L'AUTRE ETL
     # =========================
-    df_etl = load_and_clean_data()
+    df_etl = load_and_clean_data(normalize_venue=False)
     
     # ⚠️ NE PAS RECRÉER DATETIME - Elle existe déjà et est correcte !
     # La colonne Datetime est déjà créée dans etl_1930_2010.py
     
-    # =========================
-    # 1️⃣ NORMALISATION ROUND / STAGE
-    # =========================
-    df_etl["round"] = df_etl["round"].apply(normalize_round)
-
-    # =========================
-    # 2️⃣ NORMALISATION CITY
-    # =========================
-    df_etl["venue"] = df_etl["venue"].apply(normalize_city)
-
-    # =========================
-    # 3️⃣ NORMALISATION TEAM NAMES
-    # =========================
-    df_etl["team1"] = df_etl["team1"].apply(lambda x: normalize_text(x, "home team"))
-    df_etl["team2"] = df_etl["team2"].apply(lambda x: normalize_text(x, "away team"))
-
-    # =========================
-    # 4️⃣ GOALS (robuste)
-    # =========================
-    if "Home Team Goals" not in df_etl.columns or "Away Team Goals" not in df_etl.columns:
-        if "score" not in df_etl.columns:
-            raise ValueError("❌ Impossible de calculer les buts : colonne 'score' absente")
-        goals = df_etl["score"].astype(str).str.extract(r"(\d+)\s*[-–]\s*(\d+)")
-        df_etl["Home Team Goals"] = goals[0].astype("Int64")
-        df_etl["Away Team Goals"] = goals[1].astype("Int64")
+    with stage("1930-2010.clean", rows_in=len(df_etl)) as record:
+        # =========================
+        # 1️⃣ NORMALISATION ROUND / CITY / TEAM NAMES (une passe par colonne)
+        # =========================
+        columns = {"Datetime": df_etl["Datetime"]}
+        for source, (target, func, args) in CLEAN_CHAIN.items():
+            columns[target] = apply_memoized(df_etl[source], func, *args)
 
-    # =========================
-    # 5️⃣ CALCUL DES RESULTATS
-    # =========================
-    df_etl["Home Result"] = df_etl.apply(compute_home_result, axis=1)
-    df_etl["Away Result"] = df_etl.apply(compute_away_result, axis=1)
+        # =========================
+        # 2️⃣ GOALS ET RESULTATS (vectorisés)
+        # =========================
+        columns["Home Team Goals"], columns["Away Team Goals"] = extract_goals(df_etl)
+        columns["Home Result"], columns["Away Result"] = compute_results(
+            columns["Home Team Goals"], columns["Away Team Goals"]
+        )
 
-    # =========================
-    # 6️⃣ SELECTION COLONNES FINALES
-    # =========================
-    FINAL_COLUMNS = {
-        "Datetime": "Datetime",
-        "round": "Stage",
-        "venue": "City",
-        "team1": "Home Team Name",
-        "Home Team Goals": "Home Team Goals",
-        "Away Team Goals": "Away Team Goals",
-        "team2": "Away Team Name",
-        "Home Result": "Home Result",
-        "Away Result": "Away Result"
-    }
-    
-    df_final = df_etl[list(FINAL_COLUMNS.keys())].rename(columns=FINAL_COLUMNS)
+        # =========================
+        # 3️⃣ SELECTION COLONNES FINALES
+        # =========================
+        df_final = pd.DataFrame({col: columns[col] for col in FINAL_COLUMNS})
+        record["rows_out"] = len(df_final)
     
     print("\n✅ Données 1930-2010 finales prêtes")
     print(f"   - {len(df_final)} matches")
@@ -1,7 +1,6 @@
-import duckdb
+from config import get_connection
 
-VIEW = """ 
-CREATE OR REPLACE VIEW v_matches_flat AS
+FLAT_SELECT = """
 SELECT
     m.match_id,
 
@@ -31,12 +30,62 @@ JOIN Plays ph ON ph.match_id = m.match_id AND ph.position_ = 'home'
 JOIN Teams th ON th.team_id = ph.team_id
 
 JOIN Plays pa ON pa.match_id = m.match_id AND pa.position_ = 'away'
-JOIN Teams ta ON ta.team_id = pa.team_id;
+JOIN Teams ta ON ta.team_id = pa.team_id
+"""
+
+VIEW = f"""
+CREATE OR REPLACE VIEW v_matches_flat AS
+{FLAT_SELECT};
+"""
+
+# Table matérialisée : mêmes colonnes que v_matches_flat, déjà jointes et
+# triées par édition puis date pour les lectures BI / KPI
+FLAT_TABLE = "matches_flat"
+
+REFRESH_FLAT_TABLE = f"""
+CREATE OR REPLACE TABLE {FLAT_TABLE} AS
+SELECT * FROM ({FLAT_SELECT}) f
+ORDER BY year_, match_date, match_id;
 """
 
+REFRESH_FLAT_MATCHES = [
+    f"DELETE FROM {FLAT_TABLE} WHERE list_contains($match_ids, match_id);",
+    f"""
+    INSERT INTO {FLAT_TABLE}
+    SELECT * FROM ({FLAT_SELECT}) f
+    WHERE list_contains($match_ids, f.match_id)
+    ORDER BY year_, match_date, match_id;
+    """,
+]
+
+
+def flat_table_exists(con):
+    return con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [FLAT_TABLE]
+    ).fetchone()[0] > 0
+
+
+def refresh_flat_table(con, match_ids=None):
+    """
+    Rafraîchit matches_flat dans une seule transaction : reconstruction
+    complète, ou seulement les matchs de match_ids si la table existe déjà.
+    """
+    con.begin()
+    try:
+        if match_ids is None or not flat_table_exists(con):
+            con.execute(REFRESH_FLAT_TABLE)
+        elif match_ids:
+            for statement in REFRESH_FLAT_MATCHES:
+                con.execute(statement, {"match_ids": list(match_ids)})
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
 
-def create_view(db_path="./../db/db.duckdb"):
-    con = duckdb.connect(db_path)
+def create_view(db_path=None, materialize=False):
+    con = get_connection(db_path)
     con.execute(VIEW)
     con.commit()
-    con.close()
\ No newline at end of file
+    if materialize:
+        refresh_flat_table(con)
@@ -1,91 +1,138 @@
-import duckdb
-
-SQL_PIPELINE = """
-DROP SEQUENCE IF EXISTS match_id_seq;
-CREATE SEQUENCE match_id_seq START 1;
-
-INSERT INTO Teams (team_id, team_name)
-SELECT uuid(), team_name
-FROM (
-    SELECT DISTINCT "Home Team Name" AS team_name FROM staging_matches
-    UNION
-    SELECT DISTINCT "Away Team Name" FROM staging_matches
-);
+import os
+import time
+import etl_create_view as etl_view
+from config import get_connection
+
+try:
+    import pyarrow as pa
+except ImportError:  # dépendance optionnelle : staging direct depuis pandas
+    pa = None
 
-INSERT INTO Rounds (round_id, round_name)
-SELECT uuid(), Stage
-FROM staging_matches
-GROUP BY Stage;
-
-INSERT INTO City (city_id, city_name)
-SELECT uuid(), City
-FROM staging_matches
-GROUP BY City;
-
-INSERT INTO MatchTime (time_id, date_, day_, month_, year_)
-SELECT
-  uuid(),
-  CAST("Datetime" AS TIMESTAMP),
-  EXTRACT(DAY FROM "Datetime"),
-  EXTRACT(MONTH FROM "Datetime"),
-  EXTRACT(YEAR FROM "Datetime")
-FROM staging_matches
-GROUP BY CAST("Datetime" AS TIMESTAMP), EXTRACT(DAY FROM "Datetime"), 
-         EXTRACT(MONTH FROM "Datetime"), EXTRACT(YEAR FROM "Datetime");
-
-CREATE TEMP TABLE match_map AS
-SELECT
-  nextval('match_id_seq')::INTEGER AS match_id,
-  s.*
-FROM (
+# Les chargements complet et incrémental partagent les mêmes étapes :
+# - staged_matches : unique lecture de staging_matches, dédoublonnée et typée
+# - dimensions : seules les équipes, rounds, villes et dates absentes de la
+#   base sont insérées, les clés existantes ne changent pas
+# - keyed_matches : chaque match avec toutes ses clés de dimension, résolues
+#   une seule fois par jointure
+# Un match est identifié par sa clé naturelle (date, équipe domicile, équipe
+# extérieure) ; une date inconnue (NULL) est une valeur de clé comme une autre
+# (IS NOT DISTINCT FROM) : une seule ligne NULL dans MatchTime, et le match
+# est chargé. match_rank départage les rares doublons de cette clé
+# (ex. matchs d'appui de 1954 datés comme le match initial) ; il est trié
+# sur toutes les colonnes de staged_matches (lignes distinctes), donc
+# identique d'un chargement à l'autre quel que soit l'ordre de lecture.
+# Chaque étape est un couple (nom, sql) pour que run_steps mesure sa durée.
+SQL_STAGE_MATCHES = [
+    ("staged_matches", """
+    CREATE OR REPLACE TEMP TABLE staged_matches AS
     SELECT DISTINCT
-        "Datetime",
-        "Stage",
-        "City",
-        "Home Team Name",
-        "Away Team Name",
-        "Home Team Goals",
-        "Away Team Goals",
-        "Home result",
-        "Away result"
-    FROM staging_matches
-) s
-ORDER BY "Datetime";
-
-INSERT INTO Matches (match_id, round_id, city_id, time_id)
-SELECT
-  m.match_id,
-  r.round_id,
-  c.city_id,
-  t.time_id
-FROM match_map m
-JOIN Rounds r ON r.round_name = m."Stage"
-JOIN City c ON c.city_name = m."City"
-JOIN MatchTime t ON t.date_ = CAST(m."Datetime" AS TIMESTAMP);
+        CAST("Datetime" AS TIMESTAMP) AS date_,
+        "Stage" AS round_name,
+        "City" AS city_name,
+        "Home Team Name" AS home_team,
+        "Away Team Name" AS away_team,
+        "Home Team Goals" AS home_goals,
+        "Away Team Goals" AS away_goals,
+        "Home result" AS home_result,
+        "Away result" AS away_result
+    FROM staging_matches;
+    """),
+]
 
-INSERT INTO Plays (match_id, team_id, position_, goal_nb, result_)
-SELECT
-  m.match_id,
-  th.team_id,
-  'home',
-  m."Home Team Goals",
-  m."Home result"
-FROM match_map m
-JOIN Teams th ON th.team_name = m."Home Team Name";
+SQL_DIMENSIONS = [
+    ("teams", """
+    INSERT INTO Teams (team_id, team_name)
+    SELECT {team_key}, s.team_name
+    FROM (
+        SELECT home_team AS team_name FROM staged_matches
+        UNION
+        SELECT away_team FROM staged_matches
+    ) s
+    WHERE NOT EXISTS (SELECT 1 FROM Teams t WHERE t.team_name = s.team_name);
+    """),
+    ("rounds", """
+    INSERT INTO Rounds (round_id, round_name)
+    SELECT {round_key}, s.round_name
+    FROM (SELECT DISTINCT round_name FROM staged_matches) s
+    WHERE NOT EXISTS (SELECT 1 FROM Rounds r WHERE r.round_name = s.round_name);
+    """),
+    ("cities", """
+    INSERT INTO City (city_id, city_name)
+    SELECT {city_key}, s.city_name
+    FROM (SELECT DISTINCT city_name FROM staged_matches) s
+    WHERE NOT EXISTS (SELECT 1 FROM City c WHERE c.city_name = s.city_name);
+    """),
+    ("match_time", """
+    INSERT INTO MatchTime (time_id, date_, day_, month_, year_)
+    SELECT
+      {time_key},
+      s.date_,
+      EXTRACT(DAY FROM s.date_),
+      EXTRACT(MONTH FROM s.date_),
+      EXTRACT(YEAR FROM s.date_)
+    FROM (SELECT DISTINCT date_ FROM staged_matches) s
+    WHERE NOT EXISTS (SELECT 1 FROM MatchTime t WHERE t.date_ IS NOT DISTINCT FROM s.date_);
+    """),
+]
 
+# match_id numérote les matchs dans l'ordre de leur clé naturelle : c'est
+# l'identifiant d'un chargement complet (tables vidées), et l'ordre
+# d'attribution des nouveaux identifiants d'un chargement incrémental.
+SQL_KEY_MATCHES = [
+    ("keyed_matches", """
+    CREATE OR REPLACE TEMP TABLE keyed_matches AS
+    SELECT
+      ROW_NUMBER() OVER (ORDER BY s.date_, s.home_team, s.away_team, s.match_rank)::INTEGER AS match_id,
+      s.*,
+      r.round_id,
+      c.city_id,
+      t.time_id,
+      th.team_id AS home_team_id,
+      ta.team_id AS away_team_id
+    FROM (
+        SELECT
+          *,
+          ROW_NUMBER() OVER (
+              PARTITION BY date_, home_team, away_team
+              ORDER BY round_name, city_name, home_goals, away_goals, home_result, away_result
+          ) AS match_rank
+        FROM staged_matches
+    ) s
+    JOIN Rounds r    ON r.round_name = s.round_name
+    JOIN City c      ON c.city_name = s.city_name
+    JOIN MatchTime t ON t.date_ IS NOT DISTINCT FROM s.date_
+    JOIN Teams th    ON th.team_name = s.home_team
+    JOIN Teams ta    ON ta.team_name = s.away_team;
+    """),
+]
+
+# Les lignes domicile et extérieur de Plays sont écrites en une seule
+# instruction par un UNPIVOT ; INCLUDE NULLS conserve le côté d'un match
+# dont le score est inconnu.
+SQL_INSERT_PLAYS = """
 INSERT INTO Plays (match_id, team_id, position_, goal_nb, result_)
-SELECT
-  m.match_id,
-  ta.team_id,
-  'away',
-  m."Away Team Goals",
-  m."Away result"
-FROM match_map m
-JOIN Teams ta ON ta.team_name = m."Away Team Name";
-
-DROP TABLE match_map;
+SELECT match_id, team_id, position_, goal_nb, result_
+FROM {source} UNPIVOT INCLUDE NULLS (
+    (team_id, goal_nb, result_) FOR position_ IN (
+        (home_team_id, home_goals, home_result) AS home,
+        (away_team_id, away_goals, away_result) AS away
+    )
+);
 """
 
+SQL_PIPELINE = SQL_STAGE_MATCHES + SQL_DIMENSIONS + SQL_KEY_MATCHES + [
+    ("matches", """
+    INSERT INTO Matches (match_id, round_id, city_id, time_id)
+    SELECT match_id, round_id, city_id, time_id
+    FROM keyed_matches;
+    """),
+    ("plays", SQL_INSERT_PLAYS.format(source="keyed_matches")),
+    ("cleanup", """
+    DROP TABLE staged_matches;
+    DROP TABLE keyed_matches;
+    """),
+]
+
 TRUNCATE_ALL = """
 TRUNCATE TABLE Plays;
 TRUNCATE TABLE Matches;
@@ -95,12 +142,305 @@ TRUNCATE TABLE Rounds;
 TRUNCATE TABLE Teams;
 """
 
-def load_matches(df, db_path="./../db/db.duckdb"):
-    con = duckdb.connect(db_path)
-    con.register("staging_matches", df)
-    con.execute(TRUNCATE_ALL)
-    con.commit()
-    con.execute(SQL_PIPELINE)
+# Chargement incrémental : les matchs de keyed_matches sont comparés à ceux
+# de la base ; seuls les nouveaux et ceux dont le contenu a changé sont écrits.
+SQL_INCREMENTAL_DIFF = [
+    ("existing_matches", """
+    CREATE OR REPLACE TEMP TABLE existing_matches AS
+    SELECT
+      m.match_id,
+      mt.date_,
+      th.team_name AS home_team,
+      ta.team_name AS away_team,
+      ROW_NUMBER() OVER (
+          PARTITION BY mt.date_, th.team_name, ta.team_name
+          ORDER BY r.round_name, c.city_name, ph.goal_nb, pa.goal_nb, ph.result_, pa.result_
+      ) AS match_rank,
+      m.round_id,
+      m.city_id,
+      ph.goal_nb AS home_goals,
+      pa.goal_nb AS away_goals,
+      ph.result_ AS home_result,
+      pa.result_ AS away_result
+    FROM Matches m
+    JOIN MatchTime mt ON mt.time_id = m.time_id
+    JOIN Rounds r     ON r.round_id = m.round_id
+    JOIN City c       ON c.city_id = m.city_id
+    JOIN Plays ph ON ph.match_id = m.match_id AND ph.position_ = 'home'
+    JOIN Teams th ON th.team_id = ph.team_id
+    JOIN Plays pa ON pa.match_id = m.match_id AND pa.position_ = 'away'
+    JOIN Teams ta ON ta.team_id = pa.team_id;
+    """),
+    ("match_changes", """
+    CREATE OR REPLACE TEMP TABLE match_changes AS
+    SELECT
+      COALESCE(
+          e.match_id,
+          (SELECT COALESCE(MAX(match_id), 0) FROM Matches)
+            + ROW_NUMBER() OVER (PARTITION BY e.match_id IS NULL ORDER BY s.match_id)
+      )::INTEGER AS match_id,
+      e.match_id IS NULL AS is_new,
+      s.* EXCLUDE (match_id)
+    FROM keyed_matches s
+    LEFT JOIN existing_matches e
+      ON  e.date_ IS NOT DISTINCT FROM s.date_
+      AND e.home_team = s.home_team
+      AND e.away_team = s.away_team
+      AND e.match_rank = s.match_rank
+    WHERE e.match_id IS NULL
+       OR e.round_id <> s.round_id
+       OR e.city_id <> s.city_id
+       OR e.home_goals IS DISTINCT FROM s.home_goals
+       OR e.away_goals IS DISTINCT FROM s.away_goals
+       OR e.home_result IS DISTINCT FROM s.home_result
+       OR e.away_result IS DISTINCT FROM s.away_result;
+    """),
+]
+
+# DuckDB refuse de modifier une ligne de Matches encore référencée par Plays
+# dans la même transaction : les Plays des matchs corrigés sont supprimés,
+# puis Matches est mis à jour, puis les Plays sont réinsérés, chaque étape
+# dans sa propre instruction.
+SQL_INCREMENTAL_APPLY = [
+    ("matches", """
+    INSERT INTO Matches (match_id, round_id, city_id, time_id)
+    SELECT match_id, round_id, city_id, time_id
+    FROM match_changes
+    WHERE is_new;
+    """),
+    ("delete_plays", """
+    DELETE FROM Plays
+    WHERE match_id IN (SELECT match_id FROM match_changes WHERE NOT is_new);
+    """),
+    ("update_matches", """
+    UPDATE Matches
+    SET round_id = c.round_id, city_id = c.city_id
+    FROM match_changes c
+    WHERE Matches.match_id = c.match_id AND NOT c.is_new;
+    """),
+    ("plays", SQL_INSERT_PLAYS.format(source="match_changes")),
+    ("cleanup", """
+    DROP TABLE staged_matches;
+    DROP TABLE keyed_matches;
+    DROP TABLE existing_matches;
+    DROP TABLE match_changes;
+    """),
+]
+
+
+# Table et colonne de clé de chaque dimension, pour générer les clés de substitution
+KEY_COLUMNS = {
+    "team": ("Teams", "team_id"),
+    "round": ("Rounds", "round_id"),
+    "city": ("City", "city_id"),
+    "time": ("MatchTime", "time_id"),
+}
+
+# Clé naturelle de chaque dimension, telle qu'elle apparaît dans SQL_DIMENSIONS
+NATURAL_KEYS = {
+    "team": "s.team_name",
+    "round": "s.round_name",
+    "city": "s.city_name",
+    "time": "s.date_",
+}
+
+# Durée de chaque étape SQL affichée après le chargement avec ETL_SQL_TIMINGS=1
+SQL_TIMINGS = os.environ.get("ETL_SQL_TIMINGS", "0") == "1"
+
+KEY_TYPES_BY_SQL_TYPE = {
+    "UUID": "uuid",
+    "INTEGER": "integer",
+    "UBIGINT": "hash",
+}
+
+
+def get_key_type(con):
+    """
+    Déduit la stratégie de clé (uuid, integer, hash) du schéma créé par
+    db_creation, ou None si le schéma n'existe pas encore.
+    """
+    row = con.execute(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE lower(table_name) = 'teams' AND column_name = 'team_id'"
+    ).fetchone()
+    return KEY_TYPES_BY_SQL_TYPE[row[0]] if row else None
+
+
+def key_expression(key_type, table, key_column, natural_key):
+    if key_type == "uuid":
+        return "uuid()"
+    if key_type == "integer":
+        # Les nouvelles clés suivent la plus grande clé existante : les clés déjà
+        # attribuées ne bougent pas lors d'un chargement incrémental
+        return (
+            f"(SELECT COALESCE(MAX({key_column}), 0) FROM {table})"
+            f" + ROW_NUMBER() OVER (ORDER BY {natural_key})"
+        )
+    if key_type == "hash":
+        return f"md5_number_upper(COALESCE(CAST({natural_key} AS VARCHAR), ''))"
+    raise ValueError(f"Type de clé inconnu : {key_type}")
+
+
+def render_keys(sql, key_type, natural_keys):
+    """Remplace les marqueurs {team_key}, {round_key}... par l'expression de clé adaptée."""
+    return sql.format(**{
+        f"{name}_key": key_expression(key_type, table, key_column, natural_keys[name])
+        for name, (table, key_column) in KEY_COLUMNS.items()
+    })
+
+
+def run_steps(con, steps, key_type, timings=None):
+    """Exécute les étapes (nom, sql) dans l'ordre ; ajoute (nom, durée en s) à timings."""
+    for name, sql in steps:
+        start = time.perf_counter()
+        con.execute(render_keys(sql, key_type, NATURAL_KEYS))
+        if timings is not None:
+            timings.append((name, time.perf_counter() - start))
+
+
+def print_timings(timings):
+    total = sum(seconds for _, seconds in timings) or 1
+    print("⏱️  Étapes SQL du chargement :")
+    for name, seconds in timings:
+        print(f"   {name:<18} {seconds * 1000:>9.1f} ms  {seconds / total:>6.1%}")
+
+
+def load_matches_incremental(con, key_type="uuid", timings=None):
+    """Upsert de staging_matches ; retourne (ids des matchs insérés, ids des matchs corrigés)."""
+    steps = SQL_STAGE_MATCHES + SQL_DIMENSIONS + SQL_KEY_MATCHES + SQL_INCREMENTAL_DIFF
+    run_steps(con, steps, key_type, timings)
+    inserted, updated = con.execute(
+        "SELECT list(match_id) FILTER (WHERE is_new), list(match_id) FILTER (WHERE NOT is_new) FROM match_changes"
+    ).fetchone()
+    run_steps(con, SQL_INCREMENTAL_APPLY, key_type, timings)
+    return inserted or [], updated or []
+
+
+# Préparation de staging_matches, lue une seule fois par l'étape staged_matches :
+# - pandas : le DataFrame est enregistré tel quel (colonnes object relues à chaque scan)
+# - arrow  : conversion unique en table Arrow typée, chaînes encodées en dictionnaire
+# - table  : la table Arrow est copiée une fois dans une table temporaire DuckDB
+# - duckdb : staging_matches existe déjà dans la connexion (extraction SQL de
+#   duckdb_extract.py), df vaut None
+STAGING_MODE = os.environ.get("ETL_STAGING", "table")
+
+STAGING_COLUMNS = {
+    "Datetime": "timestamp",
+    "Stage": "text",
+    "City": "text",
+    "Home Team Name": "text",
+    "Home Team Goals": "int",
+    "Away Team Goals": "int",
+    "Away Team Name": "text",
+    "Home Result": "text",
+    "Away Result": "text",
+}
+
+
+def to_staging_arrow(df):
+    """Convertit le DataFrame fusionné en table Arrow au schéma de staging."""
+    arrow_types = {
+        "timestamp": pa.timestamp("us"),
+        "text": pa.dictionary(pa.int32(), pa.string()),
+        "int": pa.int32(),
+    }
+    schema = pa.schema([(col, arrow_types[kind]) for col, kind in STAGING_COLUMNS.items()])
+    return pa.Table.from_pandas(df[list(STAGING_COLUMNS)], schema=schema, preserve_index=False)
+
+
+def stage_matches(con, df, mode=None):
+    """Expose df sous le nom staging_matches selon le mode de staging choisi."""
+    mode = mode or STAGING_MODE
+    if mode not in ("pandas", "arrow", "table", "duckdb"):
+        raise ValueError(f"Mode de staging inconnu : {mode} (attendu : pandas, arrow, table, duckdb)")
+    if mode == "duckdb":
+        return
+    if mode == "pandas" or pa is None:
+        source = df
+    else:
+        source = to_staging_arrow(df)
+
+    if mode == "table":
+        con.register("staging_source", source)
+        con.execute("CREATE OR REPLACE TEMP TABLE staging_matches AS SELECT * FROM staging_source")
+        con.unregister("staging_source")
+    else:
+        con.register("staging_matches", source)
+
+
+def unstage_matches(con, mode=None):
+    if (mode or STAGING_MODE) in ("table", "duckdb"):
+        con.execute("DROP TABLE IF EXISTS staging_matches")
+    else:
+        con.unregister("staging_matches")
+
+
+def load_matches(df, db_path=None, incremental=False, materialize=False, staging=None, timings=None):
+    """
+    Charge les matchs fusionnés dans le schéma en étoile. timings, si fourni,
+    reçoit la durée de chaque étape SQL (affichée avec ETL_SQL_TIMINGS=1).
+    """
+    timings = [] if timings is None else timings
+    con = get_connection(db_path)
+    start = time.perf_counter()
+    stage_matches(con, df, staging)
+    timings.append(("staging", time.perf_counter() - start))
+    key_type = get_key_type(con)
+    if incremental:
+        inserted, updated = load_matches_incremental(con, key_type, timings)
+        print(f"Chargement incrémental : {len(inserted)} matchs insérés, {len(updated)} matchs corrigés")
+    else:
+        start = time.perf_counter()
+        con.execute(TRUNCATE_ALL)
+        con.commit()
+        timings.append(("truncate", time.perf_counter() - start))
+        run_steps(con, SQL_PIPELINE, key_type, timings)
     con.commit()
-    con.unregister("staging_matches")
-    con.close()
\ No newline at end of file
+    if SQL_TIMINGS:
+        print_timings(timings)
+    unstage_matches(con, staging)
+    # Matchs touchés par ce chargement (None : tout l'historique a été rechargé)
+    match_ids = inserted + updated if incremental else None
+    if materialize:
+        etl_view.refresh_flat_table(con, match_ids)
+    return match_ids
+
+
+# Matchs de la base absents du DataFrame (supprimés par un rechargement complet)
+SQL_PREVIEW_REMOVED = """
+SELECT COUNT(*)
+FROM existing_matches e
+WHERE NOT EXISTS (
+    SELECT 1 FROM keyed_matches s
+    WHERE s.date_ IS NOT DISTINCT FROM e.date_
+      AND s.home_team = e.home_team
+      AND s.away_team = e.away_team
+      AND s.match_rank = e.match_rank
+);
+"""
+
+
+def preview_load(df, db_path=None, staging=None, prepare=None):
+    """
+    Simulation d'un chargement (--dry-run) : le calcul des différences est
+    fait dans une transaction annulée, la base n'est pas modifiée. prepare(con),
+    si fourni, est appelé dans cette transaction avant le staging (extraction
+    DuckDB qui construit staging_matches).
+    Retourne le nombre de matchs nouveaux, corrigés et absents de df.
+    """
+    con = get_connection(db_path)
+    con.begin()
+    try:
+        if prepare is not None:
+            prepare(con)
+        stage_matches(con, df, staging)
+        steps = SQL_STAGE_MATCHES + SQL_DIMENSIONS + SQL_KEY_MATCHES + SQL_INCREMENTAL_DIFF
+        run_steps(con, steps, get_key_type(con))
+        new, changed = con.execute(
+            "SELECT COUNT(*) FILTER (WHERE is_new), COUNT(*) FILTER (WHERE NOT is_new) FROM match_changes"
+        ).fetchone()
+        removed = con.execute(SQL_PREVIEW_REMOVED).fetchone()[0]
+    finally:
+        con.rollback()
+        unstage_matches(con, staging)
+    return {"new": new, "changed": changed, "removed": removed}
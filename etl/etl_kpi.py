@@ -0,0 +1,119 @@
+from config import get_connection
+
+# Les résultats viennent de sources différentes : "winner"/"loser" (1930-2018)
+# ou "win"/"loss" (2022)
+WIN = "('winner', 'win')"
+LOSS = "('loser', 'loss')"
+
+# Chaque KPI est agrégé par édition (année du match) à partir de v_matches_flat ;
+# {source} est remplacé par la vue filtrée sur les éditions à recalculer
+KPI_QUERIES = {
+    "kpi_team_edition": f"""
+        SELECT
+            year_ AS edition,
+            team,
+            COUNT(*) AS played,
+            COUNT(*) FILTER (WHERE result IN {WIN}) AS wins,
+            COUNT(*) FILTER (WHERE result = 'draw') AS draws,
+            COUNT(*) FILTER (WHERE result IN {LOSS}) AS losses,
+            SUM(goals_for) AS goals_for,
+            SUM(goals_against) AS goals_against
+        FROM (
+            SELECT year_, home_team AS team, home_goals AS goals_for, away_goals AS goals_against, home_result AS result
+            FROM {{source}}
+            UNION ALL
+            SELECT year_, away_team, away_goals, home_goals, away_result
+            FROM {{source}}
+        ) t
+        GROUP BY year_, team
+        ORDER BY edition, team
+    """,
+    "kpi_round_goals": """
+        SELECT
+            year_ AS edition,
+            stage,
+            COUNT(*) AS matches,
+            SUM(home_goals + away_goals) AS goals,
+            AVG(home_goals + away_goals) AS goals_per_match
+        FROM {source}
+        GROUP BY year_, stage
+        ORDER BY edition, stage
+    """,
+    "kpi_city_matches": """
+        SELECT
+            year_ AS edition,
+            city,
+            COUNT(*) AS matches
+        FROM {source}
+        GROUP BY year_, city
+        ORDER BY edition, city
+    """,
+    "kpi_home_advantage": f"""
+        SELECT
+            year_ AS edition,
+            COUNT(*) AS matches,
+            COUNT(*) FILTER (WHERE home_result IN {WIN}) AS home_wins,
+            COUNT(*) FILTER (WHERE home_result = 'draw') AS draws,
+            COUNT(*) FILTER (WHERE away_result IN {WIN}) AS away_wins,
+            COUNT(*) FILTER (WHERE home_result IN {WIN}) / COUNT(*) AS home_win_rate
+        FROM {{source}}
+        GROUP BY year_
+        ORDER BY edition
+    """,
+}
+
+ALL_EDITIONS = "v_matches_flat"
+SELECTED_EDITIONS = "(SELECT * FROM v_matches_flat WHERE list_contains($editions, year_))"
+
+
+def table_exists(con, table):
+    return con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [table]
+    ).fetchone()[0] > 0
+
+
+def editions_of_matches(con, match_ids):
+    """Éditions (années) concernées par une liste de match_id."""
+    rows = con.execute(
+        """
+        SELECT DISTINCT mt.year_
+        FROM Matches m
+        JOIN MatchTime mt ON mt.time_id = m.time_id
+        WHERE list_contains($match_ids, m.match_id)
+        """,
+        {"match_ids": list(match_ids)},
+    ).fetchall()
+    return sorted(year for (year,) in rows)
+
+
+def refresh_kpis(con, editions=None):
+    """
+    Matérialise les tables KPI dans une transaction. Sans editions, tout est
+    recalculé ; sinon seules les lignes de ces éditions sont remplacées.
+    """
+    con.begin()
+    try:
+        for table, query in KPI_QUERIES.items():
+            if editions is None or not table_exists(con, table):
+                con.execute(f"CREATE OR REPLACE TABLE {table} AS {query.format(source=ALL_EDITIONS)}")
+            elif editions:
+                params = {"editions": list(editions)}
+                con.execute(f"DELETE FROM {table} WHERE list_contains($editions, edition)", params)
+                con.execute(f"INSERT INTO {table} {query.format(source=SELECTED_EDITIONS)}", params)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+
+def create_kpis(db_path=None, match_ids=None, editions=None):
+    """
+    Étape KPI, à lancer après create_view. match_ids (retour de load_matches)
+    limite le recalcul aux éditions des matchs insérés ou corrigés ; editions
+    désigne directement les éditions à recalculer.
+    """
+    con = get_connection(db_path)
+    if editions is None and match_ids is not None:
+        editions = editions_of_matches(con, match_ids)
+    refresh_kpis(con, editions)
+    print(f"KPI recalculés pour {'toutes les éditions' if editions is None else editions}")
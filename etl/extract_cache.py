@@ -0,0 +1,88 @@
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger("ETL")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.environ.get("ETL_CACHE_DIR", PROJECT_ROOT / "db" / "cache" / "extract"))
+# Cache désactivé avec ETL_CACHE=0 ; taille maximale du dossier avant éviction
+CACHE_ENABLED = os.environ.get("ETL_CACHE", "1") == "1"
+CACHE_MAX_BYTES = int(os.environ.get("ETL_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+# À incrémenter si le format des fichiers de cache change
+CACHE_FORMAT_VERSION = "1"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(name, input_files, code_files):
+    """
+    Clé du résultat d'un extracteur : contenu de ses fichiers source et du
+    code qui les nettoie. Toute modification de l'un d'eux change la clé.
+    """
+    digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}:{name}".encode())
+    for path in list(input_files) + list(code_files):
+        digest.update(f"{Path(path).name}:{file_digest(path)}".encode())
+    return digest.hexdigest()[:32]
+
+
+def cache_path(name, key):
+    safe_name = "".join(c if c.isalnum() else "_" for c in name)
+    return CACHE_DIR / f"{safe_name}-{key}.parquet"
+
+
+def evict(max_bytes=None):
+    """Supprime les fichiers les moins récemment utilisés jusqu'à repasser sous max_bytes."""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    files = sorted(CACHE_DIR.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in files)
+    for path in files:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+        logger.info("Cache extracteur évincé : %s", path.name)
+
+
+def cached_extract(name, extractor, input_files, code_files, write=True):
+    """
+    Retourne le DataFrame nettoyé depuis le cache Parquet si ni les fichiers
+    source ni le code n'ont changé, sinon lance l'extracteur et enregistre
+    son résultat. Les anciennes versions d'une source sont supprimées.
+    Avec write=False (--dry-run), le cache est lu mais jamais modifié.
+    """
+    if not CACHE_ENABLED:
+        return extractor()
+
+    path = cache_path(name, cache_key(name, input_files, code_files))
+    if path.exists():
+        os.utime(path)  # marque l'entrée comme récemment utilisée pour l'éviction
+        print(f"♻️  {name}: résultat lu depuis le cache ({path.name})")
+        return pd.read_parquet(path)
+
+    df = extractor()
+    if not write:
+        return df
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for stale in CACHE_DIR.glob(f"{path.name.split('-')[0]}-*.parquet"):
+            stale.unlink(missing_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{time.time_ns()}.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        evict()
+    except (OSError, ImportError) as e:
+        # ImportError : pyarrow absent, le pipeline continue sans cache
+        logger.warning("Résultat de %s non mis en cache : %s", name, e)
+    return df
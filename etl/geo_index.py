@@ -0,0 +1,102 @@
+import gzip
+import importlib.metadata
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from unidecode import unidecode
+
+logger = logging.getLogger("ETL")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+INDEX_DIR = Path(os.environ.get("GEO_INDEX_DIR", PROJECT_ROOT / "db" / "cache"))
+
+
+@lru_cache(maxsize=None)
+def get_geonames():
+    """
+    Fournisseur paresseux du référentiel geonamescache : le module et ses
+    fichiers JSON ne sont chargés qu'au premier appel, puis gardés en cache.
+    """
+    import geonamescache
+    return geonamescache.GeonamesCache()
+
+
+def get_cities():
+    return get_geonames().get_cities()
+
+
+def get_countries():
+    return get_geonames().get_countries()
+
+
+def normalize_city_key(name):
+    """Clé de recherche d'une ville : translittérée, minuscule, sans espaces autour."""
+    return unidecode(str(name)).lower().strip()
+
+
+def geonames_version():
+    try:
+        return importlib.metadata.version("geonamescache")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def index_path(include_alternate_names=False):
+    suffix = "_alt" if include_alternate_names else ""
+    return INDEX_DIR / f"geonames_cities_{geonames_version()}{suffix}.json.gz"
+
+
+def build_city_index(cities, include_alternate_names=False):
+    """
+    Construit l'index nom normalisé -> nom canonique normalisé.
+    Les noms officiels sont prioritaires ; les noms alternatifs sont rattachés
+    à la ville la plus peuplée qui les porte.
+    """
+    index = {}
+    for c in cities.values():
+        key = normalize_city_key(c["name"])
+        index.setdefault(key, key)
+
+    if include_alternate_names:
+        by_population = sorted(cities.values(), key=lambda c: c.get("population") or 0, reverse=True)
+        for c in by_population:
+            canonical = normalize_city_key(c["name"])
+            for alt in c.get("alternatenames") or []:
+                alt_key = normalize_city_key(alt)
+                if alt_key:
+                    index.setdefault(alt_key, canonical)
+
+    return index
+
+
+@lru_cache(maxsize=None)
+def get_city_index(include_alternate_names=False):
+    """
+    Charge l'index depuis le disque s'il existe pour cette version de
+    geonamescache, sinon le construit une fois et le persiste.
+    """
+    path = index_path(include_alternate_names)
+    if path.exists():
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    index = build_city_index(get_cities(), include_alternate_names)
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Index des villes non persisté (%s) : %s", path, e)
+
+    return index
+
+
+def lookup_city(name, include_alternate_names=False):
+    """Retourne le nom canonique d'une ville, ou None si elle est inconnue."""
+    return get_city_index(include_alternate_names).get(normalize_city_key(name))
@@ -0,0 +1,189 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows : pic mémoire non mesuré
+    resource = None
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Rapport JSON de chaque exécution de main.py (désactivé avec ETL_REPORT=0)
+REPORT_ENABLED = os.environ.get("ETL_REPORT", "1") == "1"
+REPORT_DIR = Path(os.environ.get("ETL_REPORT_DIR", PROJECT_ROOT / "db" / "reports"))
+# Copie des mesures dans la table DuckDB etl_runs avec ETL_RUNS_TABLE=1
+RUNS_TABLE_ENABLED = os.environ.get("ETL_RUNS_TABLE", "0") == "1"
+
+SQL_CREATE_RUNS = """
+CREATE TABLE IF NOT EXISTS etl_runs (
+    run_id VARCHAR,
+    started_at TIMESTAMP,
+    stage VARCHAR,
+    wall_s DOUBLE,
+    cpu_s DOUBLE,
+    rows_in BIGINT,
+    rows_out BIGINT,
+    peak_rss_mb DOUBLE,
+    ok BOOLEAN
+);
+"""
+
+RUN_COLUMNS = ["stage", "wall_s", "cpu_s", "rows_in", "rows_out", "peak_rss_mb", "ok"]
+
+_lock = threading.Lock()
+_records = []
+
+
+def utc_now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+_run = {"run_id": uuid.uuid4().hex, "started_at": utc_now(), "config": {}}
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus depuis son démarrage, en Mo."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sur macOS, en kilo-octets ailleurs
+    return round(peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def cpu_clock():
+    """
+    Horloge CPU d'une étape. Dans un thread secondaire (pool de threads de
+    l'extraction), time.process_time compterait aussi le CPU des étapes
+    concurrentes : on mesure alors le CPU du seul thread. Dans le thread
+    principal, le CPU du processus inclut les threads natifs (DuckDB, Polars,
+    pyarrow) lancés par l'étape.
+    """
+    if threading.current_thread() is threading.main_thread():
+        return "process", time.process_time
+    return "thread", time.thread_time
+
+
+def row_count(value):
+    """Nombre de lignes d'un résultat ; pour un tuple, celui de son premier élément."""
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if value is None or isinstance(value, (str, bytes)) or not hasattr(value, "__len__"):
+        return None
+    return len(value)
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Mesure une étape : durée réelle, temps CPU (du processus ou du thread,
+    voir cpu_clock et record["cpu_clock"]), lignes en entrée et en sortie,
+    pic mémoire. Le bloc peut renseigner record["rows_out"].
+
+        with stage("2014.read") as record:
+            df = pd.read_csv(...)
+            record["rows_out"] = len(df)
+    """
+    record = {"stage": name, "rows_in": rows_in, "rows_out": None, "pid": os.getpid()}
+    record["cpu_clock"], cpu_time = cpu_clock()
+    peak_before = peak_rss_mb()
+    wall, cpu = time.perf_counter(), cpu_time()
+    record["ok"] = False
+    try:
+        yield record
+        record["ok"] = True
+    finally:
+        record["wall_s"] = round(time.perf_counter() - wall, 6)
+        record["cpu_s"] = round(cpu_time() - cpu, 6)
+        record["peak_rss_mb"] = peak_rss_mb()
+        if peak_before is not None:
+            # Hausse du pic pendant l'étape : 0 si elle reste sous le pic déjà atteint
+            record["peak_rss_growth_mb"] = round(record["peak_rss_mb"] - peak_before, 1)
+        with _lock:
+            _records.append(record)
+
+
+def instrumented(name):
+    """Décorateur : mesure chaque appel comme une étape ; rows_out = len(résultat)."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as record:
+                result = func(*args, **kwargs)
+                record["rows_out"] = row_count(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def start_run(**config):
+    """Démarre une nouvelle exécution : identifiant, date, configuration, mesures vidées."""
+    with _lock:
+        _records.clear()
+        _run.update(
+            run_id=uuid.uuid4().hex,
+            started_at=utc_now(),
+            config=config,
+        )
+
+
+def drain():
+    """Retire et retourne les mesures de ce processus (rapatriées depuis un worker)."""
+    with _lock:
+        records = list(_records)
+        _records.clear()
+    return records
+
+
+def add_records(records):
+    with _lock:
+        _records.extend(records)
+
+
+def run_report():
+    with _lock:
+        stages = [dict(record) for record in _records]
+    return {**_run, "stages": stages}
+
+
+def write_report(path=None):
+    """Écrit le rapport JSON de l'exécution ; retourne son chemin."""
+    report = run_report()
+    path = Path(path) if path else REPORT_DIR / f"etl_run_{report['run_id']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def save_runs(db_path=None):
+    """Ajoute les mesures de l'exécution à la table etl_runs de la base."""
+    from config import get_connection
+
+    report = run_report()
+    rows = [
+        [report["run_id"], report["started_at"]] + [record.get(col) for col in RUN_COLUMNS]
+        for record in report["stages"]
+    ]
+    con = get_connection(db_path)
+    con.execute(SQL_CREATE_RUNS)
+    if rows:
+        con.executemany(f"INSERT INTO etl_runs VALUES (?, ?, {', '.join('?' for _ in RUN_COLUMNS)})", rows)
+
+
+def print_summary():
+    print("⏱️  Étapes de l'ETL :")
+    print(f"   {'étape':<24} {'durée (s)':>9} {'CPU (s)':>8} {'lignes in':>10} {'lignes out':>10} {'pic (Mo)':>9}")
+    for record in run_report()["stages"]:
+        rows_in = "" if record["rows_in"] is None else record["rows_in"]
+        rows_out = "" if record["rows_out"] is None else record["rows_out"]
+        peak = "" if record.get("peak_rss_mb") is None else record["peak_rss_mb"]
+        print(
+            f"   {record['stage']:<24} {record['wall_s']:>9.2f} {record['cpu_s']:>8.2f}"
+            f" {rows_in:>10} {rows_out:>10} {peak:>9}"
+        )
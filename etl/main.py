@@ -1,23 +1,329 @@
 import etl_clean_1930_2010 as etl_base
 import etl_inserter_2014 as inserter
 import etl_create_view as etl_view
+import etl_kpi as etl_kpi
+import etl_1930_2010 as etl_1930_2010
 import etl_2014 as etl_2014
 import etl_2018 as etl_2018
 import etl_2022 as etl_2022
 import db_creation as db_creator
-import pandas as pd
+import argparse
+import os
+import numpy as np
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import config
+import corrections
+import duckdb_extract
+import geo_index
+import instrumentation
+import normalize_cache
+import polars_extract
+import source_schema
+import team_pairs
+from extract_cache import cache_key, cache_path, cached_extract
+from normalize_cache import cache_stats
 
+# Nombre de workers pour l'extraction (1 = séquentiel) et type de pool ("thread" ou "process")
+ETL_WORKERS = int(os.environ.get("ETL_WORKERS", "1"))
+ETL_EXECUTOR = os.environ.get("ETL_EXECUTOR", "thread")
+# Chargement incrémental (upsert) au lieu du TRUNCATE + rechargement complet
+ETL_INCREMENTAL = os.environ.get("ETL_INCREMENTAL", "0") == "1"
+# Type des clés de substitution à la création du schéma : uuid, integer ou hash
+# (sans valeur : celui de la base existante, uuid pour une nouvelle base)
+ETL_KEY_TYPE = os.environ.get("ETL_KEY_TYPE") or None
+# Table matches_flat pré-jointe, rafraîchie à la fin du chargement
+ETL_MATERIALIZE = os.environ.get("ETL_MATERIALIZE", "0") == "1"
+# Moteur d'extraction : pandas (extracteurs get_cleaned_*), duckdb (SQL,
+# duckdb_extract.py) ou polars (plan paresseux, polars_extract.py)
+ETL_EXTRACT_ENGINE = os.environ.get("ETL_EXTRACT_ENGINE", "pandas")
+EXTRACT_ENGINES = ("pandas", "duckdb", "polars")
 
-def merge_data():
-    big_df = etl_base.get_cleaned_1930_data()
-    df_2014 = etl_2014.get_cleaned_2014_data()
-    df_2018 = etl_2018.get_cleaned_2018_data('data/data_2018.json')
-    df_2022 = etl_2022.get_cleaned_2022_data()
-    big_df = pd.concat([big_df, df_2014, df_2018, df_2022], ignore_index=True)
-    big_df["Datetime"] = pd.to_datetime(big_df["Datetime"], errors="coerce")
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+# Sources indépendantes, dans l'ordre de concaténation final :
+# (nom, extracteur, fichiers lus, modules dont dépend le nettoyage)
+SOURCES = [
+    ("1930-2010", etl_base.get_cleaned_1930_data,
+     [etl_1930_2010.INPUT_FILE, etl_1930_2010.DATETIME_FILE, etl_1930_2010.CORRECTIONS_FILE],
+     [etl_base, etl_1930_2010, corrections, normalize_cache, team_pairs]),
+    ("2014", etl_2014.get_cleaned_2014_data,
+     [etl_2014.INPUT_FILE],
+     [etl_2014, geo_index, normalize_cache, source_schema]),
+    ("2018", partial(etl_2018.get_cleaned_2018_data, etl_2018.INPUT_FILE),
+     [etl_2018.INPUT_FILE],
+     [etl_2018, normalize_cache]),
+    ("2022", etl_2022.get_cleaned_2022_data,
+     etl_2022.INPUT_FILES,
+     [etl_2022, source_schema, team_pairs]),
+]
+
+
+SOURCE_EDITIONS = source_schema.SOURCE_EDITIONS
+
+
+def select_sources(names=None, editions=None):
+    """
+    Sources de SOURCES retenues par les filtres : noms demandés (tous par
+    défaut), puis seulement celles qui couvrent au moins une des éditions.
+    """
+    unknown = set(names or []) - {source[0] for source in SOURCES}
+    if unknown:
+        raise ValueError(f"Source inconnue : {', '.join(sorted(unknown))} (attendu : {', '.join(SOURCE_EDITIONS)})")
+    return [
+        source for source in SOURCES
+        if (not names or source[0] in names)
+        and (not editions or any(year in SOURCE_EDITIONS[source[0]] for year in editions))
+    ]
+
+
+def timed_extract(name, extractor, collect=False):
+    """
+    Lance un extracteur dans une étape mesurée. Avec collect=True (worker en
+    processus séparé), renvoie aussi les mesures prises dans le worker.
+    """
+    if collect:
+        # Un worker créé par fork hérite des mesures du parent : on les écarte
+        instrumentation.drain()
+    with instrumentation.stage(f"extract.{name}") as record:
+        df = extractor()
+        record["rows_out"] = len(df)
+    records = instrumentation.drain() if collect else []
+    return df, record["wall_s"], records
+
+
+def extract_sources(workers=None, executor=None, sources=None, write_cache=True):
+    """
+    Lance les extracteurs (toutes les SOURCES par défaut), en parallèle si
+    workers > 1. Les résultats sont toujours rendus dans l'ordre des sources.
+    write_cache=False lit le cache sans l'alimenter (--dry-run).
+    Retourne une liste de (nom, DataFrame, durée en secondes).
+    """
+    workers = ETL_WORKERS if workers is None else workers
+    executor = ETL_EXECUTOR if executor is None else executor
+    sources = SOURCES if sources is None else sources
+
+    # Chaque extracteur passe par le cache de résultats (clé : contenu des fichiers + code)
+    extractors = [
+        partial(cached_extract, name, extractor, input_files, [module.__file__ for module in modules],
+                write=write_cache)
+        for name, extractor, input_files, modules in sources
+    ]
+
+    names = [source[0] for source in sources]
+    if workers <= 1:
+        results = [timed_extract(name, extractor) for name, extractor in zip(names, extractors)]
+    else:
+        if executor not in EXECUTORS:
+            raise ValueError(f"Executor inconnu : {executor} (attendu : {', '.join(EXECUTORS)})")
+        with EXECUTORS[executor](max_workers=workers) as pool:
+            futures = [
+                pool.submit(timed_extract, name, extractor, executor == "process")
+                for name, extractor in zip(names, extractors)
+            ]
+            results = [future.result() for future in futures]
+
+    for _, _, records in results:
+        instrumentation.add_records(records)
+    return [(name, df, elapsed) for name, (df, elapsed, _) in zip(names, results)]
+
+
+def edition_mask(big_df, extracted, editions):
+    """
+    Lignes de big_df (concaténation des sources de extracted, dans l'ordre)
+    gardées par --edition : année demandée, ou date inconnue d'une source
+    entièrement demandée (source_schema.keeps_undated).
+    """
+    undated = big_df["Datetime"].isna().to_numpy()
+    keep_undated = np.repeat([source_schema.keeps_undated(name, editions) for name, _, _ in extracted],
+                             [len(df) for _, df, _ in extracted])
+    dropped = int((undated & ~keep_undated).sum())
+    if dropped:
+        print(f"⚠️  --edition : {dropped} matchs sans date ignorés (source couvrant d'autres éditions)")
+    return big_df["Datetime"].dt.year.isin(editions).to_numpy() | (undated & keep_undated)
+
+
+def merge_data(workers=None, executor=None, sources=None, editions=None, write_cache=True):
+    """Extrait et concatène les sources ; editions garde seulement les matchs de ces années."""
+    start = time.perf_counter()
+    extracted = extract_sources(workers, executor, sources, write_cache)
+    for name, df, elapsed in extracted:
+        print(f"⏱️  {name}: {len(df)} matches en {elapsed:.2f}s")
+    print(f"⏱️  Extraction totale: {time.perf_counter() - start:.2f}s")
+
+    with instrumentation.stage("merge", rows_in=sum(len(df) for _, df, _ in extracted)) as record:
+        big_df = source_schema.concat_canonical(df for _, df, _ in extracted)
+        if editions:
+            big_df = big_df[edition_mask(big_df, extracted, editions)].reset_index(drop=True)
+        record["rows_out"] = len(big_df)
     print(big_df.info())
+    for name, stats in cache_stats().items():
+        print(f"{name}: {stats['rows']} lignes, {stats['misses']} appels, {stats['hits']} hits cache")
     return big_df
 
-db_creator.create_db_schema()
-inserter.load_matches(merge_data())
-etl_view.create_view()
\ No newline at end of file
+
+def extract_frame(args, sources):
+    """DataFrame fusionné des sources, par le moteur pandas ou polars (pandas si polars est absent)."""
+    if args.engine == "polars" and polars_extract.pl is not None:
+        return polars_extract.extract_frame([source[0] for source in sources], args.edition)
+    if args.engine == "polars":
+        print("⚠️  polars n'est pas installé : extraction pandas")
+    return merge_data(args.workers, args.executor, sources, args.edition, write_cache=not args.dry_run)
+
+
+def source_cache_status(source):
+    """'en cache' si le résultat de l'extracteur est déjà dans le cache, sinon 'à extraire'."""
+    name, _, input_files, modules = source
+    key = cache_key(name, input_files, [module.__file__ for module in modules])
+    return "en cache" if cache_path(name, key).exists() else "à extraire"
+
+
+def open_db(args):
+    """Ouvre la connexion partagée de l'exécution avec les réglages DuckDB demandés."""
+    return config.get_connection(args.db, threads=args.threads, memory_limit=args.memory_limit)
+
+
+def cmd_extract(args):
+    sources = select_sources(args.source, args.edition)
+    if args.dry_run:
+        for source in sources:
+            print(f"[dry-run] extract {source[0]} : {', '.join(map(str, source[2]))} ({source_cache_status(source)})")
+        return None
+    if args.engine == "duckdb":
+        df = duckdb_extract.extract_frame([source[0] for source in sources], args.edition)
+    else:
+        df = extract_frame(args, sources)
+    print(f"✅ {len(df)} matchs extraits ({', '.join(source[0] for source in sources)})")
+    return df
+
+
+def cmd_load(args):
+    # Un chargement filtré ne doit pas effacer les autres éditions : il passe en upsert
+    incremental = args.incremental or bool(args.source or args.edition)
+    if args.dry_run and args.db != config.IN_MEMORY and not os.path.exists(args.db):
+        print(f"[dry-run] base {args.db} absente : elle serait créée puis chargée entièrement")
+        return None
+    sources = select_sources(args.source, args.edition)
+    df, staging = None, "duckdb"
+    if args.engine != "duckdb":
+        # Extraction avant l'ouverture de la base : les workers créés par fork n'héritent d'aucune connexion
+        df, staging = extract_frame(args, sources), None
+    con = open_db(args)
+    # staging_matches est construite par SQL directement dans la connexion de la base
+    stage_sources = partial(duckdb_extract.stage_sources, sources=[source[0] for source in sources],
+                            editions=args.edition) if df is None else None
+    if args.dry_run:
+        # Ni schéma ni staging écrits : le type de clé est seulement vérifié, et
+        # l'extraction DuckDB a lieu dans la transaction annulée de preview_load
+        db_creator.resolve_key_type(args.db, args.key_type)
+        if inserter.get_key_type(con) is None:
+            print(f"[dry-run] schéma absent de {args.db} : il serait créé puis chargé entièrement")
+            return None
+        diff = inserter.preview_load(df, args.db, staging=staging, prepare=stage_sources)
+        removed = "" if incremental else f", {diff['removed']} supprimés par le rechargement complet"
+        print(f"[dry-run] load : {diff['new']} matchs nouveaux, {diff['changed']} corrigés{removed}")
+        return None
+    with instrumentation.stage("schema"):
+        db_creator.create_db_schema(args.db, key_type=args.key_type)
+    if stage_sources is not None:
+        stage_sources(con)
+        rows = con.execute("SELECT COUNT(*) FROM staging_matches").fetchone()[0]
+    else:
+        rows = len(df)
+    with instrumentation.stage("load", rows_in=rows):
+        return inserter.load_matches(df, args.db, incremental=incremental, materialize=args.materialize,
+                                     staging=staging)
+
+
+def cmd_view(args, materialize=None):
+    materialize = args.materialize if materialize is None else materialize
+    if args.dry_run:
+        print(f"[dry-run] view : v_matches_flat recréée{', matches_flat rafraîchie' if materialize else ''}")
+        return
+    open_db(args)
+    with instrumentation.stage("view"):
+        etl_view.create_view(args.db, materialize=materialize)
+
+
+def cmd_kpi(args, match_ids=None):
+    # Après un chargement, les matchs touchés désignent déjà les éditions à recalculer
+    editions = (args.edition or None) if match_ids is None else None
+    if args.dry_run:
+        print(f"[dry-run] kpi : recalcul de {editions or 'toutes les éditions'}")
+        return
+    open_db(args)
+    with instrumentation.stage("kpi"):
+        etl_kpi.create_kpis(args.db, match_ids=match_ids, editions=editions)
+
+
+def cmd_run(args):
+    """Pipeline complet : extraction, chargement, vue puis KPI."""
+    match_ids = cmd_load(args)
+    # matches_flat est déjà rafraîchie par load_matches avec --materialize
+    cmd_view(args, materialize=False)
+    cmd_kpi(args, match_ids)
+
+
+COMMANDS = {
+    "run": cmd_run,
+    "extract": cmd_extract,
+    "load": cmd_load,
+    "view": cmd_view,
+    "kpi": cmd_kpi,
+}
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--source", action="append", choices=list(SOURCE_EDITIONS),
+                        help="source à traiter (répétable, toutes par défaut)")
+    common.add_argument("--edition", action="append", type=int,
+                        help="édition (année) à traiter (répétable, toutes par défaut)")
+    common.add_argument("--dry-run", action="store_true", help="affiche ce qui serait fait sans rien écrire")
+    common.add_argument("--db", default=config.DB_PATH, help="chemin de la base DuckDB (:memory: pour une base en mémoire)")
+    common.add_argument("--threads", type=int, default=config.DUCKDB_THREADS, help="threads DuckDB")
+    common.add_argument("--memory-limit", default=config.DUCKDB_MEMORY_LIMIT, help="limite mémoire DuckDB (ex. 2GB)")
+    common.add_argument("--engine", choices=EXTRACT_ENGINES, default=ETL_EXTRACT_ENGINE,
+                        help="moteur d'extraction (pandas, duckdb ou polars)")
+    common.add_argument("--workers", type=int, default=ETL_WORKERS)
+    common.add_argument("--executor", choices=list(EXECUTORS), default=ETL_EXECUTOR)
+    common.add_argument("--incremental", action="store_true", default=ETL_INCREMENTAL,
+                        help="upsert au lieu d'un rechargement complet (implicite avec --source/--edition)")
+    common.add_argument("--key-type", choices=list(db_creator.KEY_TYPES), default=ETL_KEY_TYPE,
+                        help="type des clés d'une nouvelle base (défaut : celui de la base existante, sinon uuid)")
+    common.add_argument("--materialize", action="store_true", default=ETL_MATERIALIZE,
+                        help="rafraîchit aussi la table matches_flat")
+
+    parser = argparse.ArgumentParser(description="ETL des matchs de Coupe du monde (sans commande : run)")
+    subparsers = parser.add_subparsers(dest="command")
+    for name, command in COMMANDS.items():
+        subparsers.add_parser(name, parents=[common], help=command.__doc__ or name)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(["run"])
+    instrumentation.start_run(**vars(args))
+    try:
+        COMMANDS[args.command](args)
+        if args.dry_run:
+            return
+        instrumentation.print_summary()
+        if instrumentation.REPORT_ENABLED:
+            print(f"📝 Rapport d'exécution : {instrumentation.write_report()}")
+        if instrumentation.RUNS_TABLE_ENABLED:
+            instrumentation.save_runs(args.db)
+    finally:
+        # Une seule fermeture par exécution : le WAL est écrit dans la base ici
+        config.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Les colonnes normalisées (équipes, rounds, villes) ont quelques centaines
+# de valeurs distinctes : un cache borné suffit largement
+DEFAULT_MAXSIZE = 4096
+
+_caches = {}
+_rows = {}
+
+
+def _func_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def memoized(func, maxsize=DEFAULT_MAXSIZE):
+    """Retourne la version mise en cache (lru_cache partagé) d'une fonction de normalisation."""
+    name = _func_name(func)
+    if name not in _caches:
+        _caches[name] = lru_cache(maxsize=maxsize)(func)
+        _rows[name] = 0
+    return _caches[name]
+
+
+def apply_memoized(series, func, *args, maxsize=DEFAULT_MAXSIZE):
+    """
+    Équivalent de series.apply(lambda x: func(x, *args)), mais la fonction
+    n'est appelée qu'une fois par valeur distincte : la colonne est factorisée,
+    chaque valeur unique passe par le cache, puis le résultat est redistribué
+    sur les lignes avec take.
+    """
+    cached = memoized(func, maxsize)
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+
+    results = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        results[i] = cached(value, *args)
+
+    _rows[_func_name(func)] += len(series)
+    return pd.Series(list(results.take(codes)), index=series.index, name=series.name, dtype=object).infer_objects()
+
+
+def cache_stats():
+    """Statistiques par fonction : lignes traitées, appels réels, hits du cache."""
+    stats = {}
+    for name, cached in _caches.items():
+        info = cached.cache_info()
+        stats[name] = {
+            "rows": _rows[name],
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+        }
+    return stats
+
+
+def clear_caches():
+    for cached in _caches.values():
+        cached.cache_clear()
+    for name in _rows:
+        _rows[name] = 0
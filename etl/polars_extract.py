@@ -0,0 +1,432 @@
+import tempfile
+
+import pandas as pd
+
+import corrections
+import etl_1930_2010
+import etl_2014
+import etl_2018
+import etl_2022
+import etl_clean_1930_2010
+import source_schema
+import team_pairs
+from duckdb_extract import DATETIME_ENCODING, PANDAS_NA_VALUES, transcode_to_utf8
+from etl_inserter_2014 import STAGING_COLUMNS
+from instrumentation import stage
+from normalize_cache import memoized
+
+try:
+    import polars as pl
+except ImportError:  # dépendance optionnelle : l'extraction reste en pandas
+    pl = None
+
+# Exécution paresseuse des extracteurs avec Polars : chaque source est un
+# LazyFrame (scan_csv ne lit que les colonnes utilisées, les filtres d'édition
+# sont appliqués dès la lecture), les quatre plans sont concaténés puis
+# exécutés en une seule fois sur tous les cœurs (POLARS_MAX_THREADS pour
+# limiter). Les normalisations de texte réutilisent les fonctions Python des
+# extracteurs pandas, une fois par valeur distincte.
+
+# Colonnes lues dans chaque fichier
+MATCHES_1930_COLUMNS = ["edition", "round", "team1", "team2", "venue", "score"]
+DATETIME_1930_COLUMNS = [
+    "Tournament Id", "Stage Name", "Home Team Name", "Away Team Name",
+    "Replay", "Match Date", "Match Time", "Stadium Name",
+]
+
+# Formats de date des sources 2014 et 2022 (inférés par pandas)
+DATETIME_FORMAT_2014 = "%d %b %Y - %H:%M"
+DATE_FORMAT_2022 = "%d %b %Y"
+DATETIME_FORMAT_2022 = "%Y-%m-%d %H:%M:%S"
+DATETIME_FORMAT_2018 = "%Y-%m-%dT%H:%M:%S%z"
+
+
+def scan_csv(path, columns=None, **options):
+    """Lecture paresseuse en texte (de quelques colonnes), mêmes valeurs manquantes que pandas."""
+    lf = pl.scan_csv(path, infer_schema=False, null_values=PANDAS_NA_VALUES, **options)
+    return lf if columns is None else lf.select(columns)
+
+
+def map_distinct(expr, func, *args, return_dtype=None):
+    """
+    Applique une fonction de normalisation Python à une colonne, une seule
+    fois par valeur distincte (même cache que normalize_cache.apply_memoized).
+    """
+    cached = memoized(func)
+    return_dtype = pl.String if return_dtype is None else return_dtype
+
+    def apply(series):
+        uniques = series.unique(maintain_order=True)
+        results = pl.Series([cached(value, *args) for value in uniques.to_list()], dtype=return_dtype)
+        return series.replace_strict(uniques, results, return_dtype=return_dtype)
+
+    return expr.map_batches(apply, return_dtype=return_dtype)
+
+
+def team_pair(col1, col2, names=team_pairs.TEAM_PAIR_COLUMNS):
+    """Paire d'équipes non ordonnée, pour les jointures (équivalent de team_pairs.team_pair_columns)."""
+    t1, t2 = pl.col(col1), pl.col(col2)
+    return [pl.min_horizontal(t1, t2).alias(names[0]), pl.max_horizontal(t1, t2).alias(names[1])]
+
+
+def year_of(expr):
+    return expr.str.extract(r"(\d{4})", 1)
+
+
+def edition_filter(year, editions):
+    """Prédicat sur l'année d'édition, poussé au plus près de la lecture."""
+    return pl.lit(True) if not editions else year.cast(pl.Int64, strict=False).is_in(list(editions))
+
+
+def source_edition_filter(source, editions):
+    """Filtre --edition du résultat d'une source, mêmes règles que main.edition_mask."""
+    dated = edition_filter(pl.col("Datetime").dt.year(), editions)
+    if editions and source_schema.keeps_undated(source, editions):
+        return dated | pl.col("Datetime").is_null()
+    return dated
+
+
+def match_results(home, away, labels=("winner", "loser", "draw")):
+    win, loss, draw = labels
+    return [
+        pl.when(home.is_null() | away.is_null()).then(None)
+        .when(home > away).then(pl.lit(win))
+        .when(home < away).then(pl.lit(loss))
+        .otherwise(pl.lit(draw)).alias("Home Result"),
+        pl.when(home.is_null() | away.is_null()).then(None)
+        .when(home > away).then(pl.lit(loss))
+        .when(home < away).then(pl.lit(win))
+        .otherwise(pl.lit(draw)).alias("Away Result"),
+    ]
+
+
+# =========================
+# 1930-2010
+# =========================
+def parse_fallback(value):
+    """Dernier recours de build_datetime_column : parsing automatique de pandas."""
+    if value is None:
+        return None
+    parsed = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(parsed) else parsed.to_pydatetime()
+
+
+def datetime_1930():
+    date_str = pl.col("Match Date").str.strip_chars()
+    time_str = pl.col("Match Time").str.strip_chars()
+    valid = (
+        date_str.is_not_null() & time_str.is_not_null()
+        & (date_str != "") & (time_str != "")
+        & (date_str.str.to_lowercase() != "none") & (time_str.str.to_lowercase() != "none")
+    )
+    text = pl.when(valid).then(pl.concat_str([date_str, time_str], separator=" "))
+    parsed = pl.coalesce([
+        text.str.strptime(pl.Datetime("us"), fmt, strict=False) for fmt in etl_1930_2010.DATETIME_FORMATS
+    ])
+    remaining = pl.when(parsed.is_null()).then(text)
+    return pl.coalesce([parsed, map_distinct(remaining, parse_fallback, return_dtype=pl.Datetime("us"))])
+
+
+def matches_1930(editions=None):
+    """Matchs 1930-2010 filtrés, rounds et équipes normalisés, correction 2002 et matchs d'appui."""
+    round_ = pl.col("round")
+    lf = (
+        scan_csv(etl_1930_2010.INPUT_FILE, MATCHES_1930_COLUMNS)
+        .with_columns(year_of(pl.col("edition")).alias("_year"))
+        .filter(
+            ~round_.str.to_uppercase().str.contains("PRELIMINARY", literal=True).fill_null(False)
+            & ~pl.col("edition").str.contains("2014", literal=True).fill_null(False)
+            & edition_filter(pl.col("_year"), editions)
+        )
+        .with_row_index("_row")
+        .with_columns(
+            map_distinct(round_, etl_1930_2010.normalize_round),
+            map_distinct(pl.col("team1"), etl_1930_2010.normalize_team),
+            map_distinct(pl.col("team2"), etl_1930_2010.normalize_team),
+        )
+        .with_columns(
+            pl.when(
+                (pl.col("team2").str.to_lowercase() == "slovakia")
+                & (pl.col("_year").cast(pl.Int64, strict=False) == 2002)
+            ).then(pl.lit("Slovenia")).otherwise(pl.col("team2")).alias("team2")
+        )
+    )
+    replay = (pl.int_range(pl.len()).over(["edition", "round", "team1", "team2"]) > 0).cast(pl.Int64)
+    return lf.with_columns(replay.alias("Replay"), *team_pair("team1", "team2"))
+
+
+def datetime_file_1930(workdir, editions=None):
+    path = transcode_to_utf8(etl_1930_2010.DATETIME_FILE, DATETIME_ENCODING, workdir)
+    return (
+        scan_csv(path, DATETIME_1930_COLUMNS)
+        .with_columns(year_of(pl.col("Tournament Id")).alias("_year"))
+        .filter(pl.col("_year").is_not_null() & edition_filter(pl.col("_year"), editions))
+        .select(
+            "_year",
+            map_distinct(pl.col("Stage Name"), etl_1930_2010.normalize_round).alias("round"),
+            map_distinct(pl.col("Home Team Name"), etl_1930_2010.normalize_team).alias("team1"),
+            map_distinct(pl.col("Away Team Name"), etl_1930_2010.normalize_team).alias("team2"),
+            pl.col("Replay").cast(pl.Float64, strict=False).fill_null(0).cast(pl.Int64),
+            "Match Date", "Match Time", "Stadium Name",
+        )
+        .with_columns(*team_pair("team1", "team2"))
+    )
+
+
+def resolve_dates_1930(matches, df_dt):
+    """resolve_match_dates : une jointure par niveau de DATE_LOOKUP_TIERS, le plus précis l'emporte."""
+    for tier, keys in enumerate(etl_1930_2010.DATE_LOOKUP_TIERS):
+        lookup = (
+            df_dt.unique(subset=keys, keep="first", maintain_order=True)
+            .select(*keys, pl.lit(True).alias(f"_hit{tier}"),
+                    pl.col("Match Date").alias(f"_date{tier}"), pl.col("Match Time").alias(f"_time{tier}"))
+        )
+        matches = matches.join(lookup, on=keys, how="left", maintain_order="left")
+    tiers = range(len(etl_1930_2010.DATE_LOOKUP_TIERS))
+
+    def first_hit(column):
+        expr = pl.when(pl.col("_hit0")).then(pl.col(f"_{column}0"))
+        for tier in tiers[1:]:
+            expr = expr.when(pl.col(f"_hit{tier}")).then(pl.col(f"_{column}{tier}"))
+        return expr
+
+    dropped = [f"_{name}{tier}" for tier in tiers for name in ("hit", "date", "time")]
+    return matches.with_columns(
+        first_hit("date").alias("Match Date"), first_hit("time").alias("Match Time"),
+    ).drop(dropped)
+
+
+def apply_corrections_1930(matches, df_dt):
+    """corrections.apply_overrides : une jointure sur (édition, paire d'équipes), filtrée par ville."""
+    overrides = corrections.load_overrides(etl_1930_2010.CORRECTIONS_FILE)
+    overrides = pl.from_pandas(overrides[[
+        "override_id", *corrections.OVERRIDE_KEYS, "_venue", "_stadium", "match_date", "match_time",
+    ]].astype(object)).lazy().with_columns(pl.col("override_id").cast(pl.Int64))
+
+    def key(column):
+        return map_distinct(pl.col(column).fill_null(""), corrections.normalize_key)
+
+    stadium_dates = (
+        df_dt.with_columns(key("team1").alias("_k1"), key("team2").alias("_k2"), key("Stadium Name").alias("_stadium"))
+        .with_columns(*team_pair("_k1", "_k2"))
+        .unique(subset=[*corrections.OVERRIDE_KEYS, "_stadium"], keep="first", maintain_order=True)
+        .select(*corrections.OVERRIDE_KEYS, "_stadium", "Match Date", "Match Time")
+    )
+    needs_lookup = pl.col("match_date").is_null() & (pl.col("_stadium") != "")
+    resolved = (
+        overrides.join(stadium_dates, on=[*corrections.OVERRIDE_KEYS, "_stadium"], how="left", maintain_order="left")
+        .select(
+            "override_id", *corrections.OVERRIDE_KEYS, pl.col("_venue").alias("_venue_override"),
+            pl.when(needs_lookup).then(pl.col("Match Date")).otherwise(pl.col("match_date")).alias("_override_date"),
+            pl.when(needs_lookup).then(pl.col("Match Time")).otherwise(pl.col("match_time")).alias("_override_time"),
+        )
+    )
+    hits = (
+        matches.select("_row", "_year", key("team1").alias("_k1"), key("team2").alias("_k2"), key("venue").alias("_venue"))
+        .with_columns(*team_pair("_k1", "_k2"))
+        .join(resolved, on=corrections.OVERRIDE_KEYS, how="inner")
+        .filter((pl.col("_venue_override") == "") | (pl.col("_venue_override") == pl.col("_venue")))
+        .sort("override_id")
+        .unique(subset="_row", keep="last")
+        .select("_row", "_override_date", "_override_time")
+    )
+    return (
+        matches.join(hits, on="_row", how="left", maintain_order="left")
+        .with_columns(
+            pl.coalesce("_override_date", "Match Date").alias("Match Date"),
+            pl.coalesce("_override_time", "Match Time").alias("Match Time"),
+        )
+        .drop("_override_date", "_override_time")
+    )
+
+
+def lazy_1930(workdir, editions=None):
+    clean = etl_clean_1930_2010
+    df_dt = datetime_file_1930(workdir, editions)
+    matches = resolve_dates_1930(matches_1930(editions), df_dt)
+    matches = apply_corrections_1930(matches, df_dt)
+    goals = pl.col("score").str.extract_groups(r"(\d+)\s*[-–]\s*(\d+)")
+    home, away = pl.col("Home Team Goals"), pl.col("Away Team Goals")
+    return (
+        matches.with_columns(
+            datetime_1930().alias("Datetime"),
+            map_distinct(pl.col("round"), clean.normalize_round).alias("Stage"),
+            map_distinct(pl.col("venue"), clean.clean_venue).alias("City"),
+            map_distinct(pl.col("team1"), clean.normalize_text, "home team").alias("Home Team Name"),
+            map_distinct(pl.col("team2"), clean.normalize_text, "away team").alias("Away Team Name"),
+            goals.struct.field("1").cast(pl.Int64).alias("Home Team Goals"),
+            goals.struct.field("2").cast(pl.Int64).alias("Away Team Goals"),
+        )
+        .with_columns(*match_results(home, away))
+        .sort("_row")
+    )
+
+
+# =========================
+# 2014
+# =========================
+def lazy_2014(workdir, editions=None):
+    path = transcode_to_utf8(etl_2014.INPUT_FILE, "latin-1", workdir)
+    score = pl.col("Win conditions").str.strip_chars().str.replace_all(" ", "", literal=True).str.extract_groups(r"(\d+)-(\d+)")
+    home, away = pl.col("Home Team Goals"), pl.col("Away Team Goals")
+    score_home, score_away = pl.col("Score home"), pl.col("Score away")
+    draw = home == away
+    home_result = (
+        pl.when(home > away).then(pl.lit("winner"))
+        .when(away > home).then(pl.lit("loser"))
+        .when(draw & (score_home > score_away)).then(pl.lit("winner"))
+        .when(draw & (score_away > score_home)).then(pl.lit("loser"))
+        .otherwise(pl.lit("draw"))
+    )
+    return (
+        scan_csv(path, list(source_schema.SCHEMA_2014), separator=";")
+        .with_columns(
+            pl.col("Datetime").str.strip_chars().str.strptime(pl.Datetime("us"), DATETIME_FORMAT_2014, strict=False),
+            home.cast(pl.Float64, strict=False),
+            away.cast(pl.Float64, strict=False),
+        )
+        .filter(source_edition_filter("2014", editions))
+        .unique(maintain_order=True)
+        .with_columns(
+            score.struct.field("1").cast(pl.Int64).alias("Score home"),
+            score.struct.field("2").cast(pl.Int64).alias("Score away"),
+        )
+        .with_columns(
+            home_result.alias("Home Result"),
+            home_result.replace_strict({"winner": "loser", "loser": "winner", "draw": "draw"}).alias("Away Result"),
+            map_distinct(pl.col("Stage"), etl_2014.normalize_stage),
+            map_distinct(pl.col("City"), etl_2014.city_to_english),
+            map_distinct(pl.col("Home Team Name"), etl_2014.normalize_country),
+            map_distinct(pl.col("Away Team Name"), etl_2014.normalize_country),
+        )
+    )
+
+
+# =========================
+# 2018
+# =========================
+def lazy_2018(workdir, editions=None):
+    # Le JSON 2018 est un document unique : il est parcouru en streaming par
+    # etl_2018 (ijson), seules les transformations sont paresseuses
+    columns, teams_map, stadiums_map, section_names = etl_2018.extract_match_columns(etl_2018.INPUT_FILE)
+    lf = pl.LazyFrame({
+        "raw_date": pl.Series(columns["date"], dtype=pl.String),
+        "section": pl.Series(columns["section"], dtype=pl.String),
+        "stadium": pl.Series(columns["stadium"], dtype=pl.Int64, strict=False),
+        "home_team": pl.Series(columns["home_team"], dtype=pl.Int64, strict=False),
+        "away_team": pl.Series(columns["away_team"], dtype=pl.Int64, strict=False),
+        "home_goals": pl.Series(columns["home_result"], dtype=pl.Float64, strict=False),
+        "away_goals": pl.Series(columns["away_result"], dtype=pl.Float64, strict=False),
+    })
+    home, away = pl.col("Home Team Goals"), pl.col("Away Team Goals")
+
+    def lookup(column, mapping):
+        return pl.col(column).replace_strict(mapping, default=None, return_dtype=pl.String)
+
+    return (
+        lf.with_columns(
+            pl.col("raw_date").str.strptime(pl.Datetime("us", "UTC"), DATETIME_FORMAT_2018, strict=False)
+            .dt.replace_time_zone(None).alias("Datetime"),
+        )
+        .filter(source_edition_filter("2018", editions))
+        .with_columns(
+            map_distinct(lookup("section", section_names), etl_2018.standardize_stage_name).alias("Stage"),
+            map_distinct(lookup("stadium", stadiums_map), etl_2018.clean_text_field).alias("City"),
+            map_distinct(lookup("home_team", teams_map), etl_2018.clean_text_field).alias("Home Team Name"),
+            map_distinct(lookup("away_team", teams_map), etl_2018.clean_text_field).alias("Away Team Name"),
+            pl.col("home_goals").fill_null(0).cast(pl.Int64).alias("Home Team Goals"),
+            pl.col("away_goals").fill_null(0).cast(pl.Int64).alias("Away Team Goals"),
+        )
+        .with_columns(*match_results(home, away))
+    )
+
+
+# =========================
+# 2022
+# =========================
+def lazy_2022(workdir, editions=None):
+    matches_file, venues_file, mapping_file = etl_2022.INPUT_FILES
+
+    def clean_name(column):
+        return pl.col(column).fill_null("nan").str.to_lowercase().str.strip_chars().replace(etl_2022.TEAM_NAME_MAPPING)
+
+    stats = (
+        scan_csv(matches_file, list(source_schema.SCHEMA_2022_MATCHES))
+        .select(
+            clean_name("team1").alias("team1"),
+            clean_name("team2").alias("team2"),
+            pl.col("number of goals team1").cast(pl.Float64, strict=False).fill_null(0).cast(pl.Int64).alias("Home Team Goals"),
+            pl.col("number of goals team2").cast(pl.Float64, strict=False).fill_null(0).cast(pl.Int64).alias("Away Team Goals"),
+            pl.col("date").str.strip_chars().str.strptime(pl.Datetime("us"), DATE_FORMAT_2022, strict=False)
+            .dt.truncate("1d").alias("match_day"),
+            pl.col("category").str.to_lowercase().str.strip_chars()
+            .replace_strict(etl_2022.STAGE_MAP, default="unknown").alias("Stage"),
+        )
+        .with_columns(*team_pair("team1", "team2", etl_2022.MERGE_KEYS[:2]))
+    )
+    venues = (
+        scan_csv(venues_file, list(source_schema.SCHEMA_2022_VENUES))
+        .select(
+            clean_name("home_team").alias("home_team"),
+            clean_name("away_team").alias("away_team"),
+            pl.col("match_time").str.strptime(pl.Datetime("us"), DATETIME_FORMAT_2022, strict=False).alias("Datetime"),
+            "venue",
+        )
+        .filter(source_edition_filter("2022", editions))
+        .with_columns(*team_pair("home_team", "away_team", etl_2022.MERGE_KEYS[:2]), pl.col("Datetime").dt.truncate("1d").alias("match_day"))
+    )
+    # Dernière ligne par stade, comme le dictionnaire de etl_2022.py
+    cities = (
+        scan_csv(mapping_file, new_columns=["stadium", "city"])
+        .group_by("stadium", maintain_order=True).agg(pl.col("city").last())
+    )
+    home, away = pl.col("Home Team Goals"), pl.col("Away Team Goals")
+    return (
+        stats.join(venues, on=etl_2022.MERGE_KEYS, how="inner", maintain_order="left")
+        .join(cities, left_on="venue", right_on="stadium", how="left", maintain_order="left")
+        .with_columns(
+            pl.col("city").fill_null("Unknown").alias("City"),
+            pl.col("team1").alias("Home Team Name"),
+            pl.col("team2").alias("Away Team Name"),
+            *match_results(home, away, ("win", "loss", "draw")),
+        )
+        .select(list(STAGING_COLUMNS))
+        .unique(maintain_order=True)
+    )
+
+
+SOURCE_PLANS = {
+    "1930-2010": lazy_1930,
+    "2014": lazy_2014,
+    "2018": lazy_2018,
+    "2022": lazy_2022,
+}
+
+def staging_frame(lf):
+    """Colonnes et types de STAGING_COLUMNS, pour concaténer les sources."""
+    dtypes = {"timestamp": pl.Datetime("us"), "text": pl.String, "int": pl.Int64}
+    return lf.select(pl.col(col).cast(dtypes[kind]) for col, kind in STAGING_COLUMNS.items())
+
+
+def extract_frame(sources=None, editions=None):
+    """
+    DataFrame fusionné des sources demandées (toutes par défaut), filtré sur
+    editions : même contenu que main.merge_data, calculé par un seul plan Polars.
+    """
+    if pl is None:
+        raise ImportError("polars n'est pas installé (pip install polars)")
+    sources = list(SOURCE_PLANS) if sources is None else list(sources)
+    unknown = set(sources) - set(SOURCE_PLANS)
+    if unknown:
+        raise ValueError(f"Source inconnue : {', '.join(sorted(unknown))} (attendu : {', '.join(SOURCE_PLANS)})")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        with stage("polars.plan"):
+            merged = pl.concat([
+                staging_frame(SOURCE_PLANS[name](workdir, editions)).filter(source_edition_filter(name, editions))
+                for name in sources
+            ])
+        with stage("polars.collect") as record:
+            df = source_schema.concat_canonical([merged.collect().to_pandas()])
+            record["rows_out"] = len(df)
+    return df
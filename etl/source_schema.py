@@ -0,0 +1,129 @@
+import os
+
+import pandas as pd
+
+# Moteur de parsing CSV : "c" (défaut pandas) ou "pyarrow" (multi-threadé,
+# nécessite le paquet pyarrow)
+CSV_ENGINE = os.environ.get("ETL_CSV_ENGINE", "c")
+
+# Colonnes réellement utilisées par chaque extracteur et leur type.
+# None laisse pandas inférer le type (colonnes converties ensuite avec
+# pd.to_numeric(errors="coerce"), pour tolérer les valeurs invalides).
+SCHEMA_2014 = {
+    "Datetime": "string",
+    "Stage": "category",
+    "City": "category",
+    "Home Team Name": "category",
+    "Home Team Goals": None,
+    "Away Team Goals": None,
+    "Away Team Name": "category",
+    "Win conditions": "string",
+}
+
+SCHEMA_2022_MATCHES = {
+    "team1": "category",
+    "team2": "category",
+    "number of goals team1": None,
+    "number of goals team2": None,
+    "date": "string",
+    "category": "category",
+}
+
+SCHEMA_2022_VENUES = {
+    "match_time": "string",
+    "home_team": "category",
+    "away_team": "category",
+    "venue": "category",
+}
+
+
+def read_csv_schema(path, schema, engine=None, **kwargs):
+    """
+    Lit uniquement les colonnes du schéma, avec leurs types, puis les remet
+    dans l'ordre du schéma (usecols ne garantit pas l'ordre).
+    """
+    df = pd.read_csv(
+        path,
+        usecols=list(schema),
+        dtype={col: dtype for col, dtype in schema.items() if dtype is not None},
+        engine=engine or CSV_ENGINE,
+        **kwargs,
+    )
+    return df[list(schema)]
+
+
+# Schéma canonique du DataFrame fusionné (main.merge_data) : colonnes texte en
+# catégories partagées entre sources (domicile et extérieur partagent les
+# mêmes catégories), buts en entiers nullables compacts, Datetime en datetime64.
+MERGED_COLUMNS = [
+    "Datetime", "Stage", "City", "Home Team Name", "Home Team Goals",
+    "Away Team Goals", "Away Team Name", "Home Result", "Away Result",
+]
+CATEGORY_GROUPS = {
+    "team": ["Home Team Name", "Away Team Name"],
+    "stage": ["Stage"],
+    "city": ["City"],
+    "result": ["Home Result", "Away Result"],
+}
+GOAL_COLUMNS = ["Home Team Goals", "Away Team Goals"]
+GOAL_DTYPE = "Int16"
+DATETIME_DTYPE = "datetime64[us]"
+
+
+def category_dtypes(frames):
+    """Un CategoricalDtype par groupe de colonnes, sur l'union triée des valeurs de tous les DataFrames."""
+    dtypes = {}
+    for columns in CATEGORY_GROUPS.values():
+        values = set()
+        for df in frames:
+            for col in columns:
+                values.update(df[col].dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(values))
+        dtypes.update(dict.fromkeys(columns, dtype))
+    return dtypes
+
+
+def to_canonical(df, dtypes):
+    """Colonnes de MERGED_COLUMNS, converties au schéma canonique."""
+    columns = {}
+    for col in MERGED_COLUMNS:
+        values = df[col]
+        if col == "Datetime":
+            values = pd.to_datetime(values, errors="coerce").astype(DATETIME_DTYPE)
+        elif col in GOAL_COLUMNS:
+            values = pd.to_numeric(values, errors="coerce").astype(GOAL_DTYPE)
+        else:
+            values = values.astype(dtypes[col])
+        columns[col] = values.reset_index(drop=True)
+    return pd.DataFrame(columns)
+
+
+def concat_canonical(frames):
+    """
+    Concatène les DataFrames des sources au schéma canonique : les catégories
+    étant identiques pour toutes les sources, pd.concat garde les colonnes
+    catégorielles au lieu de repasser en chaînes.
+    """
+    frames = list(frames)
+    dtypes = category_dtypes(frames)
+    if not frames:
+        return to_canonical(pd.DataFrame(columns=MERGED_COLUMNS), dtypes)
+    return pd.concat([to_canonical(df, dtypes) for df in frames], ignore_index=True)
+
+
+# Éditions (années) couvertes par chaque source, pour --edition
+SOURCE_EDITIONS = {
+    "1930-2010": range(1930, 2011),
+    "2014": [2014],
+    "2018": [2018],
+    "2022": [2022],
+}
+
+
+def keeps_undated(source, editions):
+    """
+    Un match sans date ne peut pas être rattaché à une année : le filtre
+    --edition le garde quand toutes les éditions de sa source sont demandées
+    (il appartient alors forcément à l'une d'elles).
+    """
+    return set(SOURCE_EDITIONS[source]) <= set(editions)
@@ -0,0 +1,14 @@
+# Paire d'équipes non ordonnée : clé de jointure commune à la recherche des
+# dates 1930-2010, aux corrections manuelles et à la fusion des fichiers 2022.
+# Un match A-B et un match B-A ont la même paire (lo, hi).
+TEAM_PAIR_COLUMNS = ("_team_lo", "_team_hi")
+
+
+def team_pair_columns(t1, t2, names=TEAM_PAIR_COLUMNS):
+    """
+    Colonnes (lo, hi) de la paire, calculées sur les colonnes entières, à
+    passer à DataFrame.assign. t1 et t2 sont déjà normalisées par l'appelant.
+    """
+    in_order = t1 <= t2
+    lo, hi = names
+    return {lo: t1.where(in_order, t2), hi: t2.where(in_order, t1)}
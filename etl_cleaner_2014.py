@@ -1,19 +1,19 @@
+import sys
+from pathlib import Path
 import duckdb
-import etl.etl_inserter_2014 as inserter
 import pandas as pd
 from unidecode import unidecode
-import geonamescache
 import logging
+
+# Les modules etl s'importent entre eux par leur nom, comme depuis main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent / "etl"))
+import etl_inserter_2014 as inserter  # noqa: E402
+from geo_index import get_city_index  # noqa: E402
 pd.set_option("display.max_columns", None)
 pd.set_option("display.width", None)
 
-gc = geonamescache.GeonamesCache()
-df = pd.read_csv('./data/WorldCupMatches2014.csv', sep=";", encoding='iso-8859-1') 
 logger = logging.getLogger("ETL")
 
-cities =  gc.get_cities()
-countries = gc.get_countries()
-
 STAGE_MAP = {
     "group a": "group",
     "group b": "group",
@@ -59,12 +59,7 @@ def city_to_english(city):
 
     city_clean = unidecode(str(city)).lower().strip()
 
-    for c in cities.values():
-        c_name = unidecode(c["name"]).lower().strip()
-        if c_name == city_clean:
-            return c_name
-
-    return city_clean 
+    return get_city_index().get(city_clean, city_clean)
 
 def normalize_stage(stage):
     if pd.isna(stage):
@@ -93,67 +88,72 @@ def normalize_country(name):
 
 
 
-print(df.describe(include='all'))
+def main():
+    df = pd.read_csv('./data/WorldCupMatches2014.csv', sep=";", encoding='iso-8859-1')
+
+    print(df.describe(include='all'))
 
-df = df.drop(columns=["Year", "Stadium", "Attendance", "Half-time Home Goals", "Half-time Away Goals", "Referee", "Assistant 1", "Assistant 2","RoundID"  ,  "MatchID","Home Team Initials", "Away Team Initials"])
+    df = df.drop(columns=["Year", "Stadium", "Attendance", "Half-time Home Goals", "Half-time Away Goals", "Referee", "Assistant 1", "Assistant 2","RoundID"  ,  "MatchID","Home Team Initials", "Away Team Initials"])
 
 
 
-df["Datetime"] = pd.to_datetime(
-    df["Datetime"],
-    errors="coerce")
+    df["Datetime"] = pd.to_datetime(
+        df["Datetime"],
+        errors="coerce")
 
-df["Home Team Goals"] = pd.to_numeric(
-    df["Home Team Goals"],
-    errors="coerce"
-)
-df["Away Team Goals"] = pd.to_numeric(
-    df["Away Team Goals"],
-    errors="coerce"
-)
-print(df["Datetime"].dtype)
+    df["Home Team Goals"] = pd.to_numeric(
+        df["Home Team Goals"],
+        errors="coerce"
+    )
+    df["Away Team Goals"] = pd.to_numeric(
+        df["Away Team Goals"],
+        errors="coerce"
+    )
+    print(df["Datetime"].dtype)
 
-df = df.drop_duplicates(df)
-df["Win conditions"] = df["Win conditions"].str.strip().str.replace(" ", "")
-df["Win conditions"] = df["Win conditions"].str.extract(r"(\d+-\d+)")
-df[["Score home", "Score away"]] = df["Win conditions"].str.split("-", expand=True).astype("Int64") 
-df_win = df[
-    df["Win conditions"]
-      .notna()
-    & df["Win conditions"].str.strip().ne("")
-]
+    df = df.drop_duplicates(df)
+    df["Win conditions"] = df["Win conditions"].str.strip().str.replace(" ", "")
+    df["Win conditions"] = df["Win conditions"].str.extract(r"(\d+-\d+)")
+    df[["Score home", "Score away"]] = df["Win conditions"].str.split("-", expand=True).astype("Int64") 
+    df_win = df[
+        df["Win conditions"]
+          .notna()
+        & df["Win conditions"].str.strip().ne("")
+    ]
 
-df["Home result"] = "draw"
-df["Away result"] = "draw"
+    df["Home result"] = "draw"
+    df["Away result"] = "draw"
 
-home_win = df["Home Team Goals"] > df["Away Team Goals"]
-away_win = df["Away Team Goals"] > df["Home Team Goals"]
+    home_win = df["Home Team Goals"] > df["Away Team Goals"]
+    away_win = df["Away Team Goals"] > df["Home Team Goals"]
 
-df.loc[home_win, ["Home result", "Away result"]] = ["winner", "loser"]
-df.loc[away_win, ["Home result", "Away result"]] = ["loser", "winner"]
+    df.loc[home_win, ["Home result", "Away result"]] = ["winner", "loser"]
+    df.loc[away_win, ["Home result", "Away result"]] = ["loser", "winner"]
 
-draw = df["Home Team Goals"] == df["Away Team Goals"]
+    draw = df["Home Team Goals"] == df["Away Team Goals"]
 
-df.loc[draw & (df["Score home"] > df["Score away"]),
-       ["Home result", "Away result"]] = ["winner", "loser"]
+    df.loc[draw & (df["Score home"] > df["Score away"]),
+           ["Home result", "Away result"]] = ["winner", "loser"]
 
-df.loc[draw & (df["Score away"] > df["Score home"]),
-       ["Home result", "Away result"]] = ["loser", "winner"]
+    df.loc[draw & (df["Score away"] > df["Score home"]),
+           ["Home result", "Away result"]] = ["loser", "winner"]
 
-df = df.drop(columns=["Win conditions", "Score home", "Score away"])
+    df = df.drop(columns=["Win conditions", "Score home", "Score away"])
 
 
-df["Stage"] = df["Stage"].apply(normalize_stage)
+    df["Stage"] = df["Stage"].apply(normalize_stage)
 
-df["City"] = df["City"].apply(city_to_english)
+    df["City"] = df["City"].apply(city_to_english)
 
-df["Home Team Name"] = df["Home Team Name"].apply(normalize_country)
-df["Away Team Name"] = df["Away Team Name"].apply(normalize_country)
+    df["Home Team Name"] = df["Home Team Name"].apply(normalize_country)
+    df["Away Team Name"] = df["Away Team Name"].apply(normalize_country)
+
+    print(df)
+    inserter.load_matches(df, db_path="./db/db.duckdb")
+
+    print(df_win)
 
-print(df)
-inserter.load_matches(df, db_path="./db/db.duckdb")
 
-print(df_win)
 # Year;Datetime;Stage;Stadium;
 # City;Home Team Name;
 # Home Team Goals;Away Team Goals;Away Team Name;
@@ -163,4 +163,5 @@ print(df_win)
 # Team Initials;Away Team Initials
 
 
-
+if __name__ == "__main__":
+    main()
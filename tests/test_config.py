@@ -0,0 +1,41 @@
+import pandas as pd
+# Même module que celui importé par les étapes (etl/ est dans pythonpath) : mêmes connexions
+import config
+from etl.db_creation import create_db_schema
+from etl.etl_create_view import create_view
+from etl.etl_inserter_2014 import load_matches
+
+MATCHES = pd.DataFrame({
+    "Datetime": pd.to_datetime(["2014-06-12 17:00", "2022-12-18 16:00"]),
+    "Stage": ["group", "final"],
+    "City": ["sao paulo", "lusail"],
+    "Home Team Name": ["brazil", "argentina"],
+    "Home Team Goals": [3, 3],
+    "Away Team Goals": [1, 3],
+    "Away Team Name": ["croatia", "france"],
+    "Home Result": ["win", "draw"],
+    "Away Result": ["loss", "draw"],
+})
+
+
+def test_connection_is_shared_and_tuned(tmp_path):
+    db_path = tmp_path / "db.duckdb"
+    con = config.get_connection(str(db_path), threads=2, memory_limit="256MB")
+    try:
+        assert config.get_connection(db_path) is con
+        assert con.execute("SELECT current_setting('threads')").fetchone() == (2,)
+    finally:
+        config.close_connection(db_path)
+    assert config.get_connection(db_path) is not con
+    config.close_connection(db_path)
+
+
+def test_in_memory_database_spans_all_stages():
+    try:
+        create_db_schema(config.IN_MEMORY)
+        load_matches(MATCHES, config.IN_MEMORY)
+        create_view(config.IN_MEMORY)
+        con = config.get_connection(config.IN_MEMORY)
+        assert con.execute("SELECT COUNT(*) FROM v_matches_flat").fetchone() == (2,)
+    finally:
+        config.close_connection(config.IN_MEMORY)
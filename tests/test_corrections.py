@@ -0,0 +1,44 @@
+import pandas as pd
+from etl.corrections import apply_overrides, load_overrides
+
+OVERRIDES_CSV = """edition,team1,team2,venue,stadium,match_date,match_time,replay,note
+1954,West Germany,Turkey,Zurich,Hardturm Stadium,,,1,match d'appui
+1994,Norway,Mexico,,,06/19/1994,13:00:00,,
+1994,Spain,Brazil,,,06/20/1994,16:00:00,,
+"""
+
+DF = pd.DataFrame({
+    "edition": ["1954-SWITZERLAND", "1954-SWITZERLAND", "1994-USA", "1998-FRANCE"],
+    "team1": ["West Germany", "West Germany", "Mexico", "Norway"],
+    "team2": ["Turkey", "Turkey", "Norway", "Mexico"],
+    "venue": ["Bern.", "Zürich.", "Washington.", "Paris."],
+    "Replay": [0, 0, 0, 0],
+    "Match Date": ["6/17/1954", "6/17/1954", None, "06/01/1998"],
+    "Match Time": ["18:00", "18:00", None, "21:00:00"],
+})
+
+DF_DT = pd.DataFrame({
+    "_year": ["1954", "1954"],
+    "team1": ["West Germany", "West Germany"],
+    "team2": ["Turkey", "Turkey"],
+    "Stadium Name": ["Wankdorf Stadium", "Hardturm Stadium"],
+    "Match Date": ["6/17/1954", "6/23/1954"],
+    "Match Time": ["18:00", "18:00"],
+})
+
+
+def test_apply_overrides_single_join(tmp_path):
+    path = tmp_path / "corrections.csv"
+    path.write_text(OVERRIDES_CSV, encoding="utf-8")
+    overrides = load_overrides(path)
+
+    df, matched = apply_overrides(DF, overrides, DF_DT)
+
+    # Ville normalisée : seul le match d'appui de Zurich est corrigé, date lue via le stade
+    assert df.loc[0, ["Replay", "Match Date"]].tolist() == [0, "6/17/1954"]
+    assert df.loc[1, ["Replay", "Match Date", "Match Time"]].tolist() == [1, "6/23/1954", "18:00"]
+    # Paire d'équipes non ordonnée, limitée à l'édition
+    assert df.loc[2, ["Match Date", "Match Time"]].tolist() == ["06/19/1994", "13:00:00"]
+    assert df.loc[3, "Match Date"] == "06/01/1998"
+    assert matched.tolist() == [1, 1, 0]
+    assert DF.loc[1, "Replay"] == 0
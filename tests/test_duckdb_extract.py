@@ -0,0 +1,58 @@
+import duckdb
+import pandas as pd
+import pytest
+# Même module que celui importé par etl_inserter_2014 (connexion partagée)
+import config
+from etl.db_creation import create_db_schema
+from etl.duckdb_extract import STAGING_COLUMNS, build_macros, extract_frame, stage_sources
+from etl.etl_inserter_2014 import load_matches
+from etl.main import SOURCES
+
+TEXT_COLUMNS = ["Stage", "City", "Home Team Name", "Away Team Name", "Home Result", "Away Result"]
+
+
+def normalized(df):
+    """Mêmes types et même ordre de lignes pour comparer les deux moteurs."""
+    df = df[list(STAGING_COLUMNS)].copy()
+    df["Datetime"] = pd.to_datetime(df["Datetime"], errors="coerce").astype("datetime64[us]")
+    for col in ["Home Team Goals", "Away Team Goals"]:
+        df[col] = pd.to_numeric(df[col]).astype("Int64")
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].astype(object).where(df[col].notna(), None).astype("string")
+    return df.sort_values(list(df.columns), na_position="last").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("source", SOURCES, ids=[source[0] for source in SOURCES])
+def test_extract_frame_matches_pandas_extractor(source):
+    name, extractor = source[0], source[1]
+    pd.testing.assert_frame_equal(normalized(extract_frame([name])), normalized(extractor()))
+
+
+def test_macros_fold_like_unidecode():
+    con = duckdb.connect()
+    for macro in build_macros():
+        con.execute(macro)
+    assert con.execute("SELECT fold_lower('  Côte d’Ivoire '), fold_lower('Malmö'), fold_lower('Łódź')").fetchone() == (
+        "cote d'ivoire", "malmo", "lodz",
+    )
+    assert con.execute("SELECT match_result(2, 1), match_result(1, 1), match_result(NULL, 1)").fetchone() == (
+        "winner", "draw", None,
+    )
+    con.close()
+
+
+def test_load_from_duckdb_staging(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path)
+    con = config.get_connection(db_path)
+    try:
+        stage_sources(con, ["2014"], [2014])
+        load_matches(None, db_path, staging="duckdb")
+        assert con.execute("SELECT COUNT(*) FROM Matches").fetchone() == (64,)
+        assert con.execute("SELECT COUNT(*) FROM Plays").fetchone() == (128,)
+        # La table de staging est supprimée après le chargement
+        assert con.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'staging_matches'"
+        ).fetchone() == (0,)
+    finally:
+        config.close_connection(db_path)
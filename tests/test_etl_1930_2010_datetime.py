@@ -0,0 +1,27 @@
+import pandas as pd
+from etl.etl_1930_2010 import build_datetime_column
+
+DF = pd.DataFrame({
+    "Match Date": ["6/16/1990", "06/19/1994", "2002-06-03", "None", None, "", "31/12/1998", "not a date"],
+    "Match Time": ["17:00", "13:00:00", "20:30:00", "17:00", "17:00", "17:00", "20:00:00", "10:00"],
+})
+
+
+def test_build_datetime_column_values():
+    result, _ = build_datetime_column(DF)
+
+    expected = pd.Series(pd.to_datetime([
+        "1990-06-16 17:00", "1994-06-19 13:00", "2002-06-03 20:30", None, None, None,
+        "1998-12-31 20:00", None,
+    ]), dtype="datetime64[us]")
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_build_datetime_column_format_counts():
+    _, counts = build_datetime_column(DF)
+
+    assert counts["%m/%d/%Y %H:%M:%S"] == 1
+    assert counts["%d/%m/%Y %H:%M:%S"] == 1
+    assert counts["%Y-%m-%d %H:%M:%S"] == 1
+    assert counts["%m/%d/%Y %H:%M"] == 1
+    assert counts["fallback"] == 0
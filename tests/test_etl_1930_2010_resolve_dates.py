@@ -0,0 +1,43 @@
+import pandas as pd
+from etl.etl_1930_2010 import resolve_match_dates
+
+DF_DT = pd.DataFrame({
+    "_year": ["1934", "1934", "1934", "1938", "1938"],
+    "round": ["quarter-finals", "quarter-finals", "group stage", "round of 16", "round of 16"],
+    "team1": ["Italy", "Spain", "Brazil", "Cuba", "Cuba"],
+    "team2": ["Spain", "Italy", "Spain", "Romania", "Romania"],
+    "Replay": [0, 1, 0, 0, 1],
+    "Match Date": ["05/31/1934", "06/01/1934", "05/27/1934", "06/05/1938", "06/09/1938"],
+    "Match Time": ["16:30:00", "16:30:00", "16:30:00", "17:00:00", "17:00:00"],
+})
+
+DF = pd.DataFrame({
+    "_year": ["1934", "1934", "1938", "1934", "1934", None],
+    "round": ["quarter-finals", "quarter-finals", "round of 16", "semi-finals", "semi-finals", "final"],
+    "team1": ["Italy", "Spain", "Romania", "Spain", "France", "Italy"],
+    "team2": ["Spain", "Italy", "Cuba", "Brazil", "Italy", "Spain"],
+    "Replay": [0, 1, 1, 0, 0, 0],
+}, index=[10, 11, 12, 13, 14, 15])
+
+
+def test_resolve_match_dates_values():
+    result = resolve_match_dates(DF, DF_DT)
+
+    assert result.where(result.notna(), None).values.tolist() == [
+        ["05/31/1934", "16:30:00"],
+        ["06/01/1934", "16:30:00"],
+        ["06/09/1938", "17:00:00"],
+        ["05/27/1934", "16:30:00"],
+        [None, None],
+        [None, None],
+    ]
+
+
+def test_resolve_match_dates_tiers():
+    result = resolve_match_dates(DF, DF_DT)
+
+    assert result.loc[11, "Match Date"] == "06/01/1934"  # replay exact
+    assert result.loc[12, "Match Date"] == "06/09/1938"  # paire inversée + replay
+    assert result.loc[13, "Match Date"] == "05/27/1934"  # année + équipes seulement
+    assert pd.isna(result.loc[14, "Match Date"])
+    assert pd.isna(result.loc[15, "Match Date"])
@@ -0,0 +1,43 @@
+import json
+import pytest
+import etl.etl_2018 as etl_2018
+
+DOCUMENT = {
+    "groups": {
+        "a": {"name": "Group A", "matches": [
+            {"name": 1, "home_team": 1, "away_team": 2, "home_result": 5, "away_result": 0,
+             "date": "2018-06-14T18:00:00+03:00", "stadium": 1, "channels": [4, 6], "finished": True},
+        ]},
+    },
+    "knockout": {
+        "round_2": {"name": "Final", "matches": [
+            {"name": 64, "home_team": 2, "away_team": 1, "home_result": None, "away_result": 2,
+             "date": "2018-07-15T18:00:00+03:00", "stadium": 2, "channels": [], "finished": False},
+        ]},
+    },
+    # Les référentiels peuvent arriver après les matchs
+    "teams": [{"id": 1, "name": "Russia", "iso2": "ru"}, {"id": 2, "name": "Saudi Arabia", "iso2": "sa"}],
+    "stadiums": [{"id": 1, "name": "Luzhniki Stadium", "city": "Moscow"}, {"id": 2, "name": "Fisht", "city": "Sochi"}],
+}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "data_2018.json"
+    path.write_text(json.dumps(DOCUMENT), encoding="utf-8")
+    return path
+
+
+def test_streaming_extraction_matches_json_load(json_path):
+    assert etl_2018.extract_match_columns(json_path) == etl_2018._extract_match_columns_json(json_path)
+
+
+def test_streaming_extraction_columns(json_path):
+    columns, teams, stadiums, sections = etl_2018.extract_match_columns(json_path)
+
+    assert columns["home_team"] == [1, 2]
+    assert columns["home_result"] == [5, None]
+    assert columns["section"] == ["groups.a", "knockout.round_2"]
+    assert teams == {1: "Russia", 2: "Saudi Arabia"}
+    assert stadiums == {1: "Moscow", 2: "Sochi"}
+    assert sections == {"groups.a": "Group A", "knockout.round_2": "Final"}
@@ -0,0 +1,29 @@
+import pandas as pd
+from etl.etl_2022 import add_merge_keys, unmatched_report
+
+DF1 = pd.DataFrame({
+    "team1": ["qatar", "england", "senegal"],
+    "team2": ["ecuador", "iran", "netherlands"],
+    "date_clean": pd.to_datetime(["2022-11-20 00:00", "2022-11-21 00:00", "2022-11-21 00:00"]),
+})
+
+DF2 = pd.DataFrame({
+    "home_team": ["qatar", "iran", "usa"],
+    "away_team": ["ecuador", "england", "wales"],
+    "date_clean": pd.to_datetime(["2022-11-20 19:00", "2022-11-21 16:00", "2022-11-21 22:00"]),
+})
+
+
+def test_add_merge_keys_orders_teams_and_truncates_date():
+    df = add_merge_keys(DF2, "home_team", "away_team", "date_clean")
+
+    assert df.loc[1, "team_lo"] == "england"
+    assert df.loc[1, "team_hi"] == "iran"
+    assert df.loc[1, "match_day"] == pd.Timestamp("2022-11-21")
+
+
+def test_unmatched_report():
+    df1 = add_merge_keys(DF1, "team1", "team2", "date_clean")
+    df2 = add_merge_keys(DF2, "home_team", "away_team", "date_clean")
+
+    assert unmatched_report(df1, df2) == {"left_only": 1, "right_only": 1}
@@ -0,0 +1,22 @@
+import pandas as pd
+from etl.etl_1930_2010 import city_to_english
+from etl.etl_clean_1930_2010 import clean_venue, compute_results, normalize_city
+
+
+def test_compute_results():
+    df = pd.DataFrame({
+        "Home Team Goals": pd.array([3, 0, 2, None, 1], dtype="Int64"),
+        "Away Team Goals": pd.array([1, 2, 2, 1, None], dtype="Int64"),
+    }, index=[5, 6, 7, 8, 9])
+
+    home, away = compute_results(df["Home Team Goals"], df["Away Team Goals"])
+
+    assert home.tolist()[:3] == ["winner", "loser", "draw"]
+    assert away.tolist()[:3] == ["loser", "winner", "draw"]
+    assert home.isna().tolist() == away.isna().tolist() == [False, False, False, True, True]
+    assert home.index.equals(df.index)
+
+
+def test_clean_venue_matches_two_step_normalization():
+    for venue in ["Rome_", " Zürich. ", "St. Étienne", "Belo  Horizonte", ".", "", pd.NA]:
+        assert clean_venue(venue) == normalize_city(city_to_english(venue))
@@ -0,0 +1,123 @@
+import duckdb
+import pandas as pd
+import pytest
+from etl.db_creation import create_db_schema
+from etl.etl_create_view import create_view
+from etl.etl_inserter_2014 import load_matches, preview_load
+
+
+def make_matches():
+    return pd.DataFrame({
+        "Datetime": pd.to_datetime(["1954-06-17 18:00", "1954-06-17 18:00", "2014-06-12 17:00"]),
+        "Stage": ["group", "group", "group"],
+        "City": ["bern", "zurich", "sao paulo"],
+        "Home Team Name": ["west germany", "west germany", "brazil"],
+        "Home Team Goals": [4, 7, 3],
+        "Away Team Goals": [1, 2, 1],
+        "Away Team Name": ["turkey", "turkey", "croatia"],
+        "Home Result": ["winner", "winner", "winner"],
+        "Away Result": ["loser", "loser", "loser"],
+    })
+
+
+def read_flat(db_path):
+    con = duckdb.connect(str(db_path))
+    df = con.sql("SELECT * FROM v_matches_flat ORDER BY match_id").df()
+    con.close()
+    return df
+
+
+def test_incremental_load_into_empty_db_matches_full_load(tmp_path):
+    full_db, incr_db = tmp_path / "full.duckdb", tmp_path / "incr.duckdb"
+    for db_path, incremental in [(full_db, False), (incr_db, True)]:
+        create_db_schema(str(db_path))
+        load_matches(make_matches(), str(db_path), incremental=incremental)
+        create_view(str(db_path))
+
+    def without_ids(df):
+        return df.drop(columns="match_id").sort_values(["match_date", "city"]).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(without_ids(read_flat(full_db)), without_ids(read_flat(incr_db)))
+
+
+def test_incremental_load_keeps_keys_and_applies_changes(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path)
+    load_matches(make_matches(), db_path)
+    create_view(db_path)
+    before = read_flat(db_path)
+
+    df = make_matches()
+    df.loc[2, ["Home Team Goals", "City"]] = [2, "rio de janeiro"]
+    new_match = pd.DataFrame({
+        "Datetime": pd.to_datetime(["2022-12-18 16:00"]),
+        "Stage": ["final"], "City": ["lusail"],
+        "Home Team Name": ["argentina"], "Home Team Goals": [3],
+        "Away Team Goals": [3], "Away Team Name": ["france"],
+        "Home Result": ["winner"], "Away Result": ["loser"],
+    })
+    load_matches(pd.concat([df, new_match], ignore_index=True), db_path, incremental=True)
+    after = read_flat(db_path)
+
+    assert len(after) == 4
+    pd.testing.assert_frame_equal(after.iloc[:2], before.iloc[:2])
+    brazil = after[after["home_team"] == "brazil"].iloc[0]
+    assert brazil["match_id"] == before[before["home_team"] == "brazil"]["match_id"].iloc[0]
+    assert brazil["home_goals"] == 2
+    assert brazil["city"] == "rio de janeiro"
+    assert after["match_id"].max() == 4
+
+    con = duckdb.connect(db_path)
+    assert con.sql("SELECT COUNT(*) FROM Teams").fetchone()[0] == 6
+    con.close()
+
+
+def test_full_load_writes_both_sides_and_reports_step_timings(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type="integer")
+    df = make_matches()
+    df.loc[2, ["Home Team Goals", "Home Result"]] = [None, None]
+    timings = []
+    load_matches(df, db_path, timings=timings)
+
+    con = duckdb.connect(db_path)
+    plays = con.sql("SELECT match_id, position_, goal_nb FROM Plays ORDER BY match_id, position_").fetchall()
+    con.close()
+    # Identifiants dans l'ordre de la clé naturelle ; le côté sans score est conservé
+    assert plays == [
+        (1, "away", 1), (1, "home", 4),
+        (2, "away", 2), (2, "home", 7),
+        (3, "away", 1), (3, "home", None),
+    ]
+    names = [name for name, _ in timings]
+    assert names[0] == "staging"
+    assert {"staged_matches", "keyed_matches", "matches", "plays"} <= set(names)
+    assert all(seconds >= 0 for _, seconds in timings)
+
+
+@pytest.mark.parametrize("key_type", ["uuid", "integer", "hash"])
+def test_match_without_datetime_is_loaded_once(tmp_path, key_type):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type=key_type)
+    df = make_matches()
+    df.loc[2, "Datetime"] = pd.NaT
+    load_matches(df, db_path)
+    load_matches(df, db_path, incremental=True)
+
+    con = duckdb.connect(db_path)
+    assert con.execute("SELECT COUNT(*) FROM Matches").fetchone() == (3,)
+    assert con.execute("SELECT COUNT(*) FROM MatchTime WHERE date_ IS NULL").fetchone() == (1,)
+    con.close()
+
+
+def test_match_rank_ignores_row_order(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path)
+    df = make_matches()
+    # Même clé naturelle, même round et même ville : seuls les scores diffèrent
+    df.loc[1, "City"] = "bern"
+    load_matches(df, db_path)
+
+    reversed_df = df.iloc[::-1].reset_index(drop=True)
+    assert preview_load(reversed_df, db_path) == {"new": 0, "changed": 0, "removed": 0}
+    assert load_matches(reversed_df, db_path, incremental=True) == []
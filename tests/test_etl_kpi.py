@@ -0,0 +1,57 @@
+import duckdb
+import pandas as pd
+from etl.db_creation import create_db_schema
+from etl.etl_create_view import create_view
+from etl.etl_inserter_2014 import load_matches
+from etl.etl_kpi import create_kpis
+
+MATCHES = pd.DataFrame({
+    "Datetime": pd.to_datetime(["2014-06-12 17:00", "2014-06-13 13:00", "2022-12-18 16:00"]),
+    "Stage": ["group", "group", "final"],
+    "City": ["sao paulo", "natal", "lusail"],
+    "Home Team Name": ["brazil", "mexico", "argentina"],
+    "Home Team Goals": [3, 1, 3],
+    "Away Team Goals": [1, 1, 3],
+    "Away Team Name": ["croatia", "brazil", "france"],
+    "Home Result": ["winner", "draw", "win"],
+    "Away Result": ["loser", "draw", "loss"],
+})
+
+
+def read(con, query):
+    return con.sql(query).fetchall()
+
+
+def setup_db(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path)
+    load_matches(MATCHES, db_path)
+    create_view(db_path)
+    create_kpis(db_path)
+    return db_path
+
+
+def test_kpi_tables(tmp_path):
+    con = duckdb.connect(setup_db(tmp_path))
+
+    assert read(con, "SELECT played, wins, draws, losses, goals_for, goals_against FROM kpi_team_edition "
+                     "WHERE edition = 2014 AND team = 'brazil'") == [(2, 1, 1, 0, 4, 2)]
+    assert read(con, "SELECT wins FROM kpi_team_edition WHERE edition = 2022 AND team = 'argentina'") == [(1,)]
+    assert read(con, "SELECT matches, goals FROM kpi_round_goals WHERE edition = 2014") == [(2, 6)]
+    assert read(con, "SELECT COUNT(*) FROM kpi_city_matches") == [(3,)]
+    assert read(con, "SELECT home_wins, draws, away_wins, home_win_rate FROM kpi_home_advantage "
+                     "WHERE edition = 2014") == [(1, 1, 0, 0.5)]
+    con.close()
+
+
+def test_kpi_refresh_only_touched_editions(tmp_path):
+    db_path = setup_db(tmp_path)
+    df = MATCHES.copy()
+    df.loc[0, "Home Team Goals"] = 5
+    match_ids = load_matches(df, db_path, incremental=True)
+    create_kpis(db_path, match_ids=match_ids)
+
+    con = duckdb.connect(db_path)
+    assert read(con, "SELECT goals_for FROM kpi_team_edition WHERE edition = 2014 AND team = 'brazil'") == [(6,)]
+    assert read(con, "SELECT COUNT(*) FROM kpi_team_edition WHERE edition = 2022") == [(2,)]
+    con.close()
@@ -0,0 +1,65 @@
+import os
+import pandas as pd
+import pytest
+import etl.extract_cache as extract_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(extract_cache, "CACHE_ENABLED", True)
+    return tmp_path / "cache"
+
+
+def make_source(tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_text("team,goals\nbrazil,3\n")
+    code = tmp_path / "etl_x.py"
+    code.write_text("VERSION = 1\n")
+    return source, code
+
+
+def test_cached_extract_reuses_result(tmp_path, cache_dir):
+    source, code = make_source(tmp_path)
+    calls = []
+
+    def extractor():
+        calls.append(1)
+        return pd.read_csv(source)
+
+    first = extract_cache.cached_extract("x", extractor, [source], [code])
+    second = extract_cache.cached_extract("x", extractor, [source], [code])
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cached_extract_invalidated_by_input_or_code(tmp_path, cache_dir):
+    source, code = make_source(tmp_path)
+    calls = []
+
+    def extractor():
+        calls.append(1)
+        return pd.read_csv(source)
+
+    extract_cache.cached_extract("x", extractor, [source], [code])
+    source.write_text("team,goals\nbrazil,4\n")
+    assert extract_cache.cached_extract("x", extractor, [source], [code])["goals"].iloc[0] == 4
+    code.write_text("VERSION = 2\n")
+    extract_cache.cached_extract("x", extractor, [source], [code])
+
+    assert len(calls) == 3
+    assert len(list(cache_dir.glob("*.parquet"))) == 1
+
+
+def test_evict_keeps_most_recent(tmp_path, cache_dir):
+    source, code = make_source(tmp_path)
+    for age, name in enumerate(["c", "b", "a"]):
+        extract_cache.cached_extract(name, lambda: pd.read_csv(source), [source], [code])
+        path = next(cache_dir.glob(f"{name}-*.parquet"))
+        os.utime(path, (1_000_000 - age, 1_000_000 - age))
+    size = next(cache_dir.glob("c-*.parquet")).stat().st_size
+
+    extract_cache.evict(max_bytes=size)
+
+    assert [p.name.split("-")[0] for p in cache_dir.glob("*.parquet")] == ["c"]
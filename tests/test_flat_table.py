@@ -0,0 +1,55 @@
+import duckdb
+import pandas as pd
+from etl.db_creation import create_db_schema
+from etl.etl_create_view import create_view
+from etl.etl_inserter_2014 import load_matches
+
+MATCHES = pd.DataFrame({
+    "Datetime": pd.to_datetime(["2014-06-13 13:00", "1930-07-13 15:00", "2014-06-12 17:00"]),
+    "Stage": ["group", "group", "group"],
+    "City": ["natal", "montevideo", "sao paulo"],
+    "Home Team Name": ["mexico", "france", "brazil"],
+    "Home Team Goals": [1, 4, 3],
+    "Away Team Goals": [0, 1, 1],
+    "Away Team Name": ["cameroon", "mexico", "croatia"],
+    "Home Result": ["winner", "winner", "winner"],
+    "Away Result": ["loser", "loser", "loser"],
+})
+
+
+def read(db_path, query):
+    con = duckdb.connect(db_path)
+    df = con.sql(query).df()
+    con.close()
+    return df
+
+
+def test_flat_table_matches_view(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path)
+    load_matches(MATCHES, db_path)
+    create_view(db_path, materialize=True)
+
+    table = read(db_path, "SELECT * FROM matches_flat")
+    view = read(db_path, "SELECT * FROM v_matches_flat ORDER BY year_, match_date, match_id")
+
+    pd.testing.assert_frame_equal(table, view)
+    assert list(table["home_team"]) == ["france", "brazil", "mexico"]
+
+
+def test_flat_table_incremental_refresh(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path)
+    load_matches(MATCHES, db_path, materialize=True)
+
+    df = MATCHES.copy()
+    df.loc[2, "Home Team Goals"] = 2
+    load_matches(df, db_path, incremental=True, materialize=True)
+    create_view(db_path)
+
+    query = "SELECT * FROM {} ORDER BY match_id"
+    pd.testing.assert_frame_equal(
+        read(db_path, query.format("matches_flat")),
+        read(db_path, query.format("v_matches_flat")),
+    )
+    assert read(db_path, "SELECT home_goals FROM matches_flat WHERE home_team = 'brazil'").iloc[0, 0] == 2
@@ -0,0 +1,36 @@
+import etl.geo_index as geo_index
+
+CITIES = {
+    "1": {"name": "São Paulo", "population": 10000000, "alternatenames": ["Sao Paulo", "San Pablo"]},
+    "2": {"name": "Munich", "population": 1200000, "alternatenames": ["München", "Monaco di Baviera"]},
+    "3": {"name": "Monaco", "population": 30000, "alternatenames": ["Monaco di Baviera"]},
+}
+
+
+def test_build_city_index_official_names():
+    index = geo_index.build_city_index(CITIES)
+
+    assert index["sao paulo"] == "sao paulo"
+    assert "munchen" not in index
+
+
+def test_build_city_index_alternate_names():
+    index = geo_index.build_city_index(CITIES, include_alternate_names=True)
+
+    assert index["munchen"] == "munich"
+    assert index["san pablo"] == "sao paulo"
+    assert index["monaco di baviera"] == "munich"
+    assert index["monaco"] == "monaco"
+
+
+def test_get_city_index_is_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(geo_index, "INDEX_DIR", tmp_path)
+    monkeypatch.setattr(geo_index, "get_cities", lambda: CITIES)
+    geo_index.get_city_index.cache_clear()
+
+    index = geo_index.get_city_index()
+    geo_index.get_city_index.cache_clear()
+
+    assert geo_index.index_path().exists()
+    assert geo_index.get_city_index() == index
+    geo_index.get_city_index.cache_clear()
@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+
+import duckdb
+import pandas as pd
+import pytest
+from etl import instrumentation
+
+
+def test_stage_and_decorator_record_measures():
+    instrumentation.start_run(workers=1)
+
+    with instrumentation.stage("read") as record:
+        df = pd.DataFrame({"a": range(10)})
+        record["rows_out"] = len(df)
+
+    @instrumentation.instrumented("split")
+    def split(frame):
+        return frame.head(3), "extra"
+
+    split(df)
+    with pytest.raises(ValueError):
+        with instrumentation.stage("broken"):
+            raise ValueError("boom")
+
+    report = instrumentation.run_report()
+    assert report["config"] == {"workers": 1}
+    stages = {r["stage"]: r for r in report["stages"]}
+    assert list(stages) == ["read", "split", "broken"]
+    assert stages["read"]["rows_out"] == 10
+    assert stages["split"]["rows_out"] == 3  # premier élément d'un tuple
+    assert stages["broken"]["ok"] is False
+    assert all(r["wall_s"] >= 0 and r["cpu_s"] >= 0 for r in stages.values())
+
+
+def test_report_is_written_as_json_and_to_etl_runs(tmp_path):
+    instrumentation.start_run()
+    with instrumentation.stage("load", rows_in=5) as record:
+        record["rows_out"] = 5
+
+    path = instrumentation.write_report(tmp_path / "run.json")
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["stages"][0]["stage"] == "load"
+
+    db_path = str(tmp_path / "db.duckdb")
+    instrumentation.save_runs(db_path)
+    instrumentation.save_runs(db_path)
+    con = duckdb.connect(db_path)
+    rows = con.sql("SELECT run_id, stage, rows_in, rows_out, ok FROM etl_runs").fetchall()
+    con.close()
+    assert rows == [(report["run_id"], "load", 5, 5, True)] * 2
+
+
+def test_thread_stage_is_not_charged_other_threads_cpu():
+    instrumentation.start_run()
+    started, done = threading.Event(), threading.Event()
+
+    def worker():
+        with instrumentation.stage("extract.worker"):
+            started.set()
+            done.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    started.wait()
+    # Le thread principal consomme du CPU pendant que l'étape du worker attend
+    end = time.process_time() + 0.2
+    while time.process_time() < end:
+        pass
+    done.set()
+    thread.join()
+
+    (record,) = instrumentation.run_report()["stages"]
+    assert record["cpu_clock"] == "thread"
+    assert record["cpu_s"] < 0.1
+
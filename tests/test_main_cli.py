@@ -0,0 +1,104 @@
+import duckdb
+import pandas as pd
+import pytest
+# Mêmes modules que ceux importés par main (connexion partagée, cache)
+import config
+import extract_cache
+from etl.db_creation import create_db_schema
+from etl.etl_inserter_2014 import load_matches, preview_load
+import etl.main as main
+from etl.main import build_parser, select_sources
+
+MATCHES = pd.DataFrame({
+    "Datetime": pd.to_datetime(["2014-06-12 17:00", "2014-06-13 13:00"]),
+    "Stage": ["group", "group"],
+    "City": ["sao paulo", "natal"],
+    "Home Team Name": ["brazil", "mexico"],
+    "Home Team Goals": [3, 1],
+    "Away Team Goals": [1, 1],
+    "Away Team Name": ["croatia", "cameroon"],
+    "Home Result": ["win", "draw"],
+    "Away Result": ["loss", "draw"],
+})
+
+
+def test_select_sources_by_name_and_edition():
+    assert [s[0] for s in select_sources()] == ["1930-2010", "2014", "2018", "2022"]
+    assert [s[0] for s in select_sources(["2014", "2022"])] == ["2014", "2022"]
+    assert [s[0] for s in select_sources(editions=[1954, 2018])] == ["1930-2010", "2018"]
+    assert select_sources(["2014"], [2018]) == []
+    with pytest.raises(ValueError):
+        select_sources(["2026"])
+
+
+def test_parser_filters_after_subcommand():
+    args = build_parser().parse_args(["load", "--edition", "2014", "--edition", "2018", "--dry-run"])
+    assert (args.command, args.edition, args.dry_run) == ("load", [2014, 2018], True)
+    assert build_parser().parse_args([]).command is None
+
+
+def test_preview_load_leaves_db_unchanged(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path)
+    load_matches(MATCHES.iloc[:1], db_path)
+
+    changed = MATCHES.copy()
+    changed.loc[0, "Home Team Goals"] = 4
+    assert preview_load(changed, db_path) == {"new": 1, "changed": 1, "removed": 0}
+    assert preview_load(MATCHES.iloc[1:], db_path)["removed"] == 1
+
+    con = duckdb.connect(db_path)
+    assert con.execute("SELECT COUNT(*), MAX(goal_nb) FROM Plays").fetchone() == (2, 3)
+    assert con.execute("SELECT COUNT(*) FROM Teams").fetchone() == (2,)
+    con.close()
+
+
+def test_polars_engine_falls_back_to_pandas(monkeypatch, capsys):
+    monkeypatch.setattr(main.polars_extract, "pl", None)
+    args = build_parser().parse_args(["extract", "--engine", "polars", "--source", "2014"])
+
+    df = main.extract_frame(args, select_sources(args.source))
+    assert "polars n'est pas installé" in capsys.readouterr().out
+    assert len(df) == 64
+
+
+@pytest.mark.parametrize("engine", ["pandas", "duckdb"])
+def test_dry_run_load_writes_nothing(tmp_path, monkeypatch, engine):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type="integer")
+    load_matches(MATCHES, db_path)
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(extract_cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(extract_cache, "CACHE_DIR", cache_dir)
+    con = config.get_connection(db_path)
+    tables = "SELECT table_name, temporary FROM duckdb_tables() ORDER BY ALL"
+    before = con.execute(tables).fetchall()
+
+    args = build_parser().parse_args(["load", "--db", db_path, "--engine", engine, "--source", "2014", "--dry-run"])
+    main.cmd_load(args)
+
+    assert con.execute(tables).fetchall() == before
+    assert con.execute("SELECT COUNT(*) FROM Matches").fetchone() == (2,)
+    assert not cache_dir.exists()
+    config.close_connection(db_path)
+
+
+def test_dry_run_rejects_key_type_mismatch(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type="integer")
+    args = build_parser().parse_args(["load", "--db", db_path, "--key-type", "uuid", "--source", "2014", "--dry-run"])
+    with pytest.raises(ValueError, match="clés integer"):
+        main.cmd_load(args)
+    config.close_connection(db_path)
+
+
+def test_edition_filter_keeps_undated_matches_of_requested_sources(monkeypatch):
+    monkeypatch.setattr(extract_cache, "CACHE_ENABLED", False)
+    old = MATCHES.assign(Datetime=pd.to_datetime(["1954-06-17 18:00", None]))
+    new = MATCHES.assign(Datetime=pd.to_datetime(["2014-06-12 17:00", None]))
+    sources = [("1930-2010", lambda: old, [], []), ("2014", lambda: new, [], [])]
+
+    df = main.merge_data(sources=sources, editions=[1954, 2014])
+    # La ligne sans date de 2014 est gardée ; celle de 1930-2010 peut être d'une autre édition
+    assert df["Home Team Name"].tolist() == ["brazil", "brazil", "mexico"]
+    assert df["Datetime"].isna().sum() == 1
@@ -0,0 +1,33 @@
+import pandas as pd
+from etl.normalize_cache import apply_memoized, cache_stats, clear_caches
+
+calls = []
+
+
+def shout(value, suffix=""):
+    calls.append(value)
+    if pd.isna(value):
+        return "unknown"
+    return str(value).upper() + suffix
+
+
+def test_apply_memoized_matches_apply():
+    series = pd.Series(["a", "b", "a", None, "b", "a"], index=[5, 4, 3, 2, 1, 0], name="team")
+
+    result = apply_memoized(series, shout, "!")
+
+    pd.testing.assert_series_equal(result, series.apply(lambda x: shout(x, "!")))
+
+
+def test_apply_memoized_calls_once_per_unique_value():
+    clear_caches()
+    calls.clear()
+
+    apply_memoized(pd.Series(["x", "y", "x", "x"]), shout)
+    apply_memoized(pd.Series(["y", "z"]), shout)
+
+    assert sorted(calls) == ["x", "y", "z"]
+    stats = cache_stats()[f"{shout.__module__}.shout"]
+    assert stats["rows"] == 6
+    assert stats["misses"] == 3
+    assert stats["hits"] == 1
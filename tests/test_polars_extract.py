@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("polars")
+
+from etl.main import SOURCES, merge_data, select_sources
+from etl.polars_extract import STAGING_COLUMNS, extract_frame
+
+
+def normalized(df):
+    """Mêmes types et même ordre de lignes pour comparer les deux moteurs."""
+    df = df[list(STAGING_COLUMNS)].copy()
+    df["Datetime"] = pd.to_datetime(df["Datetime"], errors="coerce").astype("datetime64[us]")
+    for col, kind in STAGING_COLUMNS.items():
+        if kind == "int":
+            df[col] = pd.to_numeric(df[col]).astype("Int64")
+        elif kind == "text":
+            df[col] = df[col].astype(object).where(df[col].notna(), None).astype("string")
+    return df.sort_values(list(df.columns), na_position="last").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("source", SOURCES, ids=[source[0] for source in SOURCES])
+def test_extract_frame_matches_pandas_extractor(source):
+    name, extractor = source[0], source[1]
+    pd.testing.assert_frame_equal(normalized(extract_frame([name])), normalized(extractor()))
+
+
+def test_extract_frame_filters_editions_like_merge_data():
+    editions = [1954, 2014]
+    sources = select_sources(editions=editions)
+    expected = merge_data(sources=sources, editions=editions)
+    got = extract_frame([source[0] for source in sources], editions)
+    assert len(got) == len(expected) > 0
+    pd.testing.assert_frame_equal(normalized(got), normalized(expected))
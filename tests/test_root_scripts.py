@@ -0,0 +1,13 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_etl_cleaner_2014_imports_without_etl_on_path(tmp_path):
+    # Interpréteur neuf, hors du pythonpath de pytest.ini : seul le script met etl/ sur le chemin
+    subprocess.run(
+        [sys.executable, "-c", "import etl_cleaner_2014; etl_cleaner_2014.normalize_stage('Group A')"],
+        cwd=tmp_path, env={"PYTHONPATH": str(ROOT)}, check=True, capture_output=True,
+    )
@@ -0,0 +1,57 @@
+import pandas as pd
+from etl.source_schema import MERGED_COLUMNS, concat_canonical
+
+FRAME_2014 = pd.DataFrame({
+    "Datetime": pd.to_datetime(["2014-06-12 17:00"]),
+    "Stage": ["group"],
+    "City": ["sao paulo"],
+    "Home Team Name": ["brazil"],
+    "Home Team Goals": [3.0],
+    "Away Team Goals": [1.0],
+    "Away Team Name": ["croatia"],
+    "Home Result": ["winner"],
+    "Away Result": ["loser"],
+})
+
+# Colonnes dans un autre ordre, Datetime en texte et un score manquant
+FRAME_1930 = pd.DataFrame({
+    "Datetime": ["1930-07-13 15:00:00", None],
+    "Stage": pd.Categorical(["group", "final"]),
+    "City": ["montevideo", "montevideo"],
+    "Home Team Name": ["france", "uruguay"],
+    "Away Team Name": ["mexico", "argentina"],
+    "Home Team Goals": pd.array([4, None], dtype="Int64"),
+    "Away Team Goals": pd.array([1, None], dtype="Int64"),
+    "Home Result": ["winner", None],
+    "Away Result": ["loser", None],
+})
+
+
+def test_concat_canonical_dtypes():
+    merged = concat_canonical([FRAME_1930, FRAME_2014])
+
+    assert list(merged.columns) == MERGED_COLUMNS
+    assert merged["Datetime"].dtype == "datetime64[us]"
+    assert merged["Datetime"].isna().tolist() == [False, True, False]
+    assert merged["Home Team Goals"].dtype == "Int16"
+    assert merged["Home Team Goals"].isna().sum() == 1
+    for col in ["Stage", "City", "Home Team Name", "Away Team Name", "Home Result", "Away Result"]:
+        assert isinstance(merged[col].dtype, pd.CategoricalDtype)
+
+
+def test_concat_canonical_shares_categories():
+    merged = concat_canonical([FRAME_1930, FRAME_2014])
+
+    teams = merged["Home Team Name"].dtype
+    assert merged["Away Team Name"].dtype == teams
+    assert list(teams.categories) == [
+        "argentina", "brazil", "croatia", "france", "mexico", "uruguay",
+    ]
+    assert merged["Away Result"].dtype == merged["Home Result"].dtype
+    assert merged["Away Team Name"].tolist() == ["mexico", "argentina", "croatia"]
+
+
+def test_concat_canonical_keeps_large_scores():
+    # Données répliquées ou corrompues : un score hors de la plage 8 bits reste exact
+    frame = FRAME_2014.assign(**{"Home Team Goals": [149.0]})
+    assert concat_canonical([frame])["Home Team Goals"].tolist() == [149]
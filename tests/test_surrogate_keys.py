@@ -0,0 +1,67 @@
+import duckdb
+import pandas as pd
+import pytest
+from etl.db_creation import create_db_schema
+from etl.etl_inserter_2014 import load_matches
+
+MATCHES = pd.DataFrame({
+    "Datetime": pd.to_datetime(["2014-06-12 17:00", "2014-06-13 13:00"]),
+    "Stage": ["group", "group"],
+    "City": ["sao paulo", "natal"],
+    "Home Team Name": ["brazil", "mexico"],
+    "Home Team Goals": [3, 1],
+    "Away Team Goals": [1, 0],
+    "Away Team Name": ["croatia", "cameroon"],
+    "Home Result": ["winner", "winner"],
+    "Away Result": ["loser", "loser"],
+})
+
+
+def team_keys(db_path):
+    con = duckdb.connect(db_path)
+    keys = dict(con.execute("SELECT team_name, team_id FROM Teams").fetchall())
+    con.close()
+    return keys
+
+
+def test_unknown_key_type():
+    with pytest.raises(ValueError):
+        create_db_schema(":memory:", key_type="serial")
+
+
+def test_integer_keys_are_dense(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type="integer")
+    load_matches(MATCHES, db_path)
+
+    assert team_keys(db_path) == {"brazil": 1, "cameroon": 2, "croatia": 3, "mexico": 4}
+
+
+@pytest.mark.parametrize("key_type", ["integer", "hash"])
+def test_keys_are_stable_across_reloads(tmp_path, key_type):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type=key_type)
+    load_matches(MATCHES, db_path)
+    first = team_keys(db_path)
+    load_matches(MATCHES, db_path)
+
+    assert team_keys(db_path) == first
+
+
+def test_existing_key_type_is_kept(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type="integer")
+    load_matches(MATCHES, db_path)
+    # Sans type demandé, la base garde ses clés entières
+    create_db_schema(db_path)
+    load_matches(MATCHES, db_path)
+
+    assert team_keys(db_path) == {"brazil": 1, "cameroon": 2, "croatia": 3, "mexico": 4}
+
+
+def test_key_type_mismatch(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    create_db_schema(db_path, key_type="integer")
+
+    with pytest.raises(ValueError, match="clés integer"):
+        create_db_schema(db_path, key_type="uuid")
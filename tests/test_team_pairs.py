@@ -0,0 +1,17 @@
+import pandas as pd
+from etl.corrections import add_override_keys
+from etl.etl_1930_2010 import add_team_pair_keys
+from etl.team_pairs import team_pair_columns
+
+
+def test_team_pair_is_unordered():
+    pair = team_pair_columns(pd.Series(["italy", "brazil"]), pd.Series(["brazil", "italy"]), ("lo", "hi"))
+    assert pair["lo"].tolist() == ["brazil", "brazil"]
+    assert pair["hi"].tolist() == ["italy", "italy"]
+
+
+def test_date_lookup_and_overrides_share_pair_keys():
+    df = pd.DataFrame({"edition": ["1994"], "team1": ["italy"], "team2": ["brazil"]})
+    by_date = add_team_pair_keys(df)
+    by_override = add_override_keys(df, "edition", "team1", "team2")
+    assert by_date[["_team_lo", "_team_hi"]].equals(by_override[["_team_lo", "_team_hi"]])